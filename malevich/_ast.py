@@ -9,8 +9,9 @@ from unittest.mock import call
 import uuid
 import warnings
 import astor
+from collections import ChainMap
 from copy import deepcopy
-from typing import Callable, NoReturn
+from typing import Any, Callable, NoReturn
 
 from malevich._autoflow.flow import Flow
 from malevich._autoflow.tracer import autoflow, traced
@@ -24,8 +25,102 @@ from .models.nodes.morph import MorphNode
 
 State = tuple[dict, dict] # globals, locals
 
+_DELETED = object()
+
+
+class BranchLocals(ChainMap):
+    """Local namespace of a branch layered over the enclosing namespace
+
+    Variables assigned (or deleted) within the branch are stored in the
+    top layer. Others are read from the enclosing namespace and copied on
+    the first read, so objects mutated in place by the branch are not
+    shared with the enclosing namespace or other branches. Variables the
+    branch does not read are never copied. Traced objects are not copied.
+    """
+
+    def __init__(self, *maps) -> None:
+        super().__init__(*maps)
+        self._copies = {}
+
+    def peek(self, key: str) -> Any:  # noqa: ANN401
+        """Returns the value assigned in the branch or the enclosing one
+
+        Copies made on reads within the branch are not returned.
+        """
+        for mapping in self.maps:
+            if key in mapping:
+                if isinstance(mapping, BranchLocals):
+                    value = mapping._current(key)
+                else:
+                    value = mapping[key]
+                break
+        else:
+            raise KeyError(key)
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def _current(self, key: str) -> Any:  # noqa: ANN401
+        return self._copies[key] if key in self._copies else self.peek(key)
+
+    def assigned(self, key: str) -> bool:
+        """Whether the variable is assigned or deleted within the branch"""
+        return key in self.maps[0]
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        if key in self._copies:
+            return self._copies[key]
+        value = self.peek(key)
+        if not self.assigned(key) and not isinstance(value, traced):
+            try:
+                value = deepcopy(value)
+            except TypeError:
+                # Modules and other objects that cannot be copied are shared
+                pass
+            self._copies[key] = value
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        try:
+            self.peek(key)
+        except KeyError:
+            return False
+        return True
+
+    def __setitem__(self, key, value) -> None:
+        self._copies.pop(key, None)
+        self.maps[0][key] = value
+
+    def __delitem__(self, key) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._copies.pop(key, None)
+        if any(key in m for m in self.maps[1:]):
+            self.maps[0][key] = _DELETED
+        else:
+            del self.maps[0][key]
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in super().__iter__() if key in self)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def _peek(namespace: dict, key: str) -> Any:  # noqa: ANN401
+    if isinstance(namespace, BranchLocals):
+        return namespace.peek(key)
+    return namespace[key]
+
+
 def copy_state(state: State):
-    return state[0], deepcopy(state[1])
+    return state[0], BranchLocals({}, state[1])
 
 
 def extract_conditioned_nodes(old_tree: ExecutionTree, new_tree: ExecutionTree):
@@ -84,11 +179,16 @@ def combine_branch_states_inplace(state, if_state, else_state, cond_node):
     )
 
     for key in initial_state:
+        # Copies of variables read by branches are not taken as changes
         if key in if_lstate and key in else_lstate and (
-            initial_state[key] is not if_lstate[key]        # key changed in at least
-            or initial_state[key] is not else_lstate[key]   # one of the branches
+            _peek(initial_state, key) is not _peek(if_lstate, key)
+            or _peek(initial_state, key) is not _peek(else_lstate, key)
         ):
-            v, ifv, elsev = initial_state[key], if_lstate[key], else_lstate[key]
+            v, ifv, elsev = (
+                _peek(initial_state, key),
+                _peek(if_lstate, key),
+                _peek(else_lstate, key),
+            )
             if (
                 all(map(lambda x: isinstance(x, traced) or x is None, (v, ifv, elsev)))
                 and all(map(lambda x: isinstance(x.owner, BaseNode) or x is None, (v, ifv, elsev)))
@@ -5,6 +5,7 @@ The package provides a context manager for providing
 an access to an execution tree in function contexts.
 """
 
+from contextvars import ContextVar
 from typing import Iterable
 
 from malevich._dev.singleton import SingletonMeta
@@ -17,7 +18,8 @@ class Flow(metaclass=SingletonMeta):
 
     The class is a singleton and can be used as a context-manager
     to create a new execution tree. It holds a stack of trees to
-    maintain nested flows. The stack is thread-safe.
+    maintain nested flows. The stack is context-local: each thread
+    and each asyncio task builds flows on its own stack.
 
     Example:
 
@@ -38,30 +40,35 @@ class Flow(metaclass=SingletonMeta):
         print("At the end", Flow.get_stack())
     """
 
-    # Internal representation of the execution tree
-    __flow_stack = []
+    # Internal representation of the execution tree. The stack is
+    # immutable, so contexts copied from each other do not share changes
+    __flow_stack: ContextVar[tuple[ExecutionTree, ...]] = ContextVar(
+        'malevich_flow_stack', default=()
+    )
 
     def isinflow() -> bool:
         """Check if the current execution is inside a flow"""
-        return len(Flow.__flow_stack) > 0
+        return len(Flow.__flow_stack.get()) > 0
 
     def flow_ref() -> ExecutionTree:
         """Returns the reference to the current flow in the context"""
-        return None if not Flow.isinflow() else Flow.__flow_stack[-1]
+        stack = Flow.__flow_stack.get()
+        return stack[-1] if stack else None
 
     def __enter__(self) -> ExecutionTree:
-        Flow.__flow_stack.append(ExecutionTree())
-        return Flow.flow_ref()
+        tree = ExecutionTree()
+        Flow.__flow_stack.set((*Flow.__flow_stack.get(), tree))
+        return tree
 
     def __exit__(self, *args: Iterable) -> None:
-        Flow.__flow_stack.pop()
+        Flow.__flow_stack.set(Flow.__flow_stack.get()[:-1])
 
     @staticmethod
     def get_stack() -> tuple[ExecutionTree]:
         """Returns immutable stack of execution trees"""
-        return tuple(Flow.__flow_stack)
+        return Flow.__flow_stack.get()
 
     @staticmethod
     def _hardset_tree(tree: ExecutionTree) -> None:
         """Injects a tree into the flow stack"""
-        Flow.__flow_stack[-1] = tree
+        Flow.__flow_stack.set((*Flow.__flow_stack.get()[:-1], tree))
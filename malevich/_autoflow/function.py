@@ -12,6 +12,10 @@ C = ParamSpec("C")
 R = TypeVar("R")
 
 
+def _parameters(func: Callable) -> tuple[inspect.Parameter, ...]:
+    return tuple(inspect.signature(func).parameters.values())
+
+
 def autotrace(func: Callable[C, R]) -> Callable[C, R]:
     """Function decorator that enables automatic dependency tracking
 
@@ -27,7 +31,19 @@ def autotrace(func: Callable[C, R]) -> Callable[C, R]:
     If the argument is passed as a keyword argument,
     and the function accepts the argument as
     **kwargs, raises a warning and does not link the argument.
+
+    The signature of the function is inspected once, when it is decorated.
     """
+    # !! The function only traces positional only arguments
+    # which are the ones that preceed \
+    # def func(arg1, arg2, /, arg3, *, ...) <-- only arg1 and arg2 are
+    # considered
+    varnames = tuple(
+        p.name for p in _parameters(func)
+        if p.kind == inspect.Parameter.POSITIONAL_ONLY
+    )
+    n_varnames = len(varnames)
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Call function to obtain resuts
@@ -35,25 +51,13 @@ def autotrace(func: Callable[C, R]) -> Callable[C, R]:
         result = gn.traced(result) if not isinstance(
             result, gn.traced # If the results is not traced, trace it
         ) else result
-        # Obtain parameters from function signature.
-        parameters = list(inspect.signature(func).parameters.values())
-        # !! The function only traces positional only arguments
-        # which are the ones that preceed \
-        # def func(arg1, arg2, /, arg3, *, ...) <-- only arg1 and arg2 are
-        # considered
-        varnames = [ # filter pos-only args
-            p.name for p in parameters
-            if p.kind == inspect.Parameter.POSITIONAL_ONLY
-
-        ]
         # tracing arguments, slicing up to known args
         new_edges = 0
-        for i, arg in enumerate(islice(args, 0, len(varnames))):
-            argument_name = varnames[i]
+        for i, arg in enumerate(islice(args, 0, n_varnames)):
             if isinstance(arg, gn.traced):
                 arg._autoflow.calledby(
                     result,
-                    AutoflowLink(index=i, name=argument_name)
+                    AutoflowLink(index=i, name=varnames[i])
                 )
                 new_edges += 1
             else:
@@ -76,29 +80,29 @@ def sinktrace(func: Callable[C, R]) -> Callable[C, R]:
 
     This decorator is applied to processors that contains
     """
+    names = tuple(
+        p.name for p in _parameters(func)
+        if p.kind in (
+            inspect.Parameter.VAR_POSITIONAL,
+            inspect.Parameter.POSITIONAL_ONLY
+        )
+    )
+    last = len(names) - 1
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs) -> gn.traced:
         # Call function to obtain resuts
         result = func(*args, **kwargs)
         result = gn.traced(result) if not isinstance(result, gn.traced) else result
-        parameters = list(inspect.signature(func).parameters.values())
-        names = [
-            p.name for p in parameters
-            if p.kind in (
-                inspect.Parameter.VAR_POSITIONAL,
-                inspect.Parameter.POSITIONAL_ONLY
-            )
-        ]
         new_edges = 0
         for i, arg in enumerate(args):
-            real_index = min(i, len(names) - 1)
-            argument_name = names[real_index]
+            real_index = min(i, last)
             if isinstance(arg, gn.traced):
                 new_edges += 1
                 arg._autoflow.calledby(result, AutoflowLink(
                         index=real_index,
-                        name=argument_name,
-                        in_sink=i >= len(names) - 1
+                        name=names[real_index],
+                        in_sink=i >= last
                     )
                 )
             else:
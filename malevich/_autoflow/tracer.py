@@ -1,4 +1,3 @@
-from collections import defaultdict
 import uuid
 import weakref
 from hashlib import sha256
@@ -24,7 +23,7 @@ class root(BaseModel):   # noqa: N801
         return self.id == other.id
 
     def __hash__(self) -> int:
-        return hash(sha256(self.id.encode()).hexdigest)
+        return hash(sha256(self.id.encode()).hexdigest())
 
 
 T = TypeVar("T", bound=Any)
@@ -36,47 +35,60 @@ class autoflow(Generic[T]):  # noqa: N801
     It holds both the reference to the execution tree and the reference
     to the traced object. Can be reattached to another traced object. Provides
     interfaces for reporting a new dependency in the execution tree.
+
+    Bridges of each tree are registered in `_trace_map`. Both trees and
+    bridges are referenced weakly, so the registry does not prolong the
+    lifetime of flows: an entry is dropped as soon as its tree is collected.
     """
 
-    _trace_map: dict[weakref.ref[ExecutionTree], set['autoflow']] = defaultdict(set)
+    _trace_map: weakref.WeakKeyDictionary[
+        ExecutionTree, weakref.WeakSet['autoflow']
+    ] = weakref.WeakKeyDictionary()
     _tracers = 0
 
     @staticmethod
     def get_tree_ref(tree: ExecutionTree) -> weakref.ref[ExecutionTree] | None:
-        for t in autoflow._trace_map.keys():
-            if t() is not None and t() is tree:
-                return t
         return weakref.ref(tree)
 
+    @staticmethod
+    def _bridges(tree_ref: weakref.ref[ExecutionTree]) -> weakref.WeakSet['autoflow']:
+        tree = tree_ref()
+        if tree is None:
+            return weakref.WeakSet()
+        bridges = autoflow._trace_map.get(tree)
+        if bridges is None:
+            bridges = autoflow._trace_map[tree] = weakref.WeakSet()
+        return bridges
+
     @staticmethod
     def get_trace_refs(tree: ExecutionTree) -> set['autoflow']:
-        tree = autoflow.get_tree_ref(tree)
         if tree is None:
             raise ValueError("Tree not found")
-        return autoflow._trace_map[tree]
+        return set(autoflow._trace_map.get(tree, ()))
 
 
     @staticmethod
     def retrace(old_tree: ExecutionTree, new_tree: ExecutionTree, /) -> None:
         new_tree_ref = autoflow.get_tree_ref(new_tree)
+        new_bridges = autoflow._bridges(new_tree_ref)
         for a in autoflow.get_trace_refs(old_tree):
             a._tree_ref = new_tree_ref
             a._notify_spectators(old_tree, new_tree)
-            autoflow._trace_map[new_tree_ref].add(a)
+            new_bridges.add(a)
 
     def retrace_self(self, new_tree: ExecutionTree) -> 'autoflow':
         new_tree_ref = autoflow.get_tree_ref(new_tree)
 
-        autoflow._trace_map[self._tree_ref].remove(self)
+        autoflow._bridges(self._tree_ref).discard(self)
         self._tree_ref = new_tree_ref
         self._notify_spectators(self._tree_ref(), new_tree)
-        autoflow._trace_map[new_tree_ref].add(self)
+        autoflow._bridges(new_tree_ref).add(self)
         return self
 
     def __init__(self, tree: ExecutionTree[T, Any]) -> None:
         self._tree_ref = autoflow.get_tree_ref(tree)
         self._component_ref = None
-        self._trace_map[self._tree_ref].add(self)
+        autoflow._bridges(self._tree_ref).add(self)
         self._tracers += 1
         self._spectators = []
 
@@ -100,13 +112,13 @@ class autoflow(Generic[T]):  # noqa: N801
 
     def __deepcopy__(self, *args):
         copy = super().__deepcopy__(*args)
-        autoflow._trace_map[copy._tree_ref].add(copy)
+        autoflow._bridges(copy._tree_ref).add(copy)
         self._tracers += 1
         return copy
 
     def __copy__(self, *args):
         copy = super().__copy__(*args)
-        autoflow._trace_map[copy._tree_ref].add(copy)
+        autoflow._bridges(copy._tree_ref).add(copy)
         self._tracers += 1
         return copy
 
@@ -178,6 +190,11 @@ class traced(Generic[T]):  # noqa: N801
     def __deepcopy__(self, *args):
         return self
 
+    def __reduce__(self) -> tuple:
+        # The bridge to the tree cannot be serialized,
+        # so the object is restored detached from any flow
+        return (tracedLike, (self.owner,))
+
     def __getitem__(self, *args):
         return tracedLike(self._owner.__getitem__(*args))
 
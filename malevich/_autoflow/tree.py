@@ -49,6 +49,13 @@ class ExecutionTree(Generic[T, LinkType]):
         self._node_map  = {}
         self._edge_map  = {}
 
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        # Mappers are only used while tracing and are not serializable
+        state['_node_map'] = {}
+        state['_edge_map'] = {}
+        return state
+
     def remove_node_mapper(self, key: str) -> None:
         self._node_map.pop(key)
 
@@ -142,9 +149,10 @@ class ExecutionTree(Generic[T, LinkType]):
         ])
 
     def roots(self) -> Iterable[tuple[int, T]]:
+        targets = {y[1] for y in self.tree}
         return [
             (i, x) for i, x in enumerate(self.tree)
-            if not any(y[1] == x[0] for y in self.tree)
+            if x[0] not in targets
         ]
 
     def edges_from(self, node: T) -> None:
@@ -167,11 +175,16 @@ class ExecutionTree(Generic[T, LinkType]):
         # Mark visited nodes
         visited = [False] * len(self.tree)
 
+        # Index edges by their callee
+        edges_from = {}
+        for i, edge in enumerate(self.tree):
+            edges_from.setdefault(edge[0], []).append(i)
+
         # Find roots
         roots = self.roots()
 
         # Traverse
-        q = deque(maxlen=len(self.tree))
+        q = deque()
         for i, r in roots:
             # BFS
             q.append((i, r,))
@@ -186,10 +199,9 @@ class ExecutionTree(Generic[T, LinkType]):
             visited[j] = True
 
             q.extend(
-                filter(
-                    lambda x: x[1][0] == edge[1] and not visited[x[0]],
-                    enumerate(self.tree)
-                )
+                (i, self.tree[i])
+                for i in edges_from.get(edge[1], ())
+                if not visited[i]
             )
 
     def topsort(self) -> Iterator[tuple[T, T, LinkType]]:
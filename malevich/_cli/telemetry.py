@@ -0,0 +1,55 @@
+import json
+from datetime import datetime, timedelta
+
+import rich
+import typer
+from rich.table import Table
+
+telemetry = typer.Typer(
+    help="Inspect timings of task stages recorded locally",
+)
+
+
+@telemetry.command("report", help="Show p50/p95 durations of each stage phase")
+def report(
+    pipeline: str = typer.Option(
+        None, "--pipeline", "-p", help="Only include tasks with this pipeline hash"
+    ),
+    stage: str = typer.Option(
+        None,
+        "--stage",
+        "-s",
+        help="Only include one stage: interpret, prepare, run or results",
+    ),
+    days: int = typer.Option(
+        None, "--days", "-d", help="Only include measurements of last N days"
+    ),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+) -> None:
+    from malevich._db import get_stage_percentiles
+
+    since = datetime.now() - timedelta(days=days) if days else None
+    report_ = get_stage_percentiles(pipeline_hash=pipeline, stage=stage, since=since)
+
+    if as_json:
+        typer.echo(json.dumps([
+            {'stage': stage_, 'phase': phase_, **values}
+            for (stage_, phase_), values in report_.items()
+        ], indent=4))
+        return
+
+    if not report_:
+        typer.echo("No timings recorded yet")
+        return
+
+    table = Table("Stage", "Phase", "N", "p50, s", "p95, s", "Total, s")
+    for (stage_, phase_), values in report_.items():
+        table.add_row(
+            stage_,
+            phase_,
+            str(values['n']),
+            f"{values['p50']:.3f}",
+            f"{values['p95']:.3f}",
+            f"{values['total']:.3f}",
+        )
+    rich.print(table)
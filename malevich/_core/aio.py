@@ -0,0 +1,167 @@
+"""
+Asynchronous calls of Malevich Core
+
+Calls are made with the async variants of the Core API, so no thread is
+held while a request (e.g. a run that is waited for) is in flight. All
+coroutines of an event loop share a single HTTP session per credentials
+instead of opening a session for each request. Sessions are closed when
+the loop is shut down (e.g. at the end of :func:`asyncio.run`).
+"""
+import asyncio
+import base64
+import weakref
+from typing import Any, AsyncGenerator
+
+import aiohttp
+import malevich_coretools as core
+import malevich_coretools.funcs.funcs as f
+from malevich_coretools.secondary.const import WAIT_RESULT_TIMEOUT
+
+_sessions: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, str], aiohttp.ClientSession]
+] = weakref.WeakKeyDictionary()
+_closers: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, AsyncGenerator[None, None]
+] = weakref.WeakKeyDictionary()
+
+
+class _Borrowed:
+    # The Core API closes the session it is given once the request is done
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self.session = session
+
+    async def __aenter__(self) -> aiohttp.ClientSession:
+        return self.session
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+def _auth(auth: core.AUTH | None) -> tuple[str, str]:
+    if auth is None:
+        return core.Config.CORE_USERNAME, core.Config.CORE_PASSWORD
+    return tuple(auth)
+
+
+async def _close_on_shutdown() -> AsyncGenerator[None, None]:
+    # Started async generators are closed by the loop when it is shut
+    # down (see `loop.shutdown_asyncgens`), which closes the sessions
+    try:
+        yield
+    finally:
+        await close_sessions()
+
+
+def _loop_sessions() -> dict[tuple[str, str], aiohttp.ClientSession]:
+    loop = asyncio.get_running_loop()
+    if loop not in _closers:
+        closer = _close_on_shutdown()
+        try:
+            closer.asend(None).send(None)
+        except StopIteration:
+            pass
+        _closers[loop] = closer
+    return _sessions.setdefault(loop, {})
+
+
+def session(auth: core.AUTH | None = None) -> aiohttp.ClientSession:
+    """Returns the session shared within the running event loop
+
+    Credentials are bound to the session, so a session is kept for
+    each of them.
+    """
+    auth = _auth(auth)
+    sessions = _loop_sessions()
+    if auth not in sessions or sessions[auth].closed:
+        credentials = base64.b64encode(':'.join(auth).encode()).decode()
+        sessions[auth] = aiohttp.ClientSession(
+            headers={'Authorization': f'Basic {credentials}'},
+            connector=aiohttp.TCPConnector(ssl=False),
+            timeout=aiohttp.ClientTimeout(total=None),
+        )
+    return sessions[auth]
+
+
+async def close_sessions() -> None:
+    """Closes sessions of the running event loop"""
+    for session_ in _sessions.pop(asyncio.get_running_loop(), {}).values():
+        await session_.close()
+
+
+def _fields(kwargs: dict[str, Any]) -> dict[str, Any]:
+    # Arguments of the Core API are snake-cased fields of requests
+    return {
+        key.split('_')[0] + ''.join(x.title() for x in key.split('_')[1:]): value
+        for key, value in kwargs.items()
+    }
+
+
+async def task_run(
+    operation_id: str,
+    run_id: str,
+    cfg_id: str | None = None,
+    wait: bool = True,
+    with_show: bool | None = None,
+    long: bool = False,
+    long_timeout: int = WAIT_RESULT_TIMEOUT,
+    *,
+    auth: core.AUTH | None = None,
+    conn_url: str | None = None,
+    **kwargs,
+) -> str | core.AppLogs:
+    """Runs the task, see :func:`malevich_coretools.task_run`"""
+    if kwargs.get('schedule') is not None:
+        kwargs['schedule'].validate()
+    data = core.RunTask(
+        operationId=operation_id, runId=run_id, cfgId=cfg_id, **_fields(kwargs)
+    )
+    return await f.post_manager_task_run_async(
+        data,
+        with_show=data.withLogs if with_show is None else with_show,
+        long=long,
+        long_timeout=long_timeout,
+        wait=wait,
+        auth=auth,
+        conn_url=conn_url,
+        async_session=_Borrowed(session(auth)),
+    )
+
+
+async def task_stop(
+    operation_id: str,
+    with_show: bool | None = None,
+    wait: bool = True,
+    *,
+    auth: core.AUTH | None = None,
+    conn_url: str | None = None,
+    **kwargs,
+) -> str | core.AppLogs | None:
+    """Stops the task, see :func:`malevich_coretools.task_stop`"""
+    data = core.StopOperation(operationId=operation_id, **_fields(kwargs))
+    return await f.post_manager_task_stop_async(
+        data,
+        with_show=data.withLogs if with_show is None else with_show,
+        wait=wait,
+        auth=auth,
+        conn_url=conn_url,
+        async_session=_Borrowed(session(auth)),
+    )
+
+
+async def logs(
+    operation_id: str,
+    run_id: str | None = None,
+    force: bool = True,
+    with_show: bool = True,
+    *,
+    auth: core.AUTH | None = None,
+    conn_url: str | None = None,
+) -> core.AppLogs:
+    """Fetches logs of the run, see :func:`malevich_coretools.logs`"""
+    return await f.get_manager_logs_async(
+        core.LogsTask(operationId=operation_id, runId=run_id, force=force),
+        with_show=with_show,
+        auth=auth,
+        conn_url=conn_url,
+        async_session=_Borrowed(session(auth)),
+    )
@@ -0,0 +1,152 @@
+"""
+Structural comparison of pipelines and configurations
+stored on Malevich Core with the locally interpreted ones
+
+"""
+import json
+from typing import Any
+
+import malevich_coretools as core
+from pydantic import BaseModel
+
+
+def _normalize(key: str, value: Any) -> Any:  # noqa: ANN401
+    # Configurations are stored as JSON strings, so the
+    # order of keys should not be treated as a change
+    if key == 'cfg' and isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value
+    return value
+
+
+def _dump(model: BaseModel | None) -> dict[str, Any]:
+    if model is None:
+        return {}
+    return {
+        k: _normalize(k, v)
+        for k, v in model.model_dump(exclude_none=True).items()
+    }
+
+
+def _dump_list(values: list | None) -> list:
+    return [_dump(x) if isinstance(x, BaseModel) else x for x in values or []]
+
+
+class EntriesDiff(BaseModel):
+    """Difference between two mappings of named entries"""
+
+    added: list[str] = []
+    removed: list[str] = []
+    changed: dict[str, list[str]] = {}
+    """Mapping of entry names to names of their changed fields"""
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    @staticmethod
+    def compare(
+        local: dict[str, BaseModel | Any] | None,
+        remote: dict[str, BaseModel | Any] | None,
+    ) -> 'EntriesDiff':
+        local = local or {}
+        remote = remote or {}
+
+        changed = {}
+        for key in local.keys() & remote.keys():
+            lval, rval = local[key], remote[key]
+            if isinstance(lval, BaseModel) or isinstance(rval, BaseModel):
+                ldump = _dump(lval) if isinstance(lval, BaseModel) else {}
+                rdump = _dump(rval) if isinstance(rval, BaseModel) else {}
+                fields = sorted(
+                    f for f in ldump.keys() | rdump.keys()
+                    if ldump.get(f) != rdump.get(f)
+                )
+                if fields:
+                    changed[key] = fields
+            elif isinstance(lval, list) or isinstance(rval, list):
+                if _dump_list(lval) != _dump_list(rval):
+                    changed[key] = []
+            elif lval != rval:
+                changed[key] = []
+
+        return EntriesDiff(
+            added=sorted(local.keys() - remote.keys()),
+            removed=sorted(remote.keys() - local.keys()),
+            changed=changed,
+        )
+
+
+class PipelineDiff(BaseModel):
+    """Difference between a local pipeline and the one deployed on Core"""
+
+    processors: EntriesDiff = EntriesDiff()
+    conditions: EntriesDiff = EntriesDiff()
+    results: EntriesDiff = EntriesDiff()
+    collections: EntriesDiff = EntriesDiff()
+    """Difference in collections of the configuration"""
+
+    @property
+    def pipeline_changed(self) -> bool:
+        """Whether the pipeline itself should be pushed to Core"""
+        return not (
+            self.processors.is_empty
+            and self.conditions.is_empty
+            and self.results.is_empty
+        )
+
+    @property
+    def cfg_changed(self) -> bool:
+        return not self.collections.is_empty
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.pipeline_changed and not self.cfg_changed
+
+    def changed_apps(self) -> set[str]:
+        """Aliases of processors and conditions that should be re-deployed"""
+        return {
+            *self.processors.added,
+            *self.processors.changed.keys(),
+            *self.conditions.added,
+            *self.conditions.changed.keys(),
+        }
+
+    def summary(self) -> str:
+        parts = []
+        for name in ('processors', 'conditions', 'results', 'collections'):
+            entries: EntriesDiff = getattr(self, name)
+            if entries.is_empty:
+                continue
+            parts.append(
+                f"{name}: +{len(entries.added)} "
+                f"-{len(entries.removed)} "
+                f"~{len(entries.changed)}"
+            )
+        return ', '.join(parts) or 'no changes'
+
+
+def diff_pipelines(
+    local: core.Pipeline,
+    remote: core.Pipeline,
+    local_cfg: core.Cfg | None = None,
+    remote_cfg: core.Cfg | None = None,
+) -> PipelineDiff:
+    """Computes a structural difference between two pipelines
+
+    Processors and conditions are compared field by field, with
+    configurations compared as parsed JSON. Collections of
+    configurations are compared only if both are provided.
+    """
+    diff = PipelineDiff(
+        processors=EntriesDiff.compare(local.processors, remote.processors),
+        conditions=EntriesDiff.compare(local.conditions, remote.conditions),
+        results=EntriesDiff.compare(local.results, remote.results),
+    )
+    if local_cfg is not None and remote_cfg is not None:
+        diff.collections = EntriesDiff.compare(
+            local_cfg.collections, remote_cfg.collections
+        )
+    return diff
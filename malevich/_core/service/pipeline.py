@@ -17,7 +17,12 @@ def map_real_pipeline_id(fn):
     def wrapper(id, *args, **kwargs):
         real_id = None
         return fn(
-            id=real_id or (real_id := _get_real_id(api.get_pipelines_map(), id)),
+            id=real_id or (real_id := _get_real_id(
+                api.get_pipelines_map(
+                    auth=kwargs.get('auth'), conn_url=kwargs.get('conn_url')
+                ),
+                id,
+            )),
             *args,
             **kwargs
         )
@@ -1,2 +1,9 @@
 from .credentials import get_cached_users, cache_user
 from .get_db import get_db
+from .telemetry import (
+    get_label_percentiles,
+    get_stage_percentiles,
+    get_stage_timings,
+    record_stage_timings,
+)
+from .snapshots import drop_snapshots, get_snapshot, put_snapshot
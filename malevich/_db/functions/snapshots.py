@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from ..schema import CoreSnapshot
+from .get_db import get_db
+
+
+def get_snapshot(
+    host: str,
+    user: str,
+    pipeline_hash: str,
+    kind: str,
+    ttl: float,
+) -> str | None:
+    """Returns a payload of the snapshot if it is not older than `ttl` seconds
+
+    Snapshots are stored per Core host and user, so different
+    credentials never share them
+    """
+    session = get_db()
+    snapshot: CoreSnapshot = session.query(CoreSnapshot).filter(
+        CoreSnapshot.host == host,
+        CoreSnapshot.user == user,
+        CoreSnapshot.pipeline_hash == pipeline_hash,
+        CoreSnapshot.kind == kind,
+    ).one_or_none()
+    session.close()
+
+    if snapshot is None:
+        return None
+    if (datetime.now() - snapshot.fetched_at).total_seconds() > ttl:
+        return None
+    return snapshot.payload
+
+
+def put_snapshot(
+    host: str,
+    user: str,
+    pipeline_hash: str,
+    kind: str,
+    payload: str,
+) -> None:
+    session = get_db()
+    snapshot: CoreSnapshot = session.query(CoreSnapshot).filter(
+        CoreSnapshot.host == host,
+        CoreSnapshot.user == user,
+        CoreSnapshot.pipeline_hash == pipeline_hash,
+        CoreSnapshot.kind == kind,
+    ).one_or_none()
+    if not snapshot:
+        session.add(
+            CoreSnapshot(
+                host=host,
+                user=user,
+                pipeline_hash=pipeline_hash,
+                kind=kind,
+                payload=payload,
+                fetched_at=datetime.now(),
+            )
+        )
+    else:
+        snapshot.payload = payload
+        snapshot.fetched_at = datetime.now()
+    session.commit()
+    session.close()
+
+
+def drop_snapshots(
+    host: str,
+    user: str,
+    pipeline_hash: str,
+    kind: str | None = None,
+) -> None:
+    session = get_db()
+    query = session.query(CoreSnapshot).filter(
+        CoreSnapshot.host == host,
+        CoreSnapshot.user == user,
+        CoreSnapshot.pipeline_hash == pipeline_hash,
+    )
+    if kind is not None:
+        query = query.filter(CoreSnapshot.kind == kind)
+    query.delete()
+    session.commit()
+    session.close()
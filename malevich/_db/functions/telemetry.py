@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Any, Literal
+
+from ..schema import StageTiming
+from .get_db import get_db
+
+
+def record_stage_timings(timings: list[dict[str, Any]]) -> None:
+    """Stores measurements in a single transaction
+
+    Each measurement is a mapping with fields of :class:`StageTiming`.
+    """
+    with get_db() as session:
+        session.add_all([StageTiming(**timing) for timing in timings])
+        session.commit()
+
+
+def get_stage_timings(
+    pipeline_hash: str | None = None,
+    stage: str | None = None,
+    since: datetime | None = None,
+) -> list[StageTiming]:
+    with get_db() as session:
+        query = session.query(StageTiming)
+        if pipeline_hash is not None:
+            query = query.filter(StageTiming.pipeline_hash == pipeline_hash)
+        if stage is not None:
+            query = query.filter(StageTiming.stage == stage)
+        if since is not None:
+            query = query.filter(StageTiming.started_at >= since)
+        return query.order_by(StageTiming.started_at).all()
+
+
+def _percentile(values: list[float], q: float) -> float:
+    # Linear interpolation between closest ranks, `values` must be sorted
+    if len(values) == 1:
+        return values[0]
+    rank = (len(values) - 1) * q / 100
+    lo = int(rank)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (rank - lo)
+
+
+def get_stage_percentiles(
+    pipeline_hash: str | None = None,
+    stage: str | None = None,
+    since: datetime | None = None,
+    percentiles: tuple[float, ...] = (50, 95),
+) -> dict[tuple[str, str], dict[str, float]]:
+    """Aggregates recorded durations per (stage, phase)
+
+    Only successful measurements are taken into account.
+
+    Returns:
+        A mapping from (stage, phase) to a dictionary with
+        `n`, `total` and `p<q>` keys for each requested percentile.
+    """
+    grouped: dict[tuple[str, str], list[float]] = {}
+    for timing in get_stage_timings(pipeline_hash, stage, since):
+        if not timing.succeeded:
+            continue
+        grouped.setdefault((timing.stage, timing.phase), []).append(timing.duration)
+
+    report = {}
+    for key, durations in grouped.items():
+        durations.sort()
+        report[key] = {
+            'n': len(durations),
+            'total': sum(durations),
+            **{f'p{q:g}': _percentile(durations, q) for q in percentiles}
+        }
+    return report
+
+
+def get_label_percentiles(
+    pipeline_hash: str | None = None,
+    stage: str | None = None,
+    since: datetime | None = None,
+    percentile: float = 50,
+    by: Literal['label', 'phase'] = 'label',
+) -> dict[str, float]:
+    """Aggregates recorded durations per label (e.g. alias of the node)
+
+    Only successful and labeled measurements are taken into account.
+
+    Args:
+        by (str): Field to group measurements by. Durations of processors
+            are labeled with the alias and phased with the processor id.
+
+    Returns:
+        A mapping from label to the requested percentile of durations.
+    """
+    grouped: dict[str, list[float]] = {}
+    for timing in get_stage_timings(pipeline_hash, stage, since):
+        key = getattr(timing, by)
+        if not timing.succeeded or timing.label is None or key is None:
+            continue
+        grouped.setdefault(key, []).append(timing.duration)
+
+    return {
+        label: _percentile(sorted(durations), percentile)
+        for label, durations in grouped.items()
+    }
@@ -1,2 +1,4 @@
 from .base import Base
-from .creds import CachedCredentials
\ No newline at end of file
+from .creds import CachedCredentials
+from .telemetry import StageTiming
+from .snapshots import CoreSnapshot
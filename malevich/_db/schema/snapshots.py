@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Integer, Sequence, String
+
+from .base import Base
+
+
+class CoreSnapshot(Base):
+    __tablename__ = 'core_snapshots'
+
+    id = Column(Integer, Sequence('core_snapshots_seq'), primary_key=True)
+    host = Column(String(255))
+    user = Column(String(255))
+    pipeline_hash = Column(String(64), index=True)
+    kind = Column(String(32))
+    payload = Column(String)
+    fetched_at = Column(DateTime)
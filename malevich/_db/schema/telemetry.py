@@ -0,0 +1,20 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, Sequence, String
+
+from .base import Base
+
+
+class StageTiming(Base):
+    __tablename__ = 'stage_timings'
+
+    id = Column(Integer, Sequence('stage_timings_seq'), primary_key=True)
+    pipeline_hash = Column(String(64), index=True)
+    task_id = Column(String(255), nullable=True)
+    run_id = Column(String(255), nullable=True)
+    stage = Column(String(32))
+    phase = Column(String(64))
+    label = Column(String(255), nullable=True)
+    started_at = Column(DateTime)
+    duration = Column(Float)
+    size = Column(Integer, nullable=True)
+    count = Column(Integer, nullable=True)
+    succeeded = Column(Boolean, default=True)
@@ -3,6 +3,7 @@ from .collection import collection
 from .flow import flow
 from .run import run
 from .document import document
+from .template import FlowTemplate
 
 __all__ = [
     "AssetFactory",
@@ -10,4 +11,5 @@ __all__ = [
     "flow",
     "run",
     "document",
+    "FlowTemplate",
 ]
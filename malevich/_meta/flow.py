@@ -20,6 +20,7 @@ from malevich.types import TracedNode, TracedNodes
 from .._ast import boot_flow
 from ..models.nodes.morph import MorphNode
 from .collection import collection
+from .trace_cache import TraceCache, trace_key
 
 T = TypeVar("T")
 FlowDecoratorReturn = PromisedTask | TracedNode | TracedNodes
@@ -44,6 +45,7 @@ def flow(
     name: Optional[str] = None,
     description: Optional[str] = None,
     dfs_are_collections: Optional[bool] = None,
+    trace_cache: Optional[bool] = None,
 ) -> Callable[[Callable[Args, T]], FlowFunction[Args, FlowDecoratorReturn]]:
     pass
 
@@ -53,6 +55,7 @@ def flow(
     reverse_id: Optional[str] = None,
     name: Optional[str] = None,
     description: Optional[str] = None,
+    trace_cache: Optional[bool] = None,
     **kwargs: Any,
 ) -> Callable[[Callable[Args, T]], FlowFunction[Args, FlowDecoratorReturn]]:
     """Converts a function into a flow
@@ -70,6 +73,7 @@ def flow(
         name (str, optional): Name of the flow. Defaults to None.
         description (str, optional): Description of the flow. Defaults to None.
         dfs_are_collections (bool, optional): Whether to treat pandas.DataFrame as a collection. Defaults to False.
+        trace_cache (bool, optional): Whether to persist traced flows and reuse them across processes. Defaults to the value of `MALEVICH_TRACE_CACHE` environment variable. See :mod:`malevich._meta.trace_cache`.
         **kwargs (Any):
             Additional arguments to be passed to the flow component.
             See :class:`malevich_space.schema.ComponentSchema` for details.
@@ -131,6 +135,14 @@ def flow(
         @wraps(function)
         def fn(*args: Args.args, __component, **kwargs: Args.kwargs) -> FlowDecoratorReturn:
             is_subflow = Flow.isinflow()
+            cache_key = None
+            if not is_subflow and TraceCache.enabled(trace_cache):
+                cache_key = trace_key(function, args, kwargs, __component)
+                if cache_key is not None:
+                    cached = TraceCache().get(cache_key)
+                    if cached is not None:
+                        return cached
+
             args = list(args)
             if is_subflow:
                 outer_tracer = traced()
@@ -319,9 +331,12 @@ def flow(
                 return outputs if len(outputs) > 1 else outputs[0]
             else:
                 # Save t_node.tree
-                return PromisedTask(
+                task = PromisedTask(
                     results=__results, tree=t_node, component=__component
                 )
+                if cache_key is not None:
+                    TraceCache().put(cache_key, task)
+                return task
 
         return FlowFunction(fn, reverse_id, function_name, description, **kwargs)
 
@@ -0,0 +1,223 @@
+import json
+from typing import Any, Iterable
+
+import pandas as pd
+
+from malevich._autoflow import ExecutionTree, traced, tracedLike
+from malevich._utility import pd_to_json_schema
+from malevich.models import (
+    BaseNode,
+    Collection,
+    CollectionNode,
+    OperationNode,
+    PromisedTask,
+)
+
+
+class FlowTemplate:
+    """A flow traced once and instantiated with different inputs
+
+    The template holds the structure of the flow traced with placeholder
+    inputs. Instances share this structure: binding an input only replaces
+    the edges and results that reference the bound node. Operations are
+    copied for each instance, as interpreters modify their nodes (e.g.
+    assign aliases), so instances can be interpreted concurrently.
+
+    Templates are created with :meth:`FlowFunction.template`:
+
+    .. code-block:: python
+
+        template = my_flow.template()
+        for df in frames:
+            task = template.instantiate(df)
+            task.interpret()
+            task()
+
+    Only nodes at the top level of the flow can be bound, nodes inside
+    subflows are shared by all instances.
+    """
+
+    def __init__(self, task: PromisedTask, arguments: Iterable[str]) -> None:
+        if not isinstance(task, PromisedTask):
+            raise TypeError(
+                "Flow templates can only be created outside of other flows"
+            )
+        self.task = task
+        self.arguments = list(arguments)
+
+        tree: ExecutionTree = task.tree.tree
+        self._edges = list(tree.tree)
+        self._nodes = set(tree.nodes_)
+        self._node_map = tree._node_map
+        self._edge_map = tree._edge_map
+
+        # Positions of nodes in edges, by alias and by uuid
+        self._slots: dict[str, list[tuple[int, int]]] = {}
+        self._owners: dict[str, BaseNode] = {}
+        for i, edge in enumerate(self._edges):
+            for pos in (0, 1):
+                owner = edge[pos].owner
+                for key in {owner.uuid, owner.alias} - {None}:
+                    self._slots.setdefault(key, []).append((i, pos))
+                    self._owners.setdefault(key, owner)
+        self._members: dict[str, list[traced[BaseNode]]] = {}
+        for node in self._nodes:
+            self._members.setdefault(node.owner.uuid, []).append(node)
+            for key in {node.owner.uuid, node.owner.alias} - {None}:
+                self._owners.setdefault(key, node.owner)
+
+        self._operations = {
+            owner.uuid: owner
+            for owner in self._owners.values()
+            if isinstance(owner, OperationNode)
+        }
+
+        for name in self.arguments:
+            if not isinstance(self._owners.get(name), CollectionNode):
+                raise ValueError(
+                    f"Argument `{name}` of the flow is not found in the traced "
+                    "flow. Flow templates require all arguments to be collections."
+                )
+
+    def _owner(self, key: str, type_: type[BaseNode] = BaseNode) -> BaseNode:
+        owner = self._owners.get(key)
+        if owner is None:
+            raise KeyError(
+                f"Node `{key}` is not found at the top level of the flow"
+            )
+        if not isinstance(owner, type_):
+            raise TypeError(
+                f"Node `{key}` is {type(owner).__name__}, "
+                f"expected {type_.__name__}"
+            )
+        return owner
+
+    @staticmethod
+    def _collection(owner: CollectionNode, df: pd.DataFrame) -> CollectionNode:
+        return CollectionNode(
+            collection=Collection(
+                collection_id=owner.collection.collection_id,
+                collection_data=df,
+                persistent=owner.collection.persistent,
+            ),
+            scheme=json.dumps(pd_to_json_schema(df)),
+            alias=owner.alias,
+        )
+
+    def instantiate(
+        self,
+        *args: pd.DataFrame,
+        config: dict[str, dict[str, Any]] | None = None,
+        nodes: dict[str, BaseNode | traced[BaseNode]] | None = None,
+        **kwargs: pd.DataFrame,
+    ) -> PromisedTask:
+        """Creates a task from the template
+
+        Inputs that are not bound keep the data the template
+        was traced with.
+
+        Args:
+            *args, **kwargs (pd.DataFrame): Data for arguments of the flow
+            config (dict[str, dict], optional): New configurations of
+                operations, keyed by their aliases. A configuration
+                replaces the traced one.
+            nodes (dict[str, BaseNode], optional): Nodes (e.g. assets) to
+                replace the ones with given aliases
+
+        Returns:
+            PromisedTask: A new task sharing the structure of the template
+        """
+        if len(args) > len(self.arguments):
+            raise TypeError(
+                f"Flow takes {len(self.arguments)} arguments, "
+                f"but {len(args)} were given"
+            )
+        bound = {**dict(zip(self.arguments, args)), **kwargs}
+
+        # Old owners to new ones
+        replaced: dict[str, BaseNode] = {}
+        for name, df in bound.items():
+            if name not in self.arguments:
+                raise TypeError(f"Unexpected argument `{name}`")
+            if not isinstance(df, pd.DataFrame):
+                raise TypeError(f"Argument `{name}` should be a DataFrame")
+            owner = self._owner(name, CollectionNode)
+            replaced[owner.uuid] = self._collection(owner, df)
+
+        for uuid, owner in self._operations.items():
+            replaced[uuid] = owner.model_copy()
+
+        for alias, config_ in (config or {}).items():
+            owner = self._owner(alias, OperationNode)
+            # Operations keep their uuids, as conditions refer to them
+            replaced[owner.uuid] = owner.model_copy(update={'config': config_})
+
+        for alias, node in (nodes or {}).items():
+            owner = self._owner(alias)
+            node = node.owner if isinstance(node, traced) else node
+            if type(node) is not type(owner):
+                raise TypeError(
+                    f"Node `{alias}` is {type(owner).__name__}, "
+                    f"cannot replace it with {type(node).__name__}"
+                )
+            replaced[owner.uuid] = node.model_copy(update={'alias': owner.alias})
+
+        tracers: dict[int, traced[BaseNode]] = {}
+
+        def _tracer(old: traced[BaseNode]) -> traced[BaseNode]:
+            # Each copy of the node (e.g. subindexed outputs) is replaced
+            # with its own copy of the new node
+            if id(old.owner) not in tracers:
+                new = replaced[old.owner.uuid]
+                if isinstance(old.owner, OperationNode):
+                    new = new.model_copy(update={'subindex': old.owner.subindex})
+                tracers[id(old.owner)] = tracedLike(new)
+            return tracers[id(old.owner)]
+
+        edges = list(self._edges)
+        for uuid in replaced:
+            for i, pos in self._slots.get(uuid, ()):
+                edge = list(edges[i])
+                edge[pos] = _tracer(edge[pos])
+                edges[i] = tuple(edge)
+
+        nodes_ = set(self._nodes)
+        for uuid in replaced:
+            for node in self._members.get(uuid, ()):
+                nodes_.discard(node)
+                _tracer(node)
+        nodes_.update(tracers.values())
+
+        tree = ExecutionTree()
+        tree.tree = edges
+        tree.nodes_ = nodes_
+        tree._node_map = {**self._node_map}
+        tree._edge_map = {**self._edge_map}
+
+        results = self._substitute(self.task.returned, replaced, _tracer)
+        return PromisedTask(
+            results=results,
+            tree=self.task.tree.model_copy(
+                update={'tree': tree, 'results': results or []}
+            ),
+            component=self.task._component,
+        )
+
+    @staticmethod
+    def _substitute(
+        obj: Any,  # noqa: ANN401
+        replaced: dict[str, BaseNode],
+        tracer: Any,  # noqa: ANN401
+    ) -> Any:  # noqa: ANN401
+        if isinstance(obj, traced):
+            return tracer(obj) if obj.owner.uuid in replaced else obj
+        if isinstance(obj, (list, tuple)):
+            return type(obj)(
+                FlowTemplate._substitute(x, replaced, tracer) for x in obj
+            )
+        if isinstance(obj, dict):
+            return {
+                k: FlowTemplate._substitute(v, replaced, tracer)
+                for k, v in obj.items()
+            }
+        return obj
@@ -0,0 +1,186 @@
+"""
+Persistent cache of traced flows
+
+Tracing a flow parses its source and executes it to build the execution
+tree. The cache stores traced flows (see :meth:`PromisedTask.dump`) under
+`flows/traces` group of the Core cache, so other processes can load
+a ready task instead of tracing the flow again.
+
+The key of the entry combines:
+
+- the source of the flow function and of the file it is defined in,
+- versions of malevich and Python and the manifest with installed packages,
+- fingerprints of the arguments of the flow.
+
+Flows may depend on things not covered by the key (e.g. files read
+while tracing), so the cache is opt-in: pass `trace_cache=True` to
+:func:`flow` or set `MALEVICH_TRACE_CACHE` environment variable.
+
+Entries are signed (see :mod:`malevich._utility.cache.signing`), and
+entries with invalid signatures are dropped without being loaded.
+"""
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import threading
+from functools import cache
+from typing import Any, Callable
+
+import pandas as pd
+
+from malevich._dev.singleton import SingletonMeta
+from malevich._utility.cache.manager import CacheManager
+from malevich._utility.cache.signing import sign, verify
+from malevich._utility.malevich_version import get_malevich_version
+from malevich.models import PromisedTask
+from malevich.path import Paths
+
+
+def _file_digest(path: str | None) -> str | None:
+    if path is None or not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as file_:
+        return hashlib.sha256(file_.read()).hexdigest()
+
+
+@cache
+def _environment() -> list:
+    manifest = Paths.pwd('malevich.yaml')
+    if not os.path.exists(manifest):
+        manifest = Paths.home('malevich.yaml')
+    try:
+        version = get_malevich_version()
+    except OSError:
+        version = None
+    return [version, list(sys.version_info[:2]), _file_digest(manifest)]
+
+
+def _fingerprint(value: Any) -> str | None:  # noqa: ANN401
+    hash_ = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        hash_.update(json.dumps(
+            [list(map(str, value.columns)), list(map(str, value.dtypes))]
+        ).encode())
+        try:
+            hash_.update(
+                pd.util.hash_pandas_object(value, index=True).values.tobytes()
+            )
+        except TypeError:
+            # Unhashable cells (e.g. lists)
+            hash_.update(pickle.dumps(value))
+        return hash_.hexdigest()
+    try:
+        hash_.update(pickle.dumps(value))
+    except Exception:
+        return None
+    return hash_.hexdigest()
+
+
+def trace_key(
+    function: Callable,
+    args: tuple,
+    kwargs: dict[str, Any],
+    component: Any = None,  # noqa: ANN401
+) -> str | None:
+    """Computes a key of the traced flow
+
+    Returns:
+        str | None: The key or None if the flow or its arguments
+            cannot be fingerprinted
+    """
+    try:
+        source = inspect.getsource(function)
+        source_file = inspect.getsourcefile(function)
+    except (OSError, TypeError):
+        return None
+
+    arguments = [_fingerprint(x) for x in args]
+    arguments += [[k, _fingerprint(v)] for k, v in sorted(kwargs.items())]
+    if any(x is None or (isinstance(x, list) and x[1] is None) for x in arguments):
+        return None
+
+    return hashlib.sha256(
+        json.dumps([
+            function.__module__,
+            function.__qualname__,
+            hashlib.sha256(source.encode()).hexdigest(),
+            _file_digest(source_file),
+            _environment(),
+            arguments,
+            component.model_dump_json() if component is not None else None,
+        ]).encode()
+    ).hexdigest()
+
+
+class TraceCache(metaclass=SingletonMeta):
+    """Stores traced flows in memory and on disk"""
+
+    entry_group = 'flows/traces'
+
+    def __init__(self) -> None:
+        self._memory: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled(flag: bool | None = None) -> bool:
+        if flag is not None:
+            return flag
+        return os.getenv('MALEVICH_TRACE_CACHE', '').lower() in ('1', 'true', 'yes')
+
+    def _path(self, key: str) -> str:
+        return CacheManager().core.get_entry_path(key + '.mlvt', self.entry_group)
+
+    def get(self, key: str) -> PromisedTask | None:
+        with self._lock:
+            payload = self._memory.get(key)
+        if payload is None:
+            try:
+                with open(self._path(key), 'rb') as file_:
+                    payload = file_.read()
+            except OSError:
+                return None
+            with self._lock:
+                self._memory[key] = payload
+        body = verify(payload)
+        if body is None:
+            self.drop(key)
+            return None
+        try:
+            # Each call produces a new task, as tasks are mutable
+            return PromisedTask.load(body)
+        except Exception:
+            self.drop(key)
+            return None
+
+    def put(self, key: str, task: PromisedTask) -> None:
+        try:
+            payload = sign(task.dump())
+        except Exception:
+            # Flows with unserializable objects are not cached
+            return
+        with self._lock:
+            self._memory[key] = payload
+        try:
+            CacheManager().core.write_entry(
+                payload,
+                entry_name=key + '.mlvt',
+                entry_group=self.entry_group,
+                force_overwrite=True,
+            )
+        except OSError:
+            pass
+
+    def drop(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
@@ -1,7 +1,7 @@
 from .registry import Registry
 from .get_space_leaves import get_space_leaves
 from .upload_zip_asset import upload_zip_asset
-from .schema import pd_to_json_schema, generate_empty_df_from_schema
+from .schema import pd_to_json_schema, generate_empty_df_from_schema, df_to_docs
 from .tree import unwrap_tree, deflat_edges
 from .space import (
     get_auto_ops,
@@ -19,4 +19,4 @@ from .flow_stub import FlowStub
 from .package import PackageManager, package_manager
 from .stub import Stub, StubFunction, StubIndex, StubSchema
 from .unique import unique
-
+from .aio import background_loop, io_executor, run_blocking, run_sync
@@ -0,0 +1,89 @@
+"""
+Running blocking calls from coroutines
+
+Requests to Core that are long (runs, stops, logs) are made with the
+async Core API (see `malevich._core.aio`). Composite helpers that exist
+only in blocking form (uploads, references to objects on Core) run in a
+shared pool of threads instead, so the event loop keeps serving other
+coroutines while they are in flight. The size of the pool can be set
+with `MALEVICH_IO_WORKERS` environment variable.
+
+Synchronous wrappers of coroutines run them on a single shared event
+loop living in a background thread instead of creating a loop per call.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, ParamSpec, TypeVar
+
+P = ParamSpec('P')
+R = TypeVar('R')
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def io_executor() -> ThreadPoolExecutor:
+    """Returns the shared pool for blocking I/O"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('MALEVICH_IO_WORKERS', 16)),
+                thread_name_prefix='malevich-io',
+            )
+        return _executor
+
+
+async def run_blocking(fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+    """Runs a blocking function in the shared pool without blocking the loop
+
+    The function runs in a copy of the current context, so context
+    variables (e.g. the active flow) are preserved.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        io_executor(), functools.partial(context.run, fn, *args, **kwargs)
+    )
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Returns the shared event loop running in a background thread"""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever,
+                name='malevich-loop',
+                daemon=True,
+            ).start()
+        return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, R]) -> R:
+    """Runs a coroutine to completion from synchronous code
+
+    The coroutine is scheduled on the shared background loop, so the
+    function may be called both with and without a running event loop
+    in the current thread.
+    """
+    loop = background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError(
+            "Synchronous call from a coroutine running on the background "
+            "loop would block it forever. Await the coroutine instead."
+        )
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
@@ -0,0 +1,55 @@
+"""
+Signing of cache entries
+
+Entries that are unpickled when read are signed with HMAC-SHA256 using
+a key private to the user (`.cache_key` in Malevich home). Entries that
+were not written by this user, or were modified after writing, fail the
+check and are never unpickled.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+from functools import cache
+
+from malevich.path import Paths
+
+_KEY_SIZE = 32
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+@cache
+def _key() -> bytes:
+    path = Paths.home('.cache_key')
+    try:
+        with open(path, 'rb') as file_:
+            key = file_.read()
+        if len(key) == _KEY_SIZE:
+            return key
+    except OSError:
+        pass
+
+    key = secrets.token_bytes(_KEY_SIZE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    except OSError:
+        # The key cannot be persisted, entries are valid for this process
+        return key
+    with os.fdopen(fd, 'wb') as file_:
+        file_.write(key)
+    return key
+
+
+def sign(payload: bytes) -> bytes:
+    """Prepends the signature to the payload"""
+    return hmac.new(_key(), payload, hashlib.sha256).digest() + payload
+
+
+def verify(data: bytes) -> bytes | None:
+    """Returns the payload if the signature is valid, None otherwise"""
+    digest, payload = data[:_DIGEST_SIZE], data[_DIGEST_SIZE:]
+    expected = hmac.new(_key(), payload, hashlib.sha256).digest()
+    if len(digest) != _DIGEST_SIZE or not hmac.compare_digest(digest, expected):
+        return None
+    return payload
@@ -1,23 +1,37 @@
 import logging
+from contextvars import ContextVar
 
 from malevich.core_api import set_logger
 
 logger = logging.getLogger('malevich.core')
-handles = [*logger.handlers]
 set_logger(logger)
 
+_silenced: ContextVar[int] = ContextVar('malevich_core_logs_silenced', default=0)
+
+
+class _SilencedFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return _silenced.get() == 0
+
+
+logger.addFilter(_SilencedFilter())
+
+
 class IgnoreCoreLogs:
-    def __enter__(self, *args):
-        logger.setLevel(logging.CRITICAL + 1)
-        logger.handlers = []
-        logger.propagate = False
-        set_logger(logger)
+    """Silences logs of the Core API within the block
+
+    Logs are silenced only in the current context: other threads and
+    coroutines keep logging while the block is active. Blocks may be
+    nested, and calls made with :func:`run_blocking` from the block are
+    silenced as well.
+    """
 
+    def __init__(self) -> None:
+        self._tokens = []
+
+    def __enter__(self, *args) -> 'IgnoreCoreLogs':
+        self._tokens.append(_silenced.set(_silenced.get() + 1))
         return self
 
     def __exit__(self, *args) -> None:
-        logger.setLevel(logging.NOTSET)
-        logger.handlers = handles
-        logger.propagate = True
-        set_logger(logger)
-
+        _silenced.reset(self._tokens.pop())
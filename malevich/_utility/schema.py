@@ -29,3 +29,18 @@ def generate_empty_df_from_schema(schema: dict | None) -> pd.DataFrame:
     else:
         columns = []
     return pd.DataFrame(columns=columns)
+
+
+def df_to_docs(df: pd.DataFrame) -> list[str]:
+    """Serializes rows of the frame into JSON documents
+
+    Serializes the whole frame at once instead of row by row with
+    `[row.to_json() for _, row in df.iterrows()]`. Documents differ from
+    the row-by-row ones in types only: values keep types of their columns,
+    so integers in a row with floats stay integers (`1`, not `1.0`).
+    """
+    if len(df.index) == 0:
+        return []
+    if len(df.columns) == 0:
+        return ['{}'] * len(df.index)
+    return df.to_json(orient='records', lines=True).splitlines()
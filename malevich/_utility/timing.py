@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterator
+
+logger = logging.getLogger('malevich.timing')
+
+
+class StageMeasure:
+    """A single measurement of the task stage
+
+    Fields can be updated within the measured block, e.g. to
+    report the size of uploaded data or the pipeline hash that
+    becomes known only after the stage is finished.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        phase: str,
+        pipeline_hash: str | None = None,
+        task_id: str | None = None,
+        run_id: str | None = None,
+        label: str | None = None,
+        size: int | None = None,
+        count: int | None = None,
+    ) -> None:
+        self.stage = stage
+        self.phase = phase
+        self.pipeline_hash = pipeline_hash
+        self.task_id = task_id
+        self.run_id = run_id
+        self.label = label
+        self.size = size
+        self.count = count
+
+
+class StageTimer:
+    """Measures stages of the task lifecycle
+
+    Measurements are kept in memory and written to the local database
+    at once by :meth:`flush`, so the database is opened once per stage
+    of the task instead of once per measurement. Measuring is thread-safe.
+
+    Recording is opt-in: set `MALEVICH_TELEMETRY` environment variable
+    to enable it. Failures to write measurements are logged and never
+    propagated.
+    """
+
+    def __init__(
+        self,
+        pipeline_hash: str | None = None,
+        task_id: str | None = None,
+        run_id: str | None = None,
+    ) -> None:
+        self.pipeline_hash = pipeline_hash
+        self.task_id = task_id
+        self.run_id = run_id
+        self._records: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return os.getenv('MALEVICH_TELEMETRY', '').lower() in ('1', 'true', 'yes')
+
+    @property
+    def records(self) -> list[dict[str, Any]]:
+        """Measurements that are not flushed yet"""
+        with self._lock:
+            return list(self._records)
+
+    @contextmanager
+    def measure(
+        self,
+        stage: str,
+        phase: str,
+        label: str | None = None,
+        size: int | None = None,
+        count: int | None = None,
+    ) -> Iterator[StageMeasure]:
+        measure_ = StageMeasure(
+            stage=stage,
+            phase=phase,
+            pipeline_hash=self.pipeline_hash,
+            task_id=self.task_id,
+            run_id=self.run_id,
+            label=label,
+            size=size,
+            count=count,
+        )
+        started_at = datetime.now()
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            yield measure_
+            succeeded = True
+        finally:
+            self._append(
+                measure_, started_at, time.perf_counter() - start, succeeded
+            )
+
+    def record(
+        self,
+        stage: str,
+        phase: str,
+        started_at: datetime,
+        duration: float,
+        label: str | None = None,
+        succeeded: bool = True,
+    ) -> None:
+        """Adds a measurement taken elsewhere, e.g. reported by Core"""
+        measure_ = StageMeasure(
+            stage=stage,
+            phase=phase,
+            pipeline_hash=self.pipeline_hash,
+            task_id=self.task_id,
+            run_id=self.run_id,
+            label=label,
+        )
+        self._append(measure_, started_at, duration, succeeded)
+
+    def _append(
+        self,
+        measure_: StageMeasure,
+        started_at: datetime,
+        duration: float,
+        succeeded: bool,
+    ) -> None:
+        if not self.enabled():
+            return
+        record = {
+            **vars(measure_),
+            'started_at': started_at,
+            'duration': duration,
+            'succeeded': succeeded,
+        }
+        with self._lock:
+            self._records.append(record)
+
+    def flush(self) -> None:
+        """Writes buffered measurements to the local database"""
+        with self._lock:
+            records, self._records = self._records, []
+        if not records:
+            return
+
+        from .._db import record_stage_timings
+
+        try:
+            record_stage_timings(records)
+        except Exception as e:
+            logger.debug(f'Failed to record {len(records)} stage timings: {e}')
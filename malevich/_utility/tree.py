@@ -1,50 +1,63 @@
+import weakref
+
 from malevich._autoflow import ExecutionTree, traced, tracedLike
 from malevich.models import ArgumentLink, BaseNode
 from ..models.nodes.morph import MorphNode
 from malevich.types import FlowTree
 
 MAX_DEFLAT_DEPTH = 1024
+
+
 def deflat_edges(
     link: ArgumentLink,
 ) -> list[tuple[ArgumentLink, traced[BaseNode]]]:
+    """Expands compressed edges of the link until no subflows are left
+
+    Edges are expanded depth-first in place, so the order of the
+    result follows the order of compressed edges. Runs in time linear
+    in the number of visited edges.
+    """
     from malevich.models import TreeNode
-    edges_ = link.compressed_edges
-    def _done(nodes_: tuple[ArgumentLink, traced[BaseNode]]) -> bool:
-        return all([not isinstance(n.owner, TreeNode) for _, n in nodes_])
-
-    i = 0
-    while not _done(edges_) and i < MAX_DEFLAT_DEPTH:
-        new_edges = []
-        for link, node in edges_:
-            if isinstance(node.owner, TreeNode) and link.compressed_edges is not None:
-                new_edges.extend(link.compressed_edges)
-            else:
-                new_edges.append((link, node))
-        edges_ = new_edges
-        i += 1
 
-    if i == MAX_DEFLAT_DEPTH:
-        raise RecursionError(
-            "Maximum recursion depth reached while deflating edges"
-        )
+    edges_ = []
+    stack = [(edge, 0) for edge in reversed(link.compressed_edges)]
+    while stack:
+        (link_, node), depth = stack.pop()
+        if isinstance(node.owner, TreeNode) and link_.compressed_edges is not None:
+            if depth + 1 >= MAX_DEFLAT_DEPTH:
+                raise RecursionError(
+                    "Maximum recursion depth reached while deflating edges"
+                )
+            stack.extend(
+                (edge, depth + 1) for edge in reversed(link_.compressed_edges)
+            )
+        else:
+            edges_.append((link_, node))
 
     return edges_
 
-def unwrap_tree(
-    tree: FlowTree,
-) -> FlowTree:
-    """Merges all subtrees into one tree
-
-    Args
-        tree (FlowTree): Tree of any depth
 
-    Returns:
-        FlowTree: Unwrapped tree
-    """
+def _demorph(node: traced[BaseNode]) -> traced[BaseNode]:
     from malevich.models import TreeNode
 
-    if len(tree.nodes_) == 1:
-        return tree
+    if not isinstance(node.owner, MorphNode):
+        return node
+    members = []
+    for conds, member in node.owner:
+        if isinstance(member, TreeNode):
+            member = member.underlying_node
+        members.append((conds, member))
+    node = tracedLike(MorphNode(members=members))
+    node.owner.correct_self()
+    return node
+
+
+def _unwrap_one(
+    tree: FlowTree,
+    unwrapped: dict[int, list[tuple]],
+) -> FlowTree:
+    """Unwraps a tree whose subflows are already unwrapped"""
+    from malevich.models import TreeNode
 
     edges = []
     unwraped = {}
@@ -54,7 +67,7 @@ def unwrap_tree(
         link = edge[2]
         if isinstance(v, TreeNode):
             if not unwraped.get(v.uuid, False):
-                for inner_edge in unwrap_tree(v.tree).traverse():
+                for inner_edge in unwrapped[id(v.tree)]:
                     if inner_edge[0] == link.shadow_collection:
                         continue
                     edges.append(inner_edge)
@@ -77,24 +90,107 @@ def unwrap_tree(
         else:
             edges.append(edge)
 
-    w_out_mophed_trees = []
-    for u, v, link in edges:
-        if isinstance(u.owner, MorphNode):
-            members = []
-            for conds, node in u.owner:
-                if isinstance(node, TreeNode):
-                    node = node.underlying_node
-                members.append((conds, node))
-            u = tracedLike(MorphNode(members=members))
-            u.owner.correct_self()
-        if isinstance(v.owner, MorphNode):
-            members = []
-            for conds, node in v.owner:
-                if isinstance(node, TreeNode):
-                    node = node.underlying_node
-                members.append((conds, node))
-            v = tracedLike(MorphNode(members=members))
-            v.owner.correct_self()
-        w_out_mophed_trees.append((u, v, link))
-
-    return ExecutionTree(w_out_mophed_trees)
+    return ExecutionTree([
+        (_demorph(u), _demorph(v), link) for u, v, link in edges
+    ])
+
+
+_unwrapped_trees: weakref.WeakKeyDictionary[
+    FlowTree, tuple[list, FlowTree]
+] = weakref.WeakKeyDictionary()
+
+
+def _structure(tree: FlowTree) -> list:
+    """Edges of the tree and of its subtrees, with the subtrees themselves
+
+    The structure is compared by identity of its items. Holding them
+    keeps their ids from being reused, and edits of the tree or its
+    subtrees (including ones keeping the number of edges) replace them.
+    """
+    from malevich.models import TreeNode
+
+    structure = []
+    seen = set()
+    stack = [tree]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        structure.append(current)
+        structure.append(current.tree)
+        for edge in current.tree:
+            structure.append(edge)
+            structure.extend(edge)
+            for node in edge[:2]:
+                if isinstance(node.owner, TreeNode):
+                    stack.append(node.owner.tree)
+    return structure
+
+
+def _memoized(tree: FlowTree) -> FlowTree | None:
+    entry = _unwrapped_trees.get(tree)
+    if entry is None:
+        return None
+    structure = _structure(tree)
+    if len(structure) == len(entry[0]) and all(
+        x is y for x, y in zip(structure, entry[0])
+    ):
+        return entry[1]
+    return None
+
+
+def _memoize(tree: FlowTree, result: FlowTree) -> None:
+    _unwrapped_trees[tree] = (_structure(tree), result)
+
+
+def unwrap_tree(
+    tree: FlowTree,
+) -> FlowTree:
+    """Merges all subtrees into one tree
+
+    Subtrees are unwrapped iteratively, from the innermost ones, and each
+    of them is unwrapped once, no matter how many times it is used. The
+    results are memoized until the tree is changed or collected.
+
+    Args
+        tree (FlowTree): Tree of any depth
+
+    Returns:
+        FlowTree: Unwrapped tree
+    """
+    from malevich.models import TreeNode
+
+    if len(tree.nodes_) == 1:
+        return tree
+
+    unwrapped: dict[int, list[tuple]] = {}
+    results: dict[int, FlowTree] = {}
+    stack = [tree]
+    while stack:
+        current = stack[-1]
+        if id(current) in results:
+            stack.pop()
+            continue
+
+        result = _memoized(current)
+        if result is None:
+            pending = [
+                v.owner.tree
+                for _, v, _ in current.tree
+                if isinstance(v.owner, TreeNode) and id(v.owner.tree) not in unwrapped
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+            if len(current.nodes_) == 1:
+                result = current
+            else:
+                result = _unwrap_one(current, unwrapped)
+                _memoize(current, result)
+
+        stack.pop()
+        results[id(current)] = result
+        unwrapped[id(current)] = list(result.traverse())
+
+    return ExecutionTree(list(results[id(tree)].tree))
@@ -1,7 +1,10 @@
+import threading
 from collections import Counter
 
 __unique = Counter()
+__lock = threading.Lock()
 
 def unique(prefix: str):
-    __unique.update([prefix])
-    return f"{prefix}_{__unique[prefix]}"
+    with __lock:
+        __unique[prefix] += 1
+        return f"{prefix}_{__unique[prefix]}"
@@ -22,6 +22,7 @@ from ._cli.space.init import init
 from ._cli.space.login import login
 from ._cli.space.upload import upload
 from ._cli.space.whoami import get_user_on_space
+from ._cli.telemetry import telemetry as telemetry_app
 from ._cli.use import use as use_app
 from .constants import APP_HELP
 
@@ -195,6 +196,13 @@ app.add_typer(
     help=help.core['--help'],
     rich_help_panel=groups['core']
 )
+
+# malevich telemetry
+app.add_typer(
+    telemetry_app,
+    name='telemetry',
+    rich_help_panel=groups['core']
+)
 # _________________________________________________
 
 
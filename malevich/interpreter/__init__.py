@@ -1,3 +1,4 @@
 from .abstract import Interpreter
 from .space import SpaceInterpreter, SpaceInterpreterState
 from .core import CoreInterpreterState, CoreInterpreter
+from .batch import interpret_many
@@ -1,6 +1,6 @@
 import uuid
 from abc import abstractmethod
-from copy import deepcopy
+from copy import copy, deepcopy
 from typing import Generic, TypeVar
 
 from malevich_space.schema import ComponentSchema
@@ -9,6 +9,8 @@ from malevich._autoflow.tracer import traced
 from malevich._utility import unwrap_tree
 from malevich.models import ArgumentLink, BaseNode, InterpretationError, TreeNode
 
+from .passes import OptimizationPass, PassStats, registered_passes, run_passes
+
 State = TypeVar("State")
 Return = TypeVar("Return")
 
@@ -19,8 +21,10 @@ class Interpreter(Generic[State, Return]):
     An interpreter has an inner state, which is updated during the interpretation
     process. The state is updated by calling `update_state` method.
 
-    The state is preserved in the history, which can be accessed by `history` property.
-    Each time the state is updated, it is fully copied and appended to the history.
+    The state is preserved in the history. Each time the state is updated, it is
+    fully copied and appended to the history. Nodes and dependencies of the tree
+    are applied to a single copy of the state, which is updated once the whole
+    tree is traversed.
 
     The interpretation process can be divided into 5 steps:
     1. `before_interpret` - called before the interpretation process starts
@@ -56,6 +60,10 @@ class Interpreter(Generic[State, Return]):
     4. The result of the interpretation process is returned by `get_result` method.
         For example, you can return the state, or some part of it, or some other object.
 
+    Before traversing, the tree is optimized with passes listed in `passes`
+    attribute (see :mod:`malevich.interpreter.passes`). Statistics of the
+    last run are available in `pass_stats` property.
+
 
     IMPORTANT: Ensure that the state is immutable. The state is copied and appended
     to the history each time it is updated. If the state is mutable, it will be
@@ -79,6 +87,46 @@ class Interpreter(Generic[State, Return]):
         self._tree = None
         self._run_bank = []
         self._component = None
+        self.passes: list[OptimizationPass] = registered_passes()
+        self._pass_stats: list[PassStats] = []
+
+    def fork(self) -> 'Interpreter[State, Return]':
+        """Creates an interpreter that shares resources with this one
+
+        The new interpreter has the same type and settings, reuses
+        connections and resolved credentials, but starts with a
+        fresh state (see :meth:`fork_state`). Forks are used to interpret
+        many flows concurrently, see :func:`malevich.interpreter.interpret_many`.
+        """
+        forked = copy(self)
+        forked.__history = []
+        forked._tree = None
+        forked._run_bank = []
+        forked._component = None
+        forked.passes = list(self.passes)
+        forked._pass_stats = []
+        forked._state = self.fork_state(self._state)
+        return forked
+
+    def fork_state(self, state: State) -> State:
+        """Returns an initial state for the fork of the interpreter
+
+        Defaults to a copy of the state. Interpreters should override it
+        to share connections and to reset what is accumulated during
+        interpretation.
+        """
+        return deepcopy(state)
+
+    @property
+    def pass_stats(self) -> list[PassStats]:
+        """Statistics of optimization passes applied during last interpretation"""
+        return self._pass_stats
+
+    def optimize(self, node: TreeNode) -> None:
+        """Applies optimization passes to the tree saved in `_tree` property"""
+        self._tree, self._pass_stats = run_passes(
+            self._tree, node.results, self.passes
+        )
 
     def _get_run_id(self) -> str:
         _id = uuid.uuid4().hex
@@ -135,8 +183,12 @@ class Interpreter(Generic[State, Return]):
         else:
             self._tree = node.tree
 
+        self.optimize(node)
         self.update_state(self.before_interpret(self.state))
 
+        # Nodes and dependencies are applied to a single working copy
+        # of the state, which is committed once the tree is traversed
+        state = self.state
         node_memory = {}
         node_aliases = set()
         for node_ in self._tree.nodes():
@@ -149,22 +201,21 @@ class Interpreter(Generic[State, Return]):
 
             if node_.owner.uuid not in node_memory:
                 node_memory[node_.owner.uuid] = node_
-                self.update_state(self.create_node(self.state, node_))
+                state = self.create_node(state, node_)
 
 
         for from_, to, link in self._tree.traverse():
             if from_.owner.uuid not in node_memory:
                 node_memory[from_.owner.uuid] = from_
-                self.update_state(self.create_node(self.state, from_))
+                state = self.create_node(state, from_)
 
             if to.owner.uuid not in node_memory:
                 node_memory[to.owner.uuid] = to
-                self.update_state(self.create_node(self.state, to))
+                state = self.create_node(state, to)
 
-            self.update_state(self.create_dependency(
-                self.state, from_, to, link)
-            )
+            state = self.create_dependency(state, from_, to, link)
 
+        self.update_state(state)
         self.update_state(self.after_interpret(self.state))
 
         return self.get_task(self.state)
@@ -0,0 +1,332 @@
+"""
+Structural analysis of flows
+
+Computes topological levels, width, critical path and fan-in/fan-out of
+the nodes of a flow to find which processors bound its latency and how
+much parallelism it exposes:
+
+.. code-block:: python
+
+    from malevich.interpreter.analysis import analyze
+
+    analysis = analyze(my_flow())
+    print(analysis.report())
+
+    with open('flow.dot', 'w') as f:
+        f.write(analysis.to_dot())
+
+By default each node weighs 1, so the critical path is the longest chain
+of calls. Weights can be given explicitly or taken from the recorded
+telemetry with :func:`historical_weights`.
+"""
+import json
+from collections import defaultdict
+from datetime import datetime
+from functools import cached_property
+from typing import Callable, Mapping
+
+from pydantic import BaseModel
+
+from malevich._autoflow import ExecutionTree, traced
+from malevich._utility import unwrap_tree
+from malevich.models import BaseNode, TreeNode
+from malevich.models.task.promised import PromisedTask
+
+WeightsType = Mapping[str, float] | Callable[[BaseNode], float | None]
+
+
+class NodeStats(BaseModel):
+    """Position of a node in the flow"""
+
+    uuid: str
+    alias: str | None = None
+    kind: str
+    processor_id: str | None = None
+    level: int
+    weight: float
+    earliest_start: float
+    earliest_finish: float
+    slack: float
+    fan_in: int
+    fan_out: int
+
+    @property
+    def critical(self) -> bool:
+        return self.slack <= 1e-9
+
+    @property
+    def label(self) -> str:
+        return self.alias or self.processor_id or self.uuid[:8]
+
+
+class FlowAnalysis(BaseModel):
+    """Result of :func:`analyze`"""
+
+    nodes: list[NodeStats]
+    """Nodes in topological order"""
+    edges: list[tuple[str, str, str | None]]
+    """Edges as `(from uuid, to uuid, argument name)`"""
+    levels: list[list[str]]
+    """Uuids of nodes grouped by their topological level"""
+    critical_path: list[str]
+    """Uuids of nodes on the critical path"""
+    critical_path_length: float
+    total_weight: float
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels)
+
+    @property
+    def width(self) -> int:
+        return max((len(level) for level in self.levels), default=0)
+
+    @property
+    def parallelism(self) -> float:
+        """Total weight of the flow divided by the length of the critical path"""
+        if not self.critical_path_length:
+            return 0.
+        return self.total_weight / self.critical_path_length
+
+    @property
+    def max_fan_in(self) -> int:
+        return max((n.fan_in for n in self.nodes), default=0)
+
+    @property
+    def max_fan_out(self) -> int:
+        return max((n.fan_out for n in self.nodes), default=0)
+
+    @cached_property
+    def _by_uuid(self) -> dict[str, NodeStats]:
+        return {node.uuid: node for node in self.nodes}
+
+    def node(self, uuid: str) -> NodeStats:
+        return self._by_uuid[uuid]
+
+    def report(self) -> str:
+        """Human-readable summary of the analysis"""
+        by_uuid = self._by_uuid
+        lines = [
+            f"Nodes: {len(self.nodes)}, edges: {len(self.edges)}",
+            f"Levels: {self.depth}, max width: {self.width}",
+            f"Critical path: {self.critical_path_length:g} "
+            f"of {self.total_weight:g} total "
+            f"(parallelism {self.parallelism:.2f})",
+            f"Max fan-in: {self.max_fan_in}, max fan-out: {self.max_fan_out}",
+            "",
+            "Critical path:",
+        ]
+        for uuid in self.critical_path:
+            node = by_uuid[uuid]
+            share = node.weight / self.critical_path_length * 100 \
+                if self.critical_path_length else 0.
+            lines.append(
+                f"  [{node.level}] {node.label} ({node.kind}): "
+                f"{node.weight:g} ({share:.1f}%)"
+            )
+        lines.extend(["", "Levels:"])
+        for i, level in enumerate(self.levels):
+            lines.append(
+                f"  {i}: " + ", ".join(by_uuid[uuid].label for uuid in level)
+            )
+        return "\n".join(lines)
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(
+            {
+                **self.model_dump(),
+                'depth': self.depth,
+                'width': self.width,
+                'parallelism': self.parallelism,
+            },
+            **kwargs
+        )
+
+    def to_dot(self, name: str = 'flow') -> str:
+        """Exports the flow in DOT format with the critical path highlighted"""
+        critical = set(self.critical_path)
+        critical_edges = set(zip(self.critical_path, self.critical_path[1:]))
+        lines = [f'digraph "{name}" {{', '    rankdir=LR;']
+        for i, level in enumerate(self.levels):
+            uuids = " ".join(json.dumps(uuid) for uuid in level)
+            lines.append(f'    {{ rank=same; {uuids} }}')
+        for node in self.nodes:
+            attrs = {
+                'label': f'{node.label}\\n{node.weight:g}',
+                'tooltip': f'{node.kind} {node.uuid}',
+            }
+            if node.uuid in critical:
+                attrs.update(color='red', penwidth='2')
+            lines.append(
+                f'    {json.dumps(node.uuid)} '
+                f'[{", ".join(f"{k}={json.dumps(v)}" for k, v in attrs.items())}];'
+            )
+        for from_, to, link in self.edges:
+            attrs = {'label': link} if link else {}
+            if (from_, to) in critical_edges:
+                attrs.update(color='red', penwidth='2')
+            attrs_ = ", ".join(f"{k}={json.dumps(v)}" for k, v in attrs.items())
+            lines.append(
+                f'    {json.dumps(from_)} -> {json.dumps(to)}'
+                + (f' [{attrs_}]' if attrs_ else '')
+                + ';'
+            )
+        lines.append('}')
+        return "\n".join(lines)
+
+
+def historical_weights(
+    pipeline_hash: str | None = None,
+    since: datetime | None = None,
+    percentile: float = 50,
+) -> dict[str, float]:
+    """Builds weights of nodes from durations of processors
+
+    Durations of processors are reported by Core after each run that is
+    waited for and recorded when `MALEVICH_TELEMETRY` is enabled. They are
+    aggregated per alias and per processor id (aliases take precedence),
+    so the result can be passed as `weights` to :func:`analyze`.
+    """
+    from malevich._db.functions import get_label_percentiles
+
+    weights = get_label_percentiles(
+        pipeline_hash, 'execution', since, percentile, by='phase'
+    )
+    weights.update(
+        get_label_percentiles(pipeline_hash, 'execution', since, percentile)
+    )
+    return weights
+
+
+def _weight(
+    node: BaseNode, weights: WeightsType | None, default: float
+) -> float:
+    if weights is None:
+        return default
+    if callable(weights):
+        value = weights(node)
+        return default if value is None else float(value)
+    for key in (node.uuid, node.alias, getattr(node, 'processor_id', None)):
+        if key is not None and key in weights:
+            return float(weights[key])
+    return default
+
+
+def analyze(
+    tree: ExecutionTree | TreeNode | PromisedTask,
+    weights: WeightsType | None = None,
+    default_weight: float = 1.,
+    unwrap: bool = True,
+) -> FlowAnalysis:
+    """Analyzes the structure of the flow
+
+    Args:
+        tree (ExecutionTree | TreeNode | PromisedTask): Flow to analyze
+        weights (Mapping[str, float] | Callable, optional): Weights (e.g.
+            expected durations) of nodes. Either a mapping from uuid, alias
+            or processor id to the weight, or a function of the node.
+        default_weight (float): Weight of nodes not found in `weights`
+        unwrap (bool): Whether to unwrap subflows before the analysis
+
+    Raises:
+        ValueError: If the flow contains a cycle
+    """
+    if isinstance(tree, PromisedTask):
+        tree = tree.tree
+    if isinstance(tree, TreeNode):
+        tree = tree.tree
+    if unwrap:
+        tree = unwrap_tree(tree)
+
+    owners: dict[str, BaseNode] = {}
+
+    def _owner(node: traced[BaseNode]) -> str:
+        owner = node.owner
+        owners.setdefault(owner.uuid, owner)
+        return owner.uuid
+
+    edges = []
+    preds: dict[str, set[str]] = defaultdict(set)
+    succs: dict[str, set[str]] = defaultdict(set)
+    for from_, to, link in tree.tree:
+        u, v = _owner(from_), _owner(to)
+        edges.append((u, v, getattr(link, 'name', None)))
+        preds[v].add(u)
+        succs[u].add(v)
+    for node in sorted(tree.nodes(), key=lambda x: x.owner.uuid):
+        _owner(node)
+
+    # Kahn's algorithm, levels are the longest distance from a source
+    in_degree = {uuid: len(preds[uuid]) for uuid in owners}
+    level = {uuid: 0 for uuid in owners}
+    frontier = [uuid for uuid in owners if in_degree[uuid] == 0]
+    order = []
+    while frontier:
+        order.extend(frontier)
+        next_ = []
+        for u in frontier:
+            for v in succs[u]:
+                level[v] = max(level[v], level[u] + 1)
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    next_.append(v)
+        frontier = next_
+    if len(order) != len(owners):
+        raise ValueError(
+            "The flow contains a cycle: "
+            + ", ".join(uuid for uuid in owners if in_degree[uuid] > 0)
+        )
+    order.sort(key=lambda uuid: level[uuid])
+
+    weight = {
+        uuid: _weight(owner, weights, default_weight)
+        for uuid, owner in owners.items()
+    }
+
+    # Earliest finish forward, latest finish backward
+    start, finish, via = {}, {}, {}
+    for uuid in order:
+        start[uuid] = max((finish[p] for p in preds[uuid]), default=0.)
+        via[uuid] = max(preds[uuid], key=finish.__getitem__, default=None)
+        finish[uuid] = start[uuid] + weight[uuid]
+    length = max(finish.values(), default=0.)
+    latest = {}
+    for uuid in reversed(order):
+        latest[uuid] = min(
+            (latest[s] - weight[s] for s in succs[uuid]), default=length
+        )
+
+    path = []
+    cursor = max(order, key=finish.__getitem__, default=None)
+    while cursor is not None:
+        path.append(cursor)
+        cursor = via[cursor]
+    path.reverse()
+
+    levels: list[list[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for uuid in order:
+        levels[level[uuid]].append(uuid)
+
+    return FlowAnalysis(
+        nodes=[
+            NodeStats(
+                uuid=uuid,
+                alias=owners[uuid].alias,
+                kind=type(owners[uuid]).__name__,
+                processor_id=getattr(owners[uuid], 'processor_id', None),
+                level=level[uuid],
+                weight=weight[uuid],
+                earliest_start=start[uuid],
+                earliest_finish=finish[uuid],
+                slack=latest[uuid] - finish[uuid],
+                fan_in=len(preds[uuid]),
+                fan_out=len(succs[uuid]),
+            )
+            for uuid in order
+        ],
+        edges=edges,
+        levels=levels,
+        critical_path=path,
+        critical_path_length=length,
+        total_weight=sum(weight.values()),
+    )
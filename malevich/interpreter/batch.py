@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from malevich.models.task.base import BaseTask
+from malevich.models.task.promised import PromisedTask
+
+from .abstract import Interpreter
+
+
+def interpret_many(
+    tasks: Iterable[PromisedTask],
+    interpreter: Interpreter,
+    max_workers: int | None = None,
+) -> list[BaseTask]:
+    """Interprets many flows with a single interpreter
+
+    Each flow is interpreted by a fork of `interpreter` (see
+    :meth:`Interpreter.fork`), so connections, verified credentials and
+    resolved registry entries are shared, while independent flows are
+    interpreted concurrently.
+
+    Args:
+        tasks (Iterable[PromisedTask]): Flows to interpret
+        interpreter (Interpreter): Interpreter to fork
+        max_workers (int, optional): Maximum number of flows interpreted
+            at the same time. Defaults to the default of
+            :class:`concurrent.futures.ThreadPoolExecutor`.
+
+    Returns:
+        list[BaseTask]: Interpreted tasks in the order of `tasks`
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return []
+
+    forks = [interpreter.fork() for _ in tasks]
+
+    def _interpret(args: tuple[PromisedTask, Interpreter]) -> BaseTask:
+        task, fork = args
+        task.interpret(fork)
+        return task.get_interpreted_task()
+
+    if len(tasks) == 1:
+        return [_interpret((tasks[0], forks[0]))]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_interpret, zip(tasks, forks)))
@@ -0,0 +1,202 @@
+"""
+Cache of interpretation results keyed by the structure of the flow
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from typing import Any
+
+from malevich._autoflow.tree import ExecutionTree
+from malevich._dev.singleton import SingletonMeta
+from malevich._utility.cache.manager import CacheManager
+from malevich._utility.cache.signing import sign, verify
+from malevich._utility.tree_node_hash import get_tree_node_hash
+from malevich.models import (
+    AssetNode,
+    BaseNode,
+    CollectionNode,
+    DocumentNode,
+    OperationNode,
+    TreeNode,
+)
+
+
+def interpretation_nodes(tree: ExecutionTree) -> dict[str, list[BaseNode]]:
+    """Groups nodes of the tree by their uuid
+
+    Groups follow the traversal of the tree, followed by nodes without
+    links, so the order does not depend on identities of the nodes.
+    A group contains every copy of the node (e.g. subindexed outputs of
+    an operation), as all of them receive the same alias.
+    """
+    nodes: dict[str, list[BaseNode]] = {}
+
+    def _add(node: BaseNode) -> None:
+        group = nodes.setdefault(node.uuid, [])
+        if not any(x is node for x in group):
+            group.append(node)
+
+    for from_, to, _ in tree.traverse():
+        _add(from_.owner)
+        _add(to.owner)
+    unlinked = []
+    for node_ in tree.nodes():
+        if node_.owner.uuid in nodes:
+            _add(node_.owner)
+        else:
+            unlinked.append(node_.owner)
+    for node_ in sorted(
+        unlinked,
+        key=lambda x: json.dumps(_node_fingerprint(x, {}), default=str),
+    ):
+        _add(node_)
+    return nodes
+
+
+def _node_fingerprint(node: BaseNode, positions: dict[str, int]) -> list | None:
+    if isinstance(node, OperationNode):
+        return [
+            'operation',
+            node.alias,
+            node.operation_id,
+            node.processor_id,
+            node.package_id,
+            json.dumps(node.config, sort_keys=True, default=str),
+            node.is_condition,
+            sorted(positions.get(x, -1) for x in node.should_be_true),
+            sorted(positions.get(x, -1) for x in node.should_be_false),
+        ]
+    elif isinstance(node, CollectionNode):
+        return ['collection', node.alias, node.collection.collection_id]
+    elif isinstance(node, AssetNode):
+        return ['asset', node.alias, node.name, node.is_composite]
+    elif isinstance(node, DocumentNode):
+        return ['document', node.alias, node.reverse_id]
+    return None
+
+
+def interpretation_key(
+    node: TreeNode,
+    tree: ExecutionTree,
+    interpreter: str,
+    params: Any = None,  # noqa: ANN401
+) -> str | None:
+    """Computes a key of interpretation of the flow
+
+    The key combines the structural hash of the tree (see
+    :func:`get_tree_node_hash`) with aliases and configurations
+    of its nodes, the type of the interpreter and its parameters.
+
+    Args:
+        node (TreeNode): The interpreted flow
+        tree (ExecutionTree): The unwrapped tree of the flow
+        interpreter (str): Name of the interpreter type
+        params (Any): JSON-serializable parameters of the interpreter
+
+    Returns:
+        str | None: The key or None if the flow contains nodes or links
+            that cannot be fingerprinted
+    """
+    nodes = interpretation_nodes(tree)
+    positions = {uuid: i for i, uuid in enumerate(nodes.keys())}
+
+    fingerprint = []
+    for group in nodes.values():
+        node_fingerprint = _node_fingerprint(group[0], positions)
+        if node_fingerprint is None:
+            return None
+        fingerprint.append(node_fingerprint)
+
+    for from_, to, link in tree.traverse():
+        if getattr(link, 'is_compressed_edge', False) or getattr(
+            link, 'compressed_edges', None
+        ):
+            return None
+        fingerprint.append([
+            positions[from_.owner.uuid],
+            positions[to.owner.uuid],
+            getattr(from_.owner, 'subindex', None),
+            link.index,
+            link.name,
+            link.in_sink,
+        ])
+
+    return hashlib.sha256(
+        json.dumps(
+            [get_tree_node_hash(node), interpreter, params, fingerprint],
+            default=str,
+        ).encode()
+    ).hexdigest()
+
+
+class InterpretationCache(metaclass=SingletonMeta):
+    """Stores results of interpretation in memory and on disk
+
+    Entries are pickled, signed (see :mod:`malevich._utility.cache.signing`)
+    and stored under `interpreter/states` group of the Core cache. Entries
+    with invalid signatures are dropped without unpickling. Set
+    `MALEVICH_NO_INTERPRETATION_CACHE` environment variable to disable
+    the cache.
+    """
+
+    entry_group = 'interpreter/states'
+
+    def __init__(self) -> None:
+        self._memory: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return not os.getenv('MALEVICH_NO_INTERPRETATION_CACHE')
+
+    def _path(self, key: str) -> str:
+        return CacheManager().core.get_entry_path(key + '.pkl', self.entry_group)
+
+    def get(self, key: str) -> Any | None:  # noqa: ANN401
+        with self._lock:
+            payload = self._memory.get(key)
+        if payload is None:
+            try:
+                with open(self._path(key), 'rb') as file_:
+                    payload = file_.read()
+            except OSError:
+                return None
+            with self._lock:
+                self._memory[key] = payload
+        body = verify(payload)
+        if body is None:
+            self.drop(key)
+            return None
+        try:
+            return pickle.loads(body)
+        except Exception:
+            self.drop(key)
+            return None
+
+    def put(self, key: str, value: Any) -> None:  # noqa: ANN401
+        payload = sign(pickle.dumps(value))
+        with self._lock:
+            self._memory[key] = payload
+        try:
+            CacheManager().core.write_entry(
+                payload,
+                entry_name=key + '.pkl',
+                entry_group=self.entry_group,
+                force_overwrite=True,
+            )
+        except OSError:
+            pass
+
+    def drop(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
@@ -1,4 +1,6 @@
+import hashlib
 import json
+import threading
 from collections import defaultdict
 from typing import Optional
 
@@ -18,9 +20,22 @@ from malevich._core import (
     result_collection_name,
 )
 from malevich._core.service.service import CoreService
-from malevich._utility import CacheManager, LogLevel, Registry, cout, unique
+from malevich._utility import (
+    CacheManager,
+    LogLevel,
+    Registry,
+    cout,
+    unique,
+    unwrap_tree,
+)
+from malevich._utility.timing import StageTimer
 from malevich.constants import CORE_INTERPRETER_IN_APP_INFO_KEY, DEFAULT_CORE_HOST
 from malevich.interpreter import Interpreter
+from malevich.interpreter.cache import (
+    InterpretationCache,
+    interpretation_key,
+    interpretation_nodes,
+)
 from malevich.models import (
     Action,
     ArgumentLink,
@@ -30,6 +45,7 @@ from malevich.models import (
     CoreInterpreterState,
     CoreRegistryEntry,
     CoreTask,
+    CoreTaskState,
     DocumentNode,
     InjectedAppInfo,
     InterpretationError,
@@ -56,6 +72,15 @@ _actions = [
 ]
 
 
+class _SharedResources:
+    """Resources shared between forks of the interpreter"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.auth_verified = False
+        self.registry: dict[str, CoreRegistryEntry] = {}
+
+
 def _log(
     message: str,
     level: int = 0,
@@ -116,6 +141,14 @@ class CoreInterpreter(Interpreter[CoreInterpreterState, CoreTask]):
             If set, provides more information in logs.
             Possible modes: :code:`no`, :code:`all`, :code:`time`,
             :code:`df_info`, :code:`df_show`
+    *   :code:`patch_from (str)`:
+            Hash of previously deployed pipeline. If set, the pipeline is
+            patched in place with the changed processors, conditions and
+            results instead of creating a new one.
+
+    Pipelines that already exist on Core are compared with the interpreted
+    ones and updated only when they differ. If the task is online and nothing
+    changed, the running task is reused.
 
     Run
     -----
@@ -181,8 +214,11 @@ class CoreInterpreter(Interpreter[CoreInterpreterState, CoreTask]):
         self,
         core_auth: tuple[str, str],
         core_host: str = DEFAULT_CORE_HOST,
+        use_cache: bool = True,
     ) -> None:
         super().__init__(CoreInterpreterState())
+        self.use_cache = use_cache
+        self._shared = _SharedResources()
         # TODO: Remove this (deprecated in favor of service)
         self.__core_host = core_host
         self.__core_auth = core_auth
@@ -196,6 +232,20 @@ class CoreInterpreter(Interpreter[CoreInterpreterState, CoreTask]):
 
         self.update_state()
 
+    def fork_state(self, state: CoreInterpreterState) -> CoreInterpreterState:
+        return CoreInterpreterState(
+            params=state.params.model_copy(),
+            service=state.service,
+        )
+
+    def _registry_entry(self, operation_id: str) -> CoreRegistryEntry:
+        """internal"""
+        entry = self._shared.registry.get(operation_id)
+        if entry is None:
+            entry = registry.get(operation_id, model=CoreRegistryEntry)
+            self._shared.registry[operation_id] = entry
+        return entry
+
     def _result_collection_name(self, operation_id: str) -> str:
         return result_collection_name(operation_id)
 
@@ -234,8 +284,168 @@ class CoreInterpreter(Interpreter[CoreInterpreterState, CoreTask]):
                 **kwargs
             )
 
+    def _interpretation_key(self, node: TreeNode) -> str | None:
+        """internal"""
+        if not self.use_cache or not InterpretationCache.enabled():
+            return None
+        try:
+            tree = unwrap_tree(node.tree)
+            # Images and processors are resolved from the registry,
+            # so reinstalled apps invalidate the interpretation
+            operation_ids = sorted({
+                node_.owner.operation_id
+                for node_ in tree.nodes()
+                if isinstance(node_.owner, OperationNode)
+            })
+            return interpretation_key(
+                node,
+                tree,
+                interpreter=f'{type(self).__module__}.{type(self).__qualname__}',
+                params=[
+                    [pass_.name for pass_ in self.passes],
+                    self.__core_host,
+                    hashlib.sha256(
+                        json.dumps(self.__core_auth).encode()
+                    ).hexdigest(),
+                    [registry.get(x) for x in operation_ids],
+                ],
+            )
+        except Exception:
+            return None
+
+    def _credentials(
+        self, state: CoreInterpreterState, strip: bool = False
+    ) -> CoreInterpreterState | None:
+        """internal
+
+        Removes credentials from the state (or fills them in again),
+        so they are not written to the interpretation cache. Returns
+        None if the state cannot be filled in
+        """
+        state.params = state.params.model_copy(
+            update={'core_auth': None if strip else self.__core_auth}
+        )
+        for apps in (state.processors, state.conditions):
+            for alias, app in apps.items():
+                if strip:
+                    image_auth = (None, None)
+                elif alias in state.operation_nodes:
+                    extra = self._registry_entry(
+                        state.operation_nodes[alias].operation_id
+                    )
+                    image_auth = (extra.image_auth_user, extra.image_auth_pass)
+                else:
+                    return None
+
+                cfg = json.loads(app.cfg or '{}')
+                if CORE_INTERPRETER_IN_APP_INFO_KEY in cfg:
+                    cfg[CORE_INTERPRETER_IN_APP_INFO_KEY] = {
+                        **cfg[CORE_INTERPRETER_IN_APP_INFO_KEY],
+                        'auth': None if strip else self.__core_auth,
+                        'image_auth': image_auth,
+                    }
+                    app = app.model_copy(update={'cfg': json.dumps(cfg)})
+                apps[alias] = app.model_copy(update={
+                    'image': app.image.model_copy(update={
+                        'user': image_auth[0], 'token': image_auth[1]
+                    }),
+                })
+        return state
+
+    def _interpret_cached(
+        self,
+        node: TreeNode,
+        component: ComponentSchema,
+        key: str,
+    ) -> CoreTask | None:
+        """internal
+
+        Restores the state from the interpretation cache and binds
+        it to nodes of the flow. Returns None on cache miss
+        """
+        entry = InterpretationCache().get(key)
+        if entry is None:
+            return None
+        state, aliases = self._credentials(entry[0]), entry[1]
+        if state is None:
+            return None
+
+        self._tree = unwrap_tree(node.tree)
+        self.optimize(node)
+        nodes = interpretation_nodes(self._tree)
+        if len(nodes) != len(aliases):
+            return None
+
+        live = {}
+        for group, alias in zip(nodes.values(), aliases):
+            for owner in group:
+                owner.alias = alias
+            live[alias] = group[0]
+
+        for mapping in (
+            state.operation_nodes,
+            state.collection_nodes,
+            state.asset_nodes,
+            state.document_nodes,
+        ):
+            for alias in mapping.keys():
+                if alias in live:
+                    mapping[alias] = live[alias]
+        state.operation_aliases = {
+            node_.uuid: alias for alias, node_ in state.operation_nodes.items()
+        }
+
+        state.service = self._state.service
+        state.params = self._state.params.model_copy()
+
+        setattr(node, "__interpreter__", self)
+        self._component = component
+        self.update_state(state)
+
+        _log(f"Interpretation is restored from cache: {key[:8]}", -1, 0, True)
+        return self.get_task(self.state)
+
+    def _cache_interpretation(self, node: TreeNode, key: str) -> None:
+        """internal"""
+        state = self._credentials(self.state, strip=True)
+        state.service = None
+        aliases = [
+            group[0].alias
+            for group in interpretation_nodes(self._tree).values()
+        ]
+        try:
+            InterpretationCache().put(key, (state, aliases))
+        except Exception as e:
+            _log(f"Failed to cache interpretation: {e}", -1, 0, True)
+
     def interpret(self, node: TreeNode, component: ComponentSchema = None):  # noqa: ANN201
-        return super().interpret(node, component)
+        """Interprets the flow
+
+        Results of interpretation are cached by the structure of the flow
+        (see :func:`malevich.interpreter.cache.interpretation_key`) and
+        registry entries of its apps, so an unchanged flow is not
+        interpreted again. Credentials are not stored in the cache.
+        Pass `use_cache=False` to the interpreter to disable the cache.
+        """
+        timer = StageTimer()
+        try:
+            with timer.measure('interpret', 'interpret') as measure_:
+                key = self._interpretation_key(node)
+                task = None
+                if key is not None:
+                    task = self._interpret_cached(node, component, key)
+                    measure_.label = 'cached' if task is not None else None
+                if task is None:
+                    task = super().interpret(node, component)
+                    if key is not None:
+                        self._cache_interpretation(node, key)
+                if isinstance(task.state, CoreTaskState):
+                    # Pipelines of local tasks are not deployed and not hashed
+                    measure_.pipeline_hash = task.get_pipeline_hash()
+                measure_.count = len(task.state.processors) + len(task.state.conditions)
+        finally:
+            timer.flush()
+        return task
 
     def create_node(
         self,
@@ -246,11 +456,9 @@ class CoreInterpreter(Interpreter[CoreInterpreterState, CoreTask]):
             if tracer.owner.alias is None:
                 tracer.owner.alias = unique(tracer.owner.processor_id)
             state.operation_nodes[tracer.owner.alias] = tracer.owner
+            state.operation_aliases[tracer.owner.uuid] = tracer.owner.alias
 
-            extra = registry.get(
-                tracer.owner.operation_id,
-                model=CoreRegistryEntry
-            )
+            extra = self._registry_entry(tracer.owner.operation_id)
 
             if not extra.image_ref:
                 verbose_ = ""
@@ -417,11 +625,8 @@ class CoreInterpreter(Interpreter[CoreInterpreterState, CoreTask]):
         for fcondition, fnode in from_node.owner:
             for tcondition, tnode in to_node.owner:
                 if fnode.alias is None:
-                    for node in self._state.operation_nodes.values():
-                        if node.uuid == fnode.uuid:
-                            fnode.alias = node.alias
-                            break
-                    else:
+                    fnode.alias = state.operation_aliases.get(fnode.uuid)
+                    if fnode.alias is None:
                         fnode.alias = unique(fnode.uuid)
 
                 cond_stmt = {
@@ -448,43 +653,43 @@ class CoreInterpreter(Interpreter[CoreInterpreterState, CoreTask]):
     def before_interpret(self, state: CoreInterpreterState) -> CoreInterpreterState:
         _log("Connection to Core is established.", 0, 0, True)
         _log(f"Core host: {self.__core_host}", 0, 0, True)
-        try:
-            core.check_auth(
-                auth=self.__core_auth,
-                conn_url=self.__core_host
-            )
-        except Exception:
+        with self._shared.lock:
+            if self._shared.auth_verified:
+                return state
             try:
-                core.create_user(
+                core.check_auth(
                     auth=self.__core_auth,
                     conn_url=self.__core_host
                 )
             except Exception:
-                raise Exception(
-                    "Cannot connect to Core. Please, check your credentials."
-                )
+                try:
+                    core.create_user(
+                        auth=self.__core_auth,
+                        conn_url=self.__core_host
+                    )
+                except Exception:
+                    raise Exception(
+                        "Cannot connect to Core. Please, check your credentials."
+                    )
+            self._shared.auth_verified = True
         return state
 
     def after_interpret(self, state: CoreInterpreterState) -> CoreInterpreterState:
         for operation in state.operation_nodes.values():
             if operation.is_condition:
                 continue
-            if operation.should_be_true:
-                for cond_uid in operation.should_be_true:
-                    for condition in state.operation_nodes.values():
-                        if condition.uuid == cond_uid:
-                            _log(f"Condition {operation.alias}: {condition.alias} == True", -1, step=True)
-                            if not state.processors[operation.alias].conditions:
-                                state.processors[operation.alias].conditions = {}
-                            state.processors[operation.alias].conditions[condition.alias] = True
-            if operation.should_be_false:
-                for cond_uid in operation.should_be_false:
-                    for condition in state.operation_nodes.values():
-                        if condition.uuid == cond_uid:
-                            if not state.processors[operation.alias].conditions:
-                                state.processors[operation.alias].conditions = {}
-                            _log(f"Condition {operation.alias}: {condition.alias} == False", -1, step=True)
-                            state.processors[operation.alias].conditions[condition.alias] = False
+            for value, cond_uids in (
+                (True, operation.should_be_true),
+                (False, operation.should_be_false),
+            ):
+                for cond_uid in cond_uids:
+                    condition_alias = state.operation_aliases.get(cond_uid)
+                    if condition_alias is None:
+                        continue
+                    _log(f"Condition {operation.alias}: {condition_alias} == {value}", -1, step=True)
+                    if not state.processors[operation.alias].conditions:
+                        state.processors[operation.alias].conditions = {}
+                    state.processors[operation.alias].conditions[condition_alias] = value
 
         return state
 
@@ -55,8 +55,12 @@ class LocalInterpreter(CoreInterpreter):
     def __init__(self) -> None:
         super(CoreInterpreter, self).__init__(LocalInterpreterState())
         self._state = LocalInterpreterState()
+        self.use_cache = False
         self.update_state()
 
+    def fork_state(self, state: LocalInterpreterState) -> LocalInterpreterState:
+        return LocalInterpreterState()
+
     def before_interpret(self, state: LocalInterpreterState) -> LocalInterpreterState:
         _log("Interpretation in local mode", 0, 0, True)
         return state
@@ -72,6 +76,7 @@ class LocalInterpreter(CoreInterpreter):
                     tracer.owner.alias = unique(tracer.owner.processor_id)
                 
                 state.operation_nodes[tracer.owner.alias] = tracer.owner
+                state.operation_aliases[tracer.owner.uuid] = tracer.owner.alias
 
                 extra = registry.get(tracer.owner.operation_id)
                 if extra is not None:
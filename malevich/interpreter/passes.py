@@ -0,0 +1,376 @@
+"""
+Optimization passes over execution trees
+
+Passes are applied by :meth:`Interpreter.interpret` to the tree of the flow
+before it is interpreted. Each pass receives the tree and the results of the
+flow and returns a new tree. Passes are not applied unless enabled either for
+a particular interpreter (see :attr:`Interpreter.passes`) or globally with
+:func:`register_pass`:
+
+.. code-block:: python
+
+    from malevich.interpreter.passes import (
+        CommonSubexpressionElimination,
+        DeadNodePruning,
+        register_pass,
+    )
+
+    register_pass(CommonSubexpressionElimination())
+    register_pass(DeadNodePruning())
+
+Both built-in graph passes assume processors to be free of side effects:
+identical calls are merged and calls whose outputs are not consumed are
+removed.
+"""
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any
+
+from pydantic import BaseModel
+
+from malevich._autoflow import ExecutionTree, traced, tracedLike
+from malevich._utility import LogLevel, cout, deflat_edges
+from malevich.models import (
+    Action,
+    BaseNode,
+    OperationNode,
+    TreeNode,
+    VerbosityLevel,
+)
+from malevich.models.nodes.morph import MorphNode
+
+
+class PassStats(BaseModel):
+    """Statistics of a single application of the pass"""
+
+    name: str
+    nodes_before: int
+    nodes_after: int
+    edges_before: int
+    edges_after: int
+    duration: float
+
+    @property
+    def removed_nodes(self) -> int:
+        return self.nodes_before - self.nodes_after
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: nodes {self.nodes_before} -> {self.nodes_after}, "
+            f"edges {self.edges_before} -> {self.edges_after} "
+            f"({self.duration:.3f}s)"
+        )
+
+
+class OptimizationPass(ABC):
+    """Base class for optimization passes
+
+    To implement a pass, override :meth:`run`. The pass should not modify
+    the given tree, but return a new one. Nodes that are referenced by
+    results of the flow must be preserved.
+    """
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    @abstractmethod
+    def run(self, tree: ExecutionTree, results: Any) -> ExecutionTree:  # noqa: ANN401
+        """Applies the pass
+
+        Args:
+            tree (ExecutionTree): Tree of the flow
+            results (Any): Results of the flow as returned by the flow function
+
+        Returns:
+            ExecutionTree: Optimized tree
+        """
+        pass
+
+
+def _uuid(node: traced[BaseNode]) -> str:
+    return node.owner.uuid
+
+
+def result_uuids(results: Any) -> set[str]:  # noqa: ANN401
+    """Collects uuids of nodes referenced by results of the flow
+
+    Nodes used as conditions of conditional results are also included
+    """
+    uuids = set()
+    stack = [results]
+    while stack:
+        obj = stack.pop()
+        if obj is None:
+            continue
+        if isinstance(obj, traced):
+            stack.append(obj.owner)
+        elif isinstance(obj, MorphNode):
+            uuids.add(obj.uuid)
+            stack.extend(obj.members)
+        elif isinstance(obj, TreeNode):
+            uuids.add(obj.uuid)
+            stack.append(obj.underlying_node)
+        elif isinstance(obj, BaseNode):
+            uuids.add(obj.uuid)
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+    return uuids
+
+
+def _rebuild(
+    tree: ExecutionTree,
+    edges: list[tuple[Any, Any, Any]],
+    keep: set[str] | None = None,
+) -> ExecutionTree:
+    new_tree = ExecutionTree(edges)
+    for node in tree.nodes():
+        if node not in new_tree.nodes_ and (keep is None or _uuid(node) in keep):
+            new_tree.nodes_.add(node)
+    new_tree.clone_node_mappers(tree)
+    new_tree.clone_edge_mappers(tree)
+    return new_tree
+
+
+class CommonSubexpressionElimination(OptimizationPass):
+    """Merges identical processor calls
+
+    Two calls are identical if they share the processor, its configuration,
+    conditions and inputs. Merging is repeated until no more calls can be
+    merged, so chains of identical calls collapse as well. Conditions,
+    aliased calls and calls referenced by results are never removed.
+    """
+
+    @staticmethod
+    def _signature(
+        node: OperationNode,
+        inputs: list[tuple[str, Any, int, str, bool]],
+    ) -> str:
+        return json.dumps([
+            node.operation_id,
+            node.processor_id,
+            node.package_id,
+            node.config,
+            sorted(node.should_be_true),
+            sorted(node.should_be_false),
+            sorted(inputs, key=str),
+        ], sort_keys=True, default=str)
+
+    def run(self, tree: ExecutionTree, results: Any) -> ExecutionTree:  # noqa: ANN401
+        protected = result_uuids(results)
+        for node in tree.nodes():
+            if isinstance(node.owner, MorphNode):
+                protected |= result_uuids(node.owner)
+
+        edges = list(tree.tree)
+        removed = set()
+        while True:
+            inputs = defaultdict(list)
+            owners = {}
+            for from_, to, link in edges:
+                if isinstance(to.owner, OperationNode):
+                    owners[to.owner.uuid] = to.owner
+                    inputs[to.owner.uuid].append((
+                        _uuid(from_),
+                        getattr(from_.owner, 'subindex', None),
+                        link.index,
+                        link.name,
+                        link.in_sink,
+                    ))
+
+            canonical = {}
+            replace = {}
+            for uuid_, owner in owners.items():
+                if owner.is_condition:
+                    continue
+                key = self._signature(owner, inputs[uuid_])
+                if key not in canonical:
+                    canonical[key] = owner
+                    continue
+                kept = canonical[key]
+                if owner.alias is not None or uuid_ in protected:
+                    if kept.alias is not None or kept.uuid in protected:
+                        continue
+                    canonical[key], kept, owner = owner, owner, kept
+                replace[owner.uuid] = kept
+
+            if not replace:
+                return _rebuild(tree, edges, keep={
+                    _uuid(n) for n in tree.nodes() if _uuid(n) not in removed
+                })
+
+            for uuid_, kept in replace.items():
+                while kept.uuid in replace:
+                    kept = replace[kept.uuid]
+                replace[uuid_] = kept
+            removed.update(replace.keys())
+
+            new_edges = []
+            for from_, to, link in edges:
+                if to.owner.uuid in replace:
+                    continue
+                if from_.owner.uuid in replace:
+                    kept = replace[from_.owner.uuid]
+                    from_ = tracedLike(
+                        kept.model_copy(update={'subindex': from_.owner.subindex})
+                        if from_.owner.subindex is not None
+                        else kept
+                    )
+                new_edges.append((from_, to, link))
+            edges = new_edges
+
+
+class DeadNodePruning(OptimizationPass):
+    """Removes nodes whose outputs never reach results of the flow
+
+    The pass does nothing if results of the flow are not known.
+    """
+
+    def run(self, tree: ExecutionTree, results: Any) -> ExecutionTree:  # noqa: ANN401
+        live = result_uuids(results)
+        if not live:
+            return tree
+
+        incoming = defaultdict(list)
+        by_uuid = {}
+        for from_, to, link in tree.tree:
+            incoming[_uuid(to)].append(from_)
+            by_uuid[_uuid(from_)] = from_.owner
+            by_uuid[_uuid(to)] = to.owner
+
+        stack = list(live)
+        while stack:
+            uuid_ = stack.pop()
+            owner = by_uuid.get(uuid_)
+            dependencies = [_uuid(x) for x in incoming.get(uuid_, [])]
+            if isinstance(owner, OperationNode):
+                dependencies.extend(owner.should_be_true)
+                dependencies.extend(owner.should_be_false)
+            elif isinstance(owner, MorphNode):
+                dependencies.extend(result_uuids(owner))
+            for dependency in dependencies:
+                if dependency not in live:
+                    live.add(dependency)
+                    stack.append(dependency)
+
+        return _rebuild(
+            tree,
+            [e for e in tree.tree if _uuid(e[1]) in live],
+            keep=live,
+        )
+
+
+class SubflowInlining(OptimizationPass):
+    """Inlines subflows that consist of a single unconditional call
+
+    Only affects interpreters that support subtrees, as others
+    unwrap all subflows anyway. Integrated subflows are kept.
+    """
+
+    @staticmethod
+    def _is_trivial(node: TreeNode) -> bool:
+        if node.integrated or node.tree is None:
+            return False
+        inner = [
+            x for x in node.tree.nodes()
+            if not any(
+                x == getattr(link, 'shadow_collection', None)
+                for _, _, link in node.tree.tree
+            )
+        ]
+        return len(inner) == 1 and isinstance(inner[0].owner, OperationNode)
+
+    @staticmethod
+    def _output(node: TreeNode) -> BaseNode | None:
+        output = node.underlying_node
+        if isinstance(output, MorphNode):
+            if len(output.members) != 1 or output.members[0][0]:
+                return None
+            output = output.members[0][1]
+        return output
+
+    def run(self, tree: ExecutionTree, results: Any) -> ExecutionTree:  # noqa: ANN401
+        protected = result_uuids(results)
+        trivial = {}
+        for from_, to, _ in tree.tree:
+            for node in (from_, to):
+                owner = node.owner
+                if (
+                    isinstance(owner, TreeNode)
+                    and owner.uuid not in protected
+                    and owner.uuid not in trivial
+                ):
+                    trivial[owner.uuid] = self._is_trivial(owner)
+
+        edges = []
+        for from_, to, link in tree.tree:
+            if isinstance(from_.owner, TreeNode) and trivial.get(_uuid(from_)):
+                output = self._output(from_.owner)
+                if output is None:
+                    return tree
+                from_ = tracedLike(output)
+            if isinstance(to.owner, TreeNode) and trivial.get(_uuid(to)):
+                for bridge_link, bridge_node in deflat_edges(link):
+                    edges.append((from_, bridge_node, bridge_link))
+                continue
+            edges.append((from_, to, link))
+
+        return _rebuild(tree, edges)
+
+
+_registered_passes: list[OptimizationPass] = []
+
+
+def register_pass(pass_: OptimizationPass) -> None:
+    """Enables the pass for all interpreters created afterwards"""
+    _registered_passes.append(pass_)
+
+
+def unregister_pass(pass_: OptimizationPass | type[OptimizationPass]) -> None:
+    """Disables the pass (or all passes of the type) registered before"""
+    _registered_passes[:] = [
+        x for x in _registered_passes
+        if not (x is pass_ or (isinstance(pass_, type) and isinstance(x, pass_)))
+    ]
+
+
+def registered_passes() -> list[OptimizationPass]:
+    return list(_registered_passes)
+
+
+def run_passes(
+    tree: ExecutionTree,
+    results: Any,  # noqa: ANN401
+    passes: list[OptimizationPass],
+) -> tuple[ExecutionTree, list[PassStats]]:
+    """Applies passes to the tree in order
+
+    Returns:
+        tuple[ExecutionTree, list[PassStats]]: Optimized tree and statistics
+            of each pass
+    """
+    stats = []
+    for pass_ in passes:
+        nodes_before, edges_before = len(tree.nodes_), len(tree.tree)
+        start = time.perf_counter()
+        tree = pass_.run(tree, results)
+        stats.append(PassStats(
+            name=pass_.name,
+            nodes_before=nodes_before,
+            nodes_after=len(tree.nodes_),
+            edges_before=edges_before,
+            edges_after=len(tree.tree),
+            duration=time.perf_counter() - start,
+        ))
+        cout(
+            action=Action.Interpretation,
+            message=stats[-1].summary(),
+            verbosity=VerbosityLevel.AllSteps,
+            level=LogLevel.Debug,
+        )
+    return tree, stats
@@ -1,6 +1,9 @@
+import contextvars
+import os
 import re
 from collections import defaultdict
-from typing import Literal, Optional, overload
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Literal, Optional, overload
 from uuid import uuid4
 
 from malevich_space.ops.component_manager import ComponentManager
@@ -31,6 +34,7 @@ from malevich._utility import (
     LogLevel,
     Registry,
     cout,
+    df_to_docs,
     get_space_leaves,
     resolve_setup,
     unique,
@@ -55,6 +59,7 @@ from .._autoflow import tracer as gn
 from ..manifest import ManifestManager
 from ..models.nodes.asset import AssetNode
 from ..types import TracedNode
+from .space_cache import ComponentCache
 
 manf = ManifestManager()
 reg = Registry()
@@ -194,12 +199,16 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
         ops: SpaceOps | None = None,
         version_mode: VersionMode = VersionMode.PATCH,
         update_collections: bool = False,
+        component_cache: ComponentCache | None = None,
     ) -> None:
         """Space Interpreter
 
         Args:
             name (str): Name of the flow.
             reverse_id (str): Reverse id of the flow.
+            component_cache (ComponentCache, optional): Cache of components
+                looked up during interpretation. A new cache is created
+                for each interpreter by default.
         """
         super().__init__()
         self._state = SpaceInterpreterState()
@@ -242,9 +251,18 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
         self._state.space = space
         self._upload_collections = update_collections
         self._version_mode = version_mode
+        self._components = component_cache or ComponentCache()
+        self._uploads: ThreadPoolExecutor | None = None
 
         self.update_state()
 
+    def fork_state(self, state: SpaceInterpreterState) -> SpaceInterpreterState:
+        forked = SpaceInterpreterState()
+        forked.component_manager = state.component_manager
+        forked.space = state.space
+        forked.host = state.host
+        return forked
+
     @overload
     def _upload_schema(
         self,
@@ -329,13 +347,17 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
             core_id=core_id,
             core_alias=alias,
             schema_core_id=schema_core_id,
-            docs=[
-                row.to_json() for _, row in node.collection.collection_data.iterrows()
-            ],
+            docs=df_to_docs(node.collection.collection_data),
         )
 
         return uid
 
+    def _get_component(
+        self, state: SpaceInterpreterState, reverse_id: str
+    ) -> LoadedComponentSchema | None:
+        """internal"""
+        return self._components.get(state.space, reverse_id)
+
     def _ensure_aliases(self, node: BaseNode):
         if isinstance(node, TreeNode):
             if not node.alias:
@@ -362,9 +384,7 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
     def interpret(self, node: TreeNode, component: ComponentSchema) -> BaseTask:
         self._state.aux.tree = node
         if self._version_mode == VersionMode.DEFAULT:
-            loaded = self.state.space.get_parsed_component_by_reverse_id(
-                reverse_id=component.reverse_id
-            )
+            loaded = self._get_component(self.state, component.reverse_id)
 
             task = SpaceTask(state=self.state, component=loaded)
             all = {i.uid for i in loaded.flow.components}
@@ -381,12 +401,179 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
             return task
 
         self._ensure_aliases(node)
-        return super().interpret(node, component)
+        # Uploads are made in background only while the tree is interpreted
+        self._uploads = ThreadPoolExecutor(
+            max_workers=int(os.getenv('MALEVICH_SPACE_UPLOAD_WORKERS', 8)),
+            thread_name_prefix='malevich-space-upload',
+        )
+        try:
+            return super().interpret(node, component)
+        finally:
+            self._uploads.shutdown(cancel_futures=True)
+            self._uploads = None
+            self._state.uploads.clear()
 
     def before_interpret(self, state) -> SpaceInterpreterState:
         state.flow = FlowSchema()
         return state
 
+    def _submit_upload(
+        self,
+        state: SpaceInterpreterState,
+        node: gn.traced[BaseNode],
+        upload: Callable[
+            [SpaceInterpreterState, gn.traced], tuple[ComponentSchema, dict[str, str]]
+        ],
+    ) -> SpaceInterpreterState:
+        """Uploads the node in background while the graph is being built
+
+        The upload returns the component of the node and collection overrides
+        it introduces. Both are put into the state by :meth:`_join_uploads`,
+        so the state is not changed by workers.
+        """
+        state.components_alias[node.owner.uuid] = node.owner.alias
+        # Reserves the position of the component in the flow
+        state.components[node.owner.uuid] = None
+        state.uploads[node.owner.uuid] = self._uploads.submit(
+            contextvars.copy_context().run, upload, state, node
+        )
+        return state
+
+    def _join_uploads(self, state: SpaceInterpreterState) -> SpaceInterpreterState:
+        """Waits for uploads of nodes and reports all failed ones"""
+        errors = []
+        for uid, future in state.uploads.items():
+            try:
+                comp, overrides = future.result()
+            except Exception as e:
+                errors.append((uid, e))
+                continue
+            if not comp:
+                errors.append((uid, InterpretationError(
+                    "Failed to interpret the node. This is a bug, please report it.",
+                )))
+                continue
+            state.components[uid] = comp
+            state.collection_overrides.update(overrides)
+        state.uploads.clear()
+
+        if errors:
+            for uid, e in errors:
+                _log(
+                    f"Failed to upload {state.components_alias[uid]}: {e}",
+                    level=2,
+                )
+            raise InterpretationError(
+                "Failed to upload nodes: " + ", ".join(
+                    f"{state.components_alias[uid]} ({e})" for uid, e in errors
+                ),
+                self,
+                state,
+            ) from errors[0][1]
+        return state
+
+    def _collection_component(
+        self, state: SpaceInterpreterState, node: gn.traced[CollectionNode]
+    ) -> tuple[ComponentSchema, dict[str, str]]:
+        """Uploads the collection if needed and wraps it into a component"""
+        overrides = {}
+        # Try to get the collection component from the space
+        component = self._get_component(
+            # Using the collection id as the reverse id
+            state, node.owner.collection.collection_id
+        )
+
+        if component is None:
+            # Wrap the collection in a component schema
+            name = self.prettify_collection_name(
+                node.owner.collection.collection_id
+            )
+
+            _, schema_core_id = self._upload_schema(
+                state=state, node=node.owner, skip_create=False
+            )
+
+            if node.owner.collection.collection_data is None:
+                # NOTE: path is None is the only
+                # case for the exception. However,
+                # there may be some more, which should be
+                # checked as well
+                raise InterpretationError(
+                    "Cannot interpret collection "
+                    + node.owner.collection.collection_id
+                    + ". There is no such collection on Space and"
+                    + " there is no data provided to upload. Either use"
+                    + " existing collections, or provide `df` or `file` argument"
+                    + " in collection(...) call"
+                )
+
+            comp = ComponentSchema(
+                name=name,
+                description=f"Meta collection {name}",
+                reverse_id=node.owner.collection.collection_id,
+                collection=CollectionAliasSchema(
+                    core_alias=node.owner.collection.collection_id,
+                    schema_core_id=schema_core_id,
+                    # NOTE: 0.4.18 patch: path -> docs
+                    # path=path,
+                    docs=df_to_docs(node.owner.collection.collection_data),
+                ),
+            )
+        else:
+            if self._upload_collections:
+                coll_id = self.prettify_collection_id(
+                    node.owner.collection.collection_id
+                )
+                uid = self._upload_collection(
+                    state,
+                    node.owner,
+                    core_id=f"override-{coll_id}-{state.interpretation_id}",
+                )
+                overrides[component.collection.uid] = uid
+
+            comp = ComponentSchema(
+                reverse_id=component.reverse_id,
+                name=component.name,
+            )
+
+        return comp, overrides
+
+    def _asset_component(
+        self, state: SpaceInterpreterState, node: gn.traced[AssetNode]
+    ) -> tuple[ComponentSchema | LoadedComponentSchema, dict[str, str]]:
+        """Uploads the asset if it is changed and wraps it into a component"""
+        try:
+            comp = self._get_component(state, node.owner.name)
+        except Exception:
+            comp = None
+
+        if comp is None or comp.asset.checksum != node.owner.magic():
+            asset_ = state.space.create_asset(
+                asset=CreateAsset(
+                    core_path=node.owner.core_path,
+                    is_composite=node.owner.is_composite,
+                    checksum=node.owner.magic()
+                )
+            )
+            comp = ComponentSchema(
+                name=node.owner.name,
+                reverse_id=node.owner.name,
+                asset=asset_
+            )
+
+            asset_comp = state.space.parse_raw(comp, VersionMode.PATCH)
+            # A new version of the asset is created
+            self._components.invalidate(state.space, asset_comp.reverse_id)
+            asset_comp = self._get_component(state, asset_comp.reverse_id)
+
+            upload_zip_asset(
+                url=asset_comp.asset.upload_url,
+                file=node.owner.real_path if isinstance(node.owner.real_path, str) else None,
+                files=node.owner.real_path if isinstance(node.owner.real_path, list) else None,
+            )
+
+        return comp, {}
+
     def create_node(
         self, state: SpaceInterpreterState, node: gn.traced[BaseNode]
     ) -> SpaceInterpreterState:
@@ -401,67 +588,7 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
         """
 
         if isinstance(node.owner, CollectionNode):  # If the node is a collection
-            # Try to get the collection component from the space
-            component = state.space.get_parsed_component_by_reverse_id(
-                # Using the collection id as the reverse id
-                reverse_id=node.owner.collection.collection_id
-            )
-
-            if component is None:
-                # Wrap the collection in a component schema
-                name = self.prettify_collection_name(
-                    node.owner.collection.collection_id
-                )
-
-                _, schema_core_id = self._upload_schema(
-                    state=state, node=node.owner, skip_create=False
-                )
-
-                if node.owner.collection.collection_data is None:
-                    # NOTE: path is None is the only
-                    # case for the exception. However,
-                    # there may be some more, which should be
-                    # checked as well
-                    raise InterpretationError(
-                        "Cannot interpret collection "
-                        + node.owner.collection.collection_id
-                        + ". There is no such collection on Space and"
-                        + " there is no data provided to upload. Either use"
-                        + " existing collections, or provide `df` or `file` argument"
-                        + " in collection(...) call"
-                    )
-
-                comp = ComponentSchema(
-                    name=name,
-                    description=f"Meta collection {name}",
-                    reverse_id=node.owner.collection.collection_id,
-                    collection=CollectionAliasSchema(
-                        core_alias=node.owner.collection.collection_id,
-                        schema_core_id=schema_core_id,
-                        # NOTE: 0.4.18 patch: path -> docs
-                        # path=path,
-                        docs=[
-                            row.to_json() for _, row in
-                            node.owner.collection.collection_data.iterrows()
-                        ],
-                    ),
-                )
-            else:
-                if self._upload_collections:
-                    coll_id = self.prettify_collection_id(
-                        node.owner.collection.collection_id
-                    )
-                    uid = self._upload_collection(
-                        state,
-                        node.owner,
-                        core_id=f"override-{coll_id}-{state.interpretation_id}",
-                    )
-                    state.collection_overrides[component.collection.uid] = uid
-
-                comp = ComponentSchema(
-                    reverse_id=component.reverse_id,
-                    name=component.name,
-                )
+            return self._submit_upload(state, node, self._collection_component)
 
         elif isinstance(node.owner, OperationNode):  # If the node is an operation
 
@@ -482,10 +609,8 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
                 )
 
             # Get the component from the space (it should be there)
-            component = (
-                state.component_manager.space.get_parsed_component_by_reverse_id(
-                    reverse_id=extra["reverse_id"]
-                )
+            component = self._components.get(
+                state.component_manager.space, extra["reverse_id"]
             )
 
             if not component:
@@ -509,7 +634,8 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
             if not node.owner.integrated:
                 if not state.children_states.get(node.owner.uuid, None):
                     child_interpreter = SpaceInterpreter(
-                        setup=self.state.space.space_setup,
+                        setup=state.space.space_setup,
+                        component_cache=self._components,
                     )
 
                     comp = ComponentSchema(
@@ -519,6 +645,7 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
 
                     task_ = child_interpreter.interpret(node.owner, comp)
                     task_.upload()
+                    self._components.invalidate(state.space, node.owner.reverse_id)
                     child_state: SpaceInterpreterState = child_interpreter.state
                     comp.flow = child_state.flow
 
@@ -531,45 +658,10 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
                         flow=child_state.flow,
                     )
             else:
-                comp = state.space.get_parsed_component_by_reverse_id(
-                    reverse_id=node.owner.reverse_id
-                )
+                comp = self._get_component(state, node.owner.reverse_id)
 
         elif isinstance(node.owner, AssetNode):
-            try:
-                comp = self.state.space.get_parsed_component_by_reverse_id(
-                    reverse_id=node.owner.name
-                )
-            except Exception:
-                comp = None
-
-            if comp is None or comp.asset.checksum != node.owner.magic():
-                asset_ = self.state.space.create_asset(
-                    asset=CreateAsset(
-                        core_path=node.owner.core_path,
-                        is_composite=node.owner.is_composite,
-                        checksum=node.owner.magic()
-                    )
-                )
-                comp = ComponentSchema(
-                    name=node.owner.name,
-                    reverse_id=node.owner.name,
-                    asset=asset_
-                )
-
-                asset_comp = self.state.space.parse_raw(comp, VersionMode.PATCH)
-                asset_comp = self.state.space.get_parsed_component_by_reverse_id(
-                    reverse_id=asset_comp.reverse_id
-                )
-
-                upload_zip_asset(
-                    url=asset_comp.asset.upload_url,
-                    file=node.owner.real_path if isinstance(node.owner.real_path, str) else None,
-                    files=node.owner.real_path if isinstance(node.owner.real_path, list) else None,
-                )
-
-
-
+            return self._submit_upload(state, node, self._asset_component)
 
         if not comp:
             raise InterpretationError(
@@ -723,34 +815,71 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
 
         return state
 
-    def after_interpret(self, state: SpaceInterpreterState) -> SpaceInterpreterState:
-        """Finishes the interpretation by adding components to the flow."""
-        for uid, component in state.components.items():
-            try:
-                # I don't know why, but sometimes
-                # it fails, so try/exc here
-                loaded_component = state.component_manager.component(
-                    component, VersionMode.DEFAULT
-                )
-            except Exception as e:
-                # If it fails, try to get the component
-                # by reverse id
-                loaded_component = (
-                    state.component_manager.space.get_component_by_reverse_id(
-                        component.reverse_id
-                    )
+    def _load_component(
+        self, state: SpaceInterpreterState, component: ComponentSchema
+    ) -> None:
+        """Ensures the component exists in Space"""
+        try:
+            # I don't know why, but sometimes
+            # it fails, so try/exc here
+            loaded_component = state.component_manager.component(
+                component, VersionMode.DEFAULT
+            )
+        except Exception as e:
+            # If it fails, try to get the component
+            # by reverse id
+            loaded_component = (
+                state.component_manager.space.get_component_by_reverse_id(
+                    component.reverse_id
                 )
+            )
 
-                # No components?(
-                # Nothing to do here
-                if loaded_component is None:
-                    raise InterpretationError(
-                        f"Failed to interpret the flow: component {component.name} "
-                        "failed to load. ",
-                        self,
-                        state,
-                    ) from e
+            # No components?(
+            # Nothing to do here
+            if loaded_component is None:
+                raise InterpretationError(
+                    f"Failed to interpret the flow: component {component.name} "
+                    "failed to load. ",
+                    self,
+                    state,
+                ) from e
+
+    def _load_components(self, state: SpaceInterpreterState) -> None:
+        """Ensures all components of the flow exist in Space
+
+        Each distinct component is requested once, and independent
+        components are requested concurrently. If any of them fails,
+        pending requests are cancelled and running ones are waited for
+        before the error is raised.
+        """
+        distinct: dict[str, ComponentSchema] = {}
+        for component in state.components.values():
+            distinct.setdefault(component.reverse_id, component)
+
+        futures = [
+            self._uploads.submit(
+                contextvars.copy_context().run,
+                self._load_component,
+                state,
+                component,
+            )
+            for component in distinct.values()
+        ]
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+    def after_interpret(self, state: SpaceInterpreterState) -> SpaceInterpreterState:
+        """Finishes the interpretation by adding components to the flow."""
+        state = self._join_uploads(state)
+        self._load_components(state)
 
+        components = []
+        for uid, component in state.components.items():
             # If the component is an operation
             # and has config
             if uid in state.components_config:
@@ -769,8 +898,7 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
                 extra = {}
 
             # Add the component to the flow
-            state.flow.components = [
-                *state.flow.components,
+            components.append(
                 InFlowComponentSchema(
                     reverse_id=component.reverse_id,
                     alias=self.state.components_alias[uid],
@@ -784,8 +912,9 @@ class SpaceInterpreter(Interpreter[SpaceInterpreterState, SpaceTask]):
                     else None,
                     active_cfg=space_config,
                 ),
-            ]
+            )
 
+        state.flow.components = [*state.flow.components, *components]
         return state
 
     def get_task(self, state: SpaceInterpreterState) -> BaseTask[SpaceInterpreterState]:
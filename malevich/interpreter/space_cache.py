@@ -0,0 +1,165 @@
+"""
+Cache of Space components looked up during interpretation
+
+Each lookup of a component by its reverse id is a GraphQL request.
+Interpretation of a flow looks up the same components many times (once per
+node using them), so :class:`ComponentCache` keeps parsed components for
+the time of the session.
+
+Entries expire after `ttl` seconds (`MALEVICH_SPACE_COMPONENT_TTL`, 300 by
+default). Concurrent lookups of the same component are coalesced into
+a single request. Entries may also be persisted under `components` group
+of the Space cache to be reused by other processes: pass `persist=True`
+or set `MALEVICH_SPACE_COMPONENT_CACHE` environment variable. Persisted
+entries are signed (see :mod:`malevich._utility.cache.signing`) and are
+not unpickled if the signature is invalid.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from malevich_space.ops.space import SpaceOps
+from malevich_space.schema.component import LoadedComponentSchema
+
+from malevich._utility.cache.manager import CacheManager
+from malevich._utility.cache.signing import sign, verify
+
+
+class ComponentCache:
+    """Stores components of Space by reverse id and version"""
+
+    entry_group = 'components'
+
+    def __init__(
+        self,
+        ttl: float | None = None,
+        persist: bool | None = None,
+    ) -> None:
+        if ttl is None:
+            ttl = float(os.getenv('MALEVICH_SPACE_COMPONENT_TTL', 300))
+        if persist is None:
+            persist = os.getenv(
+                'MALEVICH_SPACE_COMPONENT_CACHE', ''
+            ).lower() in ('1', 'true', 'yes')
+
+        self.ttl = ttl
+        self.persist = persist
+        # key -> (expiration time, component)
+        self._memory: dict[str, tuple[float, LoadedComponentSchema]] = {}
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    @staticmethod
+    def _key(space: SpaceOps, reverse_id: str, version: str | None) -> str:
+        setup = getattr(space, 'space_setup', None)
+        return hashlib.sha256(json.dumps([
+            getattr(setup, 'api_url', None),
+            getattr(setup, 'org', None),
+            reverse_id,
+            version,
+        ]).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return CacheManager().space.get_entry_path(key + '.pkl', self.entry_group)
+
+    def _read(self, key: str) -> tuple[float, LoadedComponentSchema] | None:
+        try:
+            with open(self._path(key), 'rb') as file_:
+                payload = verify(file_.read())
+            if payload is None:
+                return None
+            expires, component = pickle.loads(payload)
+        except Exception:
+            return None
+        return (expires, component) if expires > time.time() else None
+
+    def _write(self, key: str, entry: tuple[float, Any]) -> None:
+        try:
+            CacheManager().space.write_entry(
+                sign(pickle.dumps(entry)),
+                entry_name=key + '.pkl',
+                entry_group=self.entry_group,
+                force_overwrite=True,
+            )
+        except Exception:
+            pass
+
+    def get(
+        self,
+        space: SpaceOps,
+        reverse_id: str,
+        version: str | None = None,
+    ) -> LoadedComponentSchema | None:
+        """Returns the parsed component, requesting Space on a miss
+
+        Missing components are not cached, as they may be created
+        later in the same session.
+
+        Args:
+            space (SpaceOps): Operations used to request the component
+            reverse_id (str): Reverse id of the component
+            version (str, optional): Version of the component. The latest
+                version is requested by default.
+        """
+        key = self._key(space, reverse_id, version)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > time.time():
+                return entry[1]
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            entry = self._read(key) if self.persist else None
+            if entry is None:
+                kwargs = {'reverse_id': reverse_id}
+                if version is not None:
+                    kwargs['version'] = version
+                with self._lock:
+                    self.requests += 1
+                component = space.get_parsed_component_by_reverse_id(**kwargs)
+                entry = (time.time() + self.ttl, component)
+                if component is not None and self.persist:
+                    self._write(key, entry)
+            if entry[1] is not None:
+                with self._lock:
+                    self._memory[key] = entry
+            future.set_result(entry[1])
+            return entry[1]
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def invalidate(
+        self,
+        space: SpaceOps,
+        reverse_id: str,
+        version: str | None = None,
+    ) -> None:
+        """Drops the component, e.g. after it is updated"""
+        key = self._key(space, reverse_id, version)
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.persist:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
@@ -1,11 +1,19 @@
 import hashlib
 import io
 import uuid
-from typing import Optional
+from typing import Any, Optional
 
 import pandas as pd
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializerFunctionWrapHandler,
+    model_serializer,
+)
 
+from malevich.models.payload import PayloadRef
 from malevich.models.python_string import PythonString
 
 
@@ -22,6 +30,36 @@ class Collection(BaseModel):
 
     persistent: bool = False
 
+    _payload: PayloadRef | pd.DataFrame | None = PrivateAttr(None)
+
+    @staticmethod
+    def from_payload(payload: PayloadRef, **fields) -> 'Collection':
+        """Creates a collection whose data is loaded on first access"""
+        collection = Collection.model_construct(**fields)
+        del collection.__dict__['collection_data']
+        collection._payload = payload
+        return collection
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        # Only called when the data of a lazy collection
+        # (see `from_payload`) is not loaded yet
+        if name == 'collection_data':
+            payload = (getattr(self, '__pydantic_private__', None) or {}).get(
+                '_payload'
+            )
+            if payload is not None:
+                value = payload.load() if isinstance(payload, PayloadRef) else payload
+                self.__dict__['collection_data'] = value
+                self._payload = None
+                return value
+        return super().__getattr__(name)
+
+    @model_serializer(mode='wrap')
+    def _serialize(self, handler: SerializerFunctionWrapHandler) -> Any:  # noqa: ANN401
+        # Lazy data should be loaded to be serialized
+        self.collection_data
+        return handler(self)
+
     @staticmethod
     def from_file(file: str, id: None = uuid.uuid4()) -> None:
         return Collection(
@@ -1,8 +1,12 @@
+import inspect
 import warnings
-from typing import Any, Callable, Generic, ParamSpec, TypeVar
+from typing import TYPE_CHECKING, Any, Callable, Generic, ParamSpec, TypeVar
 
 from malevich_space.schema import ComponentSchema
 
+if TYPE_CHECKING:
+    from malevich._meta.template import FlowTemplate
+
 Params = ParamSpec("Params")
 R = TypeVar("R")
 
@@ -73,5 +77,21 @@ class FlowFunction(Generic[Params, R]):
     def __call__(self, *args: Params.args, **kwds: Params.kwargs) -> R:
         return self._Captured(*args, __component=self.__component, **kwds)
 
+    def template(self, *args: Params.args, **kwargs: Params.kwargs) -> 'FlowTemplate':
+        """Traces the flow once to instantiate it with different inputs
+
+        Arguments that are not provided are traced with empty
+        placeholder collections. See :class:`FlowTemplate
+        <malevich._meta.template.FlowTemplate>` for details.
+        """
+        import pandas as pd
 
+        from malevich._meta.template import FlowTemplate
 
+        arguments = list(inspect.signature(self._Captured).parameters.keys())
+        placeholders = {
+            name: pd.DataFrame()
+            for name in arguments[len(args):]
+            if name not in kwargs
+        }
+        return FlowTemplate(self(*args, **kwargs, **placeholders), arguments)
@@ -0,0 +1,58 @@
+import io
+import os
+
+import pandas as pd
+
+
+def _loaded(value: pd.DataFrame) -> pd.DataFrame:
+    return value
+
+
+class PayloadRef:
+    """Reference to a DataFrame serialized out-of-line
+
+    The payload is identified by the SHA-256 of its pickled bytes and
+    is either held in memory (e.g. a slice of a serialized task) or
+    stored in a directory as `<digest>.pkl`. The frame is unpickled on
+    the first call to :meth:`load`.
+    """
+
+    def __init__(
+        self,
+        digest: str,
+        data: bytes | memoryview | None = None,
+        store: str | None = None,
+    ) -> None:
+        if data is None and store is None:
+            raise ValueError("Either data or store should be provided")
+        self.digest = digest
+        self._data = data
+        self._store = store
+        self._frame = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._frame is not None
+
+    def path(self, store: str | None = None) -> str:
+        return os.path.join(store or self._store, self.digest + '.pkl')
+
+    def raw(self) -> bytes:
+        """Returns pickled bytes of the frame"""
+        if self._data is not None:
+            return bytes(self._data)
+        with open(self.path(), 'rb') as file_:
+            return file_.read()
+
+    def load(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = pd.read_pickle(io.BytesIO(self.raw()))
+        return self._frame
+
+    def __reduce__(self) -> tuple:
+        # Outside of the compact format the reference is not meaningful,
+        # so the frame itself is pickled
+        return (_loaded, (self.load(),))
+
+    def __repr__(self) -> str:
+        return f"PayloadRef({self.digest[:12]}, loaded={self.loaded})"
@@ -38,6 +38,9 @@ class CoreInterpreterState(BaseCoreState):
     params: CoreParams = CoreParams()
     """Interpreter parameters"""
 
+    operation_aliases: dict[str, str] = {}
+    """Mapping of operation node uuids to their aliases"""
+
 
 
     def __deepcopy__(self, memo=None) -> "CoreInterpreterState":
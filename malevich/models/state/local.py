@@ -5,3 +5,5 @@ class LocalInterpreterState(BaseCoreState):
     """State of the LocalInterpreter"""
     import_paths: set[str] = set()
 
+    operation_aliases: dict[str, str] = {}
+    """Mapping of operation node uuids to their aliases"""
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from concurrent.futures import Future
 from enum import Enum
 from typing import Any
 from uuid import uuid4
@@ -74,6 +75,8 @@ class SpaceInterpreterState:
         # task_id, flow_id, etc.
         self.aux: SpaceAuxParams = SpaceAuxParams()
         self.children_states: dict[str, SpaceInterpreterState] = {}
+        # A mapping from node uuid to pending upload of its component
+        self.uploads: dict[str, Future] = {}
 
     def copy(self) -> 'SpaceInterpreterState':
         state = SpaceInterpreterState()
@@ -91,4 +94,5 @@ class SpaceInterpreterState:
         state.collection_overrides = self.collection_overrides
         state.host = self.host
         state.children_states = self.children_states
+        state.uploads = self.uploads
         return state
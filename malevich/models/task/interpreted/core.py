@@ -1,24 +1,41 @@
+import asyncio
 import enum
 import hashlib
 import importlib
 import json
+import logging
 import os
 import pickle
 import uuid
 import warnings
 from copy import deepcopy
-from typing import Any, Iterable, Literal, Optional, Type
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Callable, Iterable, Literal, Optional, Type
 
 import malevich_coretools as core
 import pandas as pd
+from malevich_coretools.clickhouse.abstract import ClickhouseFun
+from malevich_coretools.clickhouse.utils import clickhouse_query
 from malevich_space.schema import ComponentSchema
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, PrivateAttr, TypeAdapter, ValidationError
+from requests.exceptions import HTTPError
 
 from malevich._autoflow.tracer import traced, tracedLike
+from malevich._core import aio
+from malevich._core.diff import EntriesDiff, PipelineDiff, diff_pipelines
 from malevich._core.ops import (
     batch_upload_collections,
 )
-from malevich._utility import IgnoreCoreLogs, LogLevel, cout, upload_zip_asset
+from malevich._db import drop_snapshots, get_snapshot, put_snapshot
+from malevich._utility import (
+    IgnoreCoreLogs,
+    LogLevel,
+    cout,
+    run_blocking,
+    upload_zip_asset,
+)
+from malevich._utility.timing import StageTimer
 from ...nodes.morph import MorphNode
 from ...._utility.cache.manager import CacheManager
 from malevich.models import (
@@ -31,6 +48,7 @@ from malevich.models import (
     CoreInterpreterState,
     CoreLocalDFResult,
     CoreResult,
+    DocumentNode,
     MetaEndpoint,
     OperationNode,
     TreeNode,
@@ -38,11 +56,12 @@ from malevich.models import (
 )
 from malevich.types import FlowOutput
 
-from ...._utility.package import PackageManager
 from ...exceptions import NoPipelineFoundError, NoTaskToConnectError
 from ...overrides import AssetOverride, CollectionOverride, DocumentOverride, Override
 from ..base import BaseTask
 
+logger = logging.getLogger(__name__)
+
 
 class BootError(Exception):
     ...
@@ -60,12 +79,71 @@ class CoreTaskStage(enum.Enum):
     NO_TASK = 3
 
 
+def _frame_stats(df: pd.DataFrame | None) -> tuple[int | None, int | None]:
+    if df is None:
+        return None, None
+    return int(df.memory_usage(index=True).sum()), len(df)
+
+
+def _timestamp(value: str) -> datetime:
+    # Timestamps of Core are converted to local time as measured ones
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def _not_found(error: HTTPError) -> bool:
+    return (
+        error.response is not None
+        and error.response.status_code == HTTPStatus.NOT_FOUND
+    )
+
+
+def _logs_stats(logs: core.AppLogs) -> tuple[int, int]:
+    # Total length of logs and number of apps that reported them
+    size = len(logs.dagLogs or '')
+    for app_log in logs.data.values():
+        for result in app_log.data:
+            size += len(result.data or '')
+            size += sum(len(x) for x in (result.logs or {}).values())
+            size += sum(len(x) for x in (result.userLogs or {}).values())
+    return size, len(logs.data)
+
+
+def _files_size(path: str | list[str] | None) -> int | None:
+    try:
+        if isinstance(path, str):
+            return os.path.getsize(path)
+        elif isinstance(path, list):
+            return sum(os.path.getsize(p) for p in path)
+    except OSError:
+        pass
+    return None
+
+
 class CoreTaskState(CoreInterpreterState):
     unique_task_hash: str | None = None
     config: core.Cfg | None = None
     config_id: str | None = None
     pipeline_id: str | None = None
 
+    _pipeline_hash: str | None = PrivateAttr(default=None)
+    """Memoized hash of the pipeline, see :meth:`CoreTask.get_pipeline_hash`"""
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
+        if name in ('processors', 'conditions', 'results'):
+            self.invalidate_pipeline_hash()
+        super().__setattr__(name, value)
+
+    def invalidate_pipeline_hash(self) -> None:
+        """Drops the memoized pipeline hash
+
+        Should be called after the pipeline is mutated in place,
+        e.g. when processors are configured
+        """
+        self._pipeline_hash = None
+
 
 class CoreTask(BaseTask):
     """Represents a task on Malevich Core.
@@ -76,6 +154,13 @@ class CoreTask(BaseTask):
 
     supports_conditional_output = True
 
+    snapshot_ttl: dict[str, float] = {
+        'pipeline': 300.,
+        'cfg': 300.,
+        'operation': 15.,
+    }
+    """Time in seconds for which snapshots of Core entities are considered fresh"""
+
     @staticmethod
     def load(object_bytes: bytes) -> 'CoreTask':
         return pickle.loads(object_bytes)
@@ -97,23 +182,110 @@ class CoreTask(BaseTask):
         self.component = component
 
         self._returned = None
-
-        CacheManager().core.write_entry(
-            self.get_pipeline().model_dump_json(indent=4),
-            entry_name=self.get_pipeline_hash() + '.json',
-            entry_group='pipelines',
-            force_overwrite=True
-        )
+        self._config_models = None
 
     def get_active_tasks(self) -> list[str]:
         return self.state.service.run.active.list().ids
 
-    def get_stage(self) -> CoreTaskStage:
+    def _snapshot_key(self) -> tuple[str, str]:
+        """internal
+
+        Core host and user the snapshots are stored for
+        """
+        auth = self.state.params.core_auth
+        return self.state.params.core_host or '', auth[0] if auth else ''
+
+    def _snapshot(
+        self,
+        unique_task_hash: str,
+        kind: Literal['pipeline', 'cfg', 'operation'],
+        fetch: Callable[[], str | None],
+        use_cache: bool = True,
+        store: bool = True,
+    ) -> str | None:
+        """internal
+
+        Returns a payload of the entity stored on Core, reading it from
+        the local snapshot if it is fresh enough. Payloads for which `fetch`
+        returns None are not stored, neither are any payloads if `store`
+        is False
+        """
+        if unique_task_hash is None:
+            return fetch()
+
+        if use_cache:
+            try:
+                payload = get_snapshot(
+                    *self._snapshot_key(),
+                    unique_task_hash,
+                    kind,
+                    ttl=self.snapshot_ttl[kind],
+                )
+            except Exception:
+                payload = None
+            if payload is not None:
+                cout(
+                    action=Action.Attachment,
+                    message=f"Using local snapshot of {kind} {unique_task_hash}",
+                    verbosity=VerbosityLevel.AllSteps,
+                    level=LogLevel.Debug
+                )
+                return payload
+
+        payload = fetch()
+        if payload is not None and store:
+            self._put_snapshot(unique_task_hash, kind, payload)
+        return payload
+
+    def _put_snapshot(
+        self,
+        unique_task_hash: str,
+        kind: Literal['pipeline', 'cfg', 'operation'],
+        payload: str,
+    ) -> None:
+        """internal"""
+        try:
+            put_snapshot(*self._snapshot_key(), unique_task_hash, kind, payload)
+        except Exception:
+            pass
+
+    def _drop_snapshots(
+        self,
+        kind: Literal['pipeline', 'cfg', 'operation'] | None = None,
+    ) -> None:
+        """internal"""
+        if self.state.unique_task_hash is None:
+            return
+        try:
+            drop_snapshots(
+                *self._snapshot_key(), self.state.unique_task_hash, kind
+            )
+        except Exception:
+            pass
+
+    def _fetch_pipeline(self, unique_task_hash: str) -> str:
+        """internal"""
+        return self.state.service.pipeline.id(
+            unique_task_hash
+        ).get().model_dump_json()
+
+    def _fetch_active_tasks(self) -> str | None:
+        """internal"""
+        tasks = self.get_active_tasks()
+        return json.dumps(tasks) if tasks else None
+
+    def get_stage(self, use_cache: bool = True) -> CoreTaskStage:
         if self.state.pipeline_id is not None:
             try:
                 with IgnoreCoreLogs():
-                    runs = self.get_active_tasks()
-                    if self.state.pipeline_id in runs:
+                    runs = self._snapshot(
+                        self.state.unique_task_hash,
+                        'operation',
+                        self._fetch_active_tasks,
+                        use_cache=use_cache,
+                        store=False,
+                    )
+                    if runs and self.state.params.operation_id in json.loads(runs):
                         return CoreTaskStage.ONLINE
             except Exception:
                 pass
@@ -121,9 +293,12 @@ class CoreTask(BaseTask):
         if self.state.unique_task_hash is not None:
             try:
                 with IgnoreCoreLogs():
-                    self.state.service.pipeline.id(
-                        self.state.unique_task_hash
-                    ).get()
+                    self._snapshot(
+                        self.state.unique_task_hash,
+                        'pipeline',
+                        lambda: self._fetch_pipeline(self.state.unique_task_hash),
+                        use_cache=use_cache,
+                    )
                 return CoreTaskStage.BUILT
             except Exception:
                 pass
@@ -154,6 +329,7 @@ class CoreTask(BaseTask):
         self.state.processors[operation].platform = platform
         if platform_settings:
             self.state.processors[operation].platformSettings = platform_settings
+        self.state.invalidate_pipeline_hash()
 
     def configure(
         self,
@@ -202,14 +378,48 @@ class CoreTask(BaseTask):
         return pipeline
 
     def get_pipeline_hash(self) -> str:
-        return hashlib.sha256(
-           self.get_pipeline(with_hash=False).model_dump_json().encode() 
-        ).hexdigest()
+        """Returns SHA-256 of the pipeline
+
+        The hash is memoized in the state and recomputed only after
+        processors, conditions or results are changed
+        """
+        if self.state._pipeline_hash is None:
+            self.state._pipeline_hash = hashlib.sha256(
+                self.get_pipeline(with_hash=False).model_dump_json().encode()
+            ).hexdigest()
+        return self.state._pipeline_hash
+
+    def _cache_pipeline(self) -> None:
+        """internal
+
+        Writes the pipeline to the cache. Entries are named by the
+        pipeline hash, so existing ones are never rewritten
+        """
+        cache = CacheManager().core
+        entry_name = self.get_pipeline_hash() + '.json'
+        ok_, _ = cache.probe_new_entry(entry_name, 'pipelines')
+        if not ok_:
+            return
+        cache.write_entry(
+            self.get_pipeline().model_dump_json(indent=4),
+            entry_name=entry_name,
+            entry_group='pipelines',
+            force_overwrite=True
+        )
+
+    def _timer(self, run_id: str | None = None) -> StageTimer:
+        """internal"""
+        return StageTimer(
+            pipeline_hash=self.get_pipeline_hash(),
+            task_id=self.state.params.operation_id,
+            run_id=run_id,
+        )
 
     async def prepare(
         self,
         stage: PrepareStages = PrepareStages.ALL,
         *args,
+        patch_from: str | None = None,
         **kwargs
     ) -> tuple[str, str]:
         """Prepares the task to be executed on Malevich Core
@@ -219,9 +429,17 @@ class CoreTask(BaseTask):
         to the Core. During boot stage the task is actually
         deployed and gets ready for accepting runs.
 
+        If the pipeline already exists on Core, it is compared with
+        the local one and only updated when processors, conditions or
+        results differ. If the task is online and neither the pipeline
+        nor the configuration changed, the running operation is reused
+        instead of being prepared again.
+
         Args:
             - stage (PrepareStages, optional): The stage to be executed.
                 Defaults to PrepareStages.ALL.
+            - patch_from (str, optional): The hash of previously deployed
+                pipeline to patch in place instead of creating a new one.
             - *args (Any, optional):
                 Positional arguments to be passed to the :func`malevich.core_api.task_prepare`
                 function.
@@ -239,80 +457,201 @@ class CoreTask(BaseTask):
             verbosity=VerbosityLevel.OnlyStatus,
             level=LogLevel.Info
         )
+        timer = self._timer()
+        try:
+            return await self._prepare(
+                timer, stage, *args, patch_from=patch_from, **kwargs
+            )
+        finally:
+            timer.flush()
+
+    async def _prepare(
+        self,
+        timer: StageTimer,
+        stage: PrepareStages,
+        *args,
+        patch_from: str | None = None,
+        **kwargs
+    ) -> tuple[str, str]:
+        """internal"""
+        # Data is uploaded concurrently, each request in the shared I/O pool
+        await asyncio.gather(
+            *(
+                run_blocking(self._upload_collection, node, timer)
+                for node in self.state.collection_nodes.values()
+            ),
+            *(
+                run_blocking(self._upload_asset, node, timer)
+                for node in self.state.asset_nodes.values()
+            ),
+            *(
+                run_blocking(self._upload_document, node, timer)
+                for node in self.state.document_nodes.values()
+            ),
+        )
+
+        if not self.state.config:
+            config = core.Cfg(
+                collections={
+                    v.collection.collection_id: v.collection.core_id
+                    for k, v in self.state.collection_nodes.items()
+                }
+            )
+
+            for an in self.state.asset_nodes.values():
+                config.collections = {
+                    **config.collections,
+                    an.name: an.get_core_path(),
+                }
+
+            for dn in self.state.document_nodes.values():
+                config.collections = {
+                    **config.collections,
+                    dn.reverse_id: dn.get_core_path(),
+                }
+
+            self.state.config = config
+
+        pipeline_diff = None
+        if stage.value & PrepareStages.BUILD.value:
+            if patch_from:
+                self.state.unique_task_hash = patch_from
+            elif not self.state.unique_task_hash:
+                self.state.unique_task_hash = self.get_pipeline_hash()
+
+            self.state.config_id = self.state.unique_task_hash
+            self._cache_pipeline()
+            pipeline_diff = await run_blocking(self._build_pipeline, timer)
+
+            self._drop_snapshots('pipeline')
+
+        if stage.value & PrepareStages.BOOT.value:
+            if self.state.pipeline_id is None:
+                raise BootError(
+                    "Failed to boot: no pipeline found. "
+                    "Try `.prepare(stage=PrepareStages.BUILD)` or reinterpret the task"
+                )
+            if await run_blocking(self._is_warm, pipeline_diff):
+                cout(
+                    action=Action.Preparation,
+                    message=(
+                        f"Task {self.state.params.operation_id} is online and "
+                        "up to date, reusing it."
+                    ),
+                    verbosity=VerbosityLevel.AllSteps,
+                    level=LogLevel.Debug
+                )
+                return self.state.unique_task_hash, self.state.params.operation_id
+
+            await run_blocking(self._boot, timer, *args, **kwargs)
+
+        return self.state.unique_task_hash, self.state.params.operation_id
+
+    def _upload_collection(self, node: CollectionNode, timer: StageTimer) -> None:
+        """internal
+
+        Uploads data of the collection node
+        """
         service = self.state.service
-        for node in self.state.collection_nodes.values():
-            collection = node.collection
+        collection = node.collection
+        size, count = _frame_stats(collection.collection_data)
+        with timer.measure(
+            'prepare', 'collection', label=node.alias, size=size, count=count
+        ):
             collection.core_id = (
                 service.collection.name(collection.magic())
                 .update_or_create(collection.collection_data)
             )
 
-        for node in self.state.asset_nodes.values():
-            if node.core_path is not None:
-                with IgnoreCoreLogs():
+    def _upload_asset(self, node: AssetNode, timer: StageTimer) -> None:
+        """internal
+
+        Uploads files of the asset node unless they match the Core
+        """
+        service = self.state.service
+        if node.core_path is None:
+            return
+        with timer.measure(
+            'prepare',
+            'asset',
+            label=node.name,
+            size=_files_size(node.real_path),
+            count=len(node.real_path) if isinstance(node.real_path, list) else 1,
+        ), IgnoreCoreLogs():
+            try:
+                try:
+                    files = service.asset.path(node.core_path).list(
+                        recursive=True
+                    ).files
+                except Exception as fe:
                     try:
-                        try:
-                            files = service.asset.path(node.core_path).list(
-                                recursive=True
-                            ).files
-                        except Exception as fe:
-                            try:
-                                files = service.asset.path(node.core_path).get()
-                            except Exception as e:
-                                raise fe from e
-
-
-
-                        if node.real_path is not None:
-                            if isinstance(files, bytes):
-                                if isinstance(node.real_path, str):
-                                    if os.path.getsize(node.real_path) != len(files):
-                                        raise FileNotFoundError(
-                                            f'{node.real_path} size mismatch'
-                                        )
-                                elif isinstance(node.real_path, list) and len(node.real_path) == 1:  # noqa: E501
-                                    if os.path.getsize(node.real_path[0]) != len(files):
-                                        raise FileNotFoundError(
-                                            f'{node.real_path} size mismatch'
-                                        )
-                                else:
-                                    raise FileNotFoundError(
-                                        "Multiple files specified, but core asset is a single file"  # noqa: E501
-                                    )
-                            else:
-                                for file in node.real_path:
-                                    if file not in files:
-                                        raise FileNotFoundError(f'{file} missing')
-                                    if os.path.getsize(file) != files[file]:
-                                        raise FileNotFoundError(
-                                            f'{file} size mismatch')
+                        files = service.asset.path(node.core_path).get()
                     except Exception as e:
-                        if isinstance(e, FileNotFoundError):
-                            message = e.strerror
+                        raise fe from e
+
+
+
+                if node.real_path is not None:
+                    if isinstance(files, bytes):
+                        if isinstance(node.real_path, str):
+                            if os.path.getsize(node.real_path) != len(files):
+                                raise FileNotFoundError(
+                                    f'{node.real_path} size mismatch'
+                                )
+                        elif isinstance(node.real_path, list) and len(node.real_path) == 1:  # noqa: E501
+                            if os.path.getsize(node.real_path[0]) != len(files):
+                                raise FileNotFoundError(
+                                    f'{node.real_path} size mismatch'
+                                )
                         else:
-                            message = 'Failed to fetch asset'
+                            raise FileNotFoundError(
+                                "Multiple files specified, but core asset is a single file"  # noqa: E501
+                            )
+                    else:
+                        for file in node.real_path:
+                            if file not in files:
+                                raise FileNotFoundError(f'{file} missing')
+                            if os.path.getsize(file) != files[file]:
+                                raise FileNotFoundError(
+                                    f'{file} size mismatch')
+            except Exception as e:
+                if isinstance(e, FileNotFoundError):
+                    message = e.strerror
+                else:
+                    message = 'Failed to fetch asset'
 
-                        service.asset.path(node.core_path).create(
-                            file=node.real_path if isinstance(node.real_path, str) else None,  # noqa: E501
-                            files=node.real_path if isinstance(node.real_path, list) else None,  # noqa: E501
-                        )
+                service.asset.path(node.core_path).create(
+                    file=node.real_path if isinstance(node.real_path, str) else None,
+                    files=node.real_path if isinstance(node.real_path, list) else None,
+                )
 
-                        cout(
-                            action=Action.Preparation,
-                            message=f"Asset {node.name} updated. {message}",
-                            verbosity=VerbosityLevel.AllSteps,
-                            level=LogLevel.Debug
-                        )
+                cout(
+                    action=Action.Preparation,
+                    message=f"Asset {node.name} updated. {message}",
+                    verbosity=VerbosityLevel.AllSteps,
+                    level=LogLevel.Debug
+                )
 
-                    else:
-                        cout(
-                            action=Action.Preparation,
-                            message=f"Asset {node.name} fully matched with the Core",
-                            verbosity=VerbosityLevel.AllSteps,
-                            level=LogLevel.Debug
-                        )
-
-        for node in self.state.document_nodes.values():
+            else:
+                cout(
+                    action=Action.Preparation,
+                    message=f"Asset {node.name} fully matched with the Core",
+                    verbosity=VerbosityLevel.AllSteps,
+                    level=LogLevel.Debug
+                )
+
+    def _upload_document(self, node: DocumentNode, timer: StageTimer) -> None:
+        """internal
+
+        Uploads the document node unless it is on the Core
+        """
+        service = self.state.service
+        with timer.measure(
+            'prepare',
+            'document',
+            label=node.reverse_id,
+            size=len(node.dump_document_json()),
+        ):
             try:
                 ref = service.document.name(node.magic())
                 with IgnoreCoreLogs():
@@ -333,45 +672,25 @@ class CoreTask(BaseTask):
                     level=LogLevel.Debug
                 )
 
-        if not self.state.config:
-            config = core.Cfg(
-                collections={
-                    v.collection.collection_id: v.collection.core_id
-                    for k, v in self.state.collection_nodes.items()
-                }
-            )
-
-            for an in self.state.asset_nodes.values():
-                config.collections = {
-                    **config.collections,
-                    an.name: an.get_core_path(),
-                }
-
-            for dn in self.state.document_nodes.values():
-                config.collections = {
-                    **config.collections,
-                    dn.reverse_id: dn.get_core_path(),
-                }
-
-            self.state.config = config
+    def _build_pipeline(self, timer: StageTimer) -> PipelineDiff | None:
+        """internal
 
-        if stage.value & PrepareStages.BUILD.value:
-            if not self.state.unique_task_hash:
-                self.state.unique_task_hash = self.get_pipeline_hash()
-
-            self.state.config_id = self.state.unique_task_hash
+        Creates the pipeline on Core or updates the existing one
+        """
+        service = self.state.service
+        pipeline_diff = None
+        with timer.measure(
+            'prepare',
+            'pipeline',
+            count=len(self.state.processors) + len(self.state.conditions),
+        ):
+            pref = service.pipeline.id(self.state.unique_task_hash)
             try:
-                pref = service.pipeline.id(self.state.unique_task_hash)
                 with IgnoreCoreLogs():
-                    self.state.pipeline_id = pref.get().pipelineId
-                    cout(
-                        action=Action.Preparation,
-                        message=f"Pipeline {self.state.unique_task_hash} found.",
-                        verbosity=VerbosityLevel.AllSteps,
-                        level=LogLevel.Debug
-                    )
-
-            except Exception:
+                    remote_pipeline = pref.get()
+            except HTTPError as e:
+                if not _not_found(e):
+                    raise
                 self.state.pipeline_id = pref.create(
                     processors=self.state.processors,
                     conditions=self.state.conditions or None,
@@ -384,14 +703,44 @@ class CoreTask(BaseTask):
                     verbosity=VerbosityLevel.AllSteps,
                     level=LogLevel.Debug
                 )
+                return pipeline_diff
 
-        if stage.value & PrepareStages.BOOT.value:
-            if self.state.pipeline_id is None:
-                raise BootError(
-                    "Failed to boot: no pipeline found. "
-                    "Try `.prepare(stage=PrepareStages.BUILD)` or reinterpret the task"
+            self.state.pipeline_id = remote_pipeline.pipelineId
+            cout(
+                action=Action.Preparation,
+                message=f"Pipeline {self.state.unique_task_hash} found.",
+                verbosity=VerbosityLevel.AllSteps,
+                level=LogLevel.Debug
+            )
+
+            pipeline_diff = diff_pipelines(self.get_pipeline(), remote_pipeline)
+            if pipeline_diff.pipeline_changed:
+                # Core replaces the whole pipeline on update, so
+                # the diff only tells whether to update it at all
+                pref.update(
+                    processors=self.state.processors,
+                    conditions=self.state.conditions or None,
+                    results=self.state.results,
                 )
-            try:
+                cout(
+                    action=Action.Preparation,
+                    message=(
+                        f"Pipeline {self.state.unique_task_hash} updated: "
+                        f"{pipeline_diff.summary()}"
+                    ),
+                    verbosity=VerbosityLevel.AllSteps,
+                    level=LogLevel.Debug
+                )
+        return pipeline_diff
+
+    def _boot(self, timer: StageTimer, *args, **kwargs) -> None:
+        """internal
+
+        Uploads the configuration and starts the operation
+        """
+        service = self.state.service
+        try:
+            with timer.measure('prepare', 'boot') as measure_:
                 service.cfg.name(self.state.config_id).update_or_create(
                     cfg_id=self.state.config_id,
                     cfg=self.state.config,
@@ -402,14 +751,43 @@ class CoreTask(BaseTask):
                     *args,
                     **kwargs
                 ).operationId
-            except (Exception, KeyboardInterrupt) as e:
-                try:
-                    service.run.operation_id(self.state.params.operation_id).stop()
-                except Exception:
-                    pass
-                raise e
+                measure_.task_id = self.state.params.operation_id
+            self._drop_snapshots('cfg')
+            self._put_snapshot(
+                self.state.unique_task_hash,
+                'operation',
+                json.dumps([self.state.params.operation_id]),
+            )
+        except (Exception, KeyboardInterrupt) as e:
+            try:
+                service.run.operation_id(self.state.params.operation_id).stop()
+            except Exception:
+                pass
+            raise e
 
-        return self.state.unique_task_hash, self.state.params.operation_id
+    def _is_warm(self, pipeline_diff: PipelineDiff | None) -> bool:
+        """internal
+
+        Checks whether the online operation can be reused without
+        preparing the pipeline again
+        """
+        if pipeline_diff is None or pipeline_diff.pipeline_changed:
+            return False
+        if self.state.params.operation_id is None:
+            return False
+        try:
+            with IgnoreCoreLogs():
+                if self.state.params.operation_id not in self.get_active_tasks():
+                    return False
+                remote_cfg = core.Cfg(**json.loads(
+                    self.state.service.cfg.name(self.state.config_id).get().data
+                ))
+        except Exception:
+            return False
+
+        return EntriesDiff.compare(
+            self.state.config.collections, remote_cfg.collections
+        ).is_empty
 
     def _prepare_collection_overrides(
         self,
@@ -491,30 +869,6 @@ class CoreTask(BaseTask):
             if injectable.get_inject_key() in real_overrides
         }
 
-    def _validate_proc_cfg_ext(
-        self,
-        package_id: str,
-        processor_id: str,
-        config_extension,
-    ):
-        """internal"""
-        from malevich._meta.decor import ProcessorFunction
-        try:
-            PackageManager().get_package(package_id)
-            module = importlib.import_module(f'malevich.{package_id}')
-        except Exception:
-            return None
-        if not hasattr(module, processor_id):
-            return None
-        proc_stub = getattr(module, processor_id)
-        if not isinstance(proc_stub, ProcessorFunction):
-            return None
-
-        if isinstance(proc_stub.config, BaseModel) and isinstance(config_extension, BaseModel):  # noqa: E501
-            return type(proc_stub.config) == type(config_extension)  # noqa: E721
-        else:
-            return True
-
     def _get_config_model(self, package_id: str, processor_id: str) -> BaseModel | None:
         from malevich._meta.decor import ProcessorFunction
 
@@ -523,73 +877,102 @@ class CoreTask(BaseTask):
         except ImportError:
             return None
 
-        proc_stub = getattr(module, processor_id)
+        proc_stub = getattr(module, processor_id, None)
         if isinstance(proc_stub, ProcessorFunction):
-            if issubclass(proc_stub.config, BaseModel):
+            if (
+                isinstance(proc_stub.config, type)
+                and issubclass(proc_stub.config, BaseModel)
+                # Processors without declared config accept anything
+                and proc_stub.config is not BaseModel
+            ):
                 return proc_stub.config
         return None
 
+    def _get_config_models(
+        self
+    ) -> dict[str, tuple[OperationNode, Type[BaseModel] | None, TypeAdapter | None]]:
+        """internal
+
+        Resolves config models of all operations once per task. Maps
+        operation alias to the node, its config model and a prebuilt
+        validator for the model.
+        """
+        config_models = getattr(self, '_config_models', None)
+        if config_models is not None:
+            return config_models
+
+        config_models = {}
+        by_processor = {}
+        for x in self.state.operation_nodes.values():
+            if not isinstance(x, OperationNode):
+                continue
+            key = (x.package_id, x.processor_id)
+            if key not in by_processor:
+                config_model = self._get_config_model(*key)
+                by_processor[key] = (
+                    config_model,
+                    TypeAdapter(config_model) if config_model is not None else None
+                )
+            config_models[x.alias] = (x, *by_processor[key])
+
+        self._config_models = config_models
+        return config_models
+
     def _validate_extension(
         self,
         config_extension: dict[str, dict[str, Any] | BaseModel],
     ) -> str:
         app_cfg_extensions = {}
-        print([*self.state.operation_nodes.values()])
+        config_models = self._get_config_models()
         for alias, extension in config_extension.items():
-            for x in self.state.operation_nodes.values():
-                if isinstance(x, OperationNode) and x.alias == alias:
-                    config_model: BaseModel | None = self._get_config_model(
-                        x.package_id,
-                        x.processor_id
+            if alias not in config_models:
+                continue
+
+            x, config_model, validator = config_models[alias]
+            if not isinstance(extension, (BaseModel, dict)):
+                _expected = "dictionary"
+                if config_model is not None:
+                    _expected += f' or {config_model.__name__}'
+
+                raise ValueError(
+                    "Invalid type for config extension. "
+                    f"Expected {_expected}, but found {type(extension).__name__} "
+                    f"for alias {x.alias}, processor {x.processor_id} and "
+                    f"package {x.package_id}."
+                )
+
+            if config_model is not None:
+                if (
+                    isinstance(extension, BaseModel)
+                    and not issubclass(config_model, type(extension))
+                ):
+                    raise ValueError(
+                        "Failed to extend the configuration "
+                        f"for processor {x.processor_id} with alias"
+                        f" {x.alias}. Expected {config_model.__name__}, "
+                        f"but the configuration extenstion is {type(extension).__name__}"  # noqa: E501
                     )
-                    if not isinstance(extension, BaseModel) and not isinstance(extension, dict):  # noqa: E501
-                        _expected = "dictionary"
-                        if config_model is not None and isinstance(config_model, BaseModel):  # noqa: E501
-                            _expected += f'or {type(config_model).__name__}'
-
-                        raise ValueError(
-                            "Invalid type for config extension. "
-                            f"Expected {_expected}, but found {type(extension).__name__} "  # noqa: E501
-                            f"for alias {x.alias}, processor {x.processor_id} and "
-                            f"package {x.package_id}."
-                        )
-
-                    if config_model is not None:
-                        try:
-                            config_model(**{
-                                **x.config,
-                                **(extension if isinstance(extension, dict)
-                                    else extension.model_dump()
-                                    )
-                            })
-                        except ValidationError as e:
-                            raise ValueError(
-                                "Failed to extend the configuration "
-                                f"for processor {x.processor_id} with alias"
-                                f" {x.alias}. New configuration do not comprise "
-                                "to the schema of the processor of the config. "
-                                "See validation errors above."
-                            ) from e
-                        if (
-                            config_model is not None
-                            and issubclass(config_model, BaseModel)
-                            and not issubclass(config_model,  type(extension))
-                        ):
-                            raise ValueError(
-                                "Failed to extend the configuration "
-                                f"for processor {x.processor_id} with alias"
-                                f" {x.alias}. Expected {config_model.__name__}, "
-                                f"but the configuration extenstion is {type(extension).__name__}"  # noqa: E501
+                try:
+                    validator.validate_python({
+                        **x.config,
+                        **(extension if isinstance(extension, dict)
+                            else extension.model_dump()
                             )
-
-                    if isinstance(extension, BaseModel):
-                        extension_json = extension.model_dump_json()
-                    elif isinstance(extension, dict):
-                        extension_json = json.dumps(extension)
-                    else:
-                        # ok, validates before
-                        pass
-                    app_cfg_extensions['$' + x.alias] = extension_json
+                    })
+                except ValidationError as e:
+                    raise ValueError(
+                        "Failed to extend the configuration "
+                        f"for processor {x.processor_id} with alias"
+                        f" {x.alias}. New configuration do not comprise "
+                        "to the schema of the processor of the config. "
+                        "See validation errors above."
+                    ) from e
+
+            if isinstance(extension, BaseModel):
+                extension_json = extension.model_dump_json()
+            else:
+                extension_json = json.dumps(extension)
+            app_cfg_extensions['$' + x.alias] = extension_json
 
         return app_cfg_extensions
 
@@ -667,8 +1050,7 @@ class CoreTask(BaseTask):
             - run_id (str, optional): The ID of the run. Defaults to None.
             - detached (bool, optional): Whether to wait for the task to finish. Defaults
                 to False.
-            - *args (Any, optional): Positional arguments to be passed to the
-                :func:`malevich.core_api.task_run` function.
+            - *args (Any, optional): Ignored, kept for compatibility.
             - **kwargs (Any, optional): Keyword arguments to be passed to the
                 :func:`malevich.core_api.task_run` function.
 
@@ -683,48 +1065,77 @@ class CoreTask(BaseTask):
             raise Exception("Attempt to run a task which is not prepared. "
                             "Please, run `.prepare()` first.")
 
+        run_id = run_id or uuid.uuid4().hex
+        timer = self._timer(run_id=run_id)
+        try:
+            return await self._execute(
+                timer,
+                run_id,
+                override,
+                config_extension,
+                detached,
+                stop_on_error,
+                stop_on_interrupt,
+                *args,
+                **kwargs
+            )
+        finally:
+            timer.flush()
+
+    async def _execute(
+        self,
+        timer: StageTimer,
+        run_id: str,
+        override: dict[str, Override] | None,
+        config_extension: dict[str, dict[str, Any] | BaseModel] | None,
+        detached: bool,
+        stop_on_error: bool,
+        stop_on_interrupt: bool,
+        *args,
+        **kwargs
+    ) -> str:
+        """internal"""
+
         if override:
-            real_overrides = self._compile_overrides(override)
+            with timer.measure('run', 'overrides', count=len(override)):
+                real_overrides = await run_blocking(self._compile_overrides, override)
         else:
             real_overrides = {}
 
-        self.run_id = run_id or uuid.uuid4().hex
+        self.run_id = run_id
 
         app_cfg_extensions = {}
         if config_extension:
             app_cfg_extensions = self._validate_extension(config_extension)
 
-        tref = self.state.service.run.operation_id(
-            self.state.params.operation_id
-        )
-        try:
-            if real_overrides or app_cfg_extensions:
-                new_config = self.state.config.model_copy(deep=True)
-                new_config.collections = {
-                    **self.state.config.collections,
-                    **real_overrides,
-                }
-                print(self.state.config.collections, real_overrides)
-                new_config.app_cfg_extension = app_cfg_extensions
-                new_config_id = self.state.config_id + \
-                    '_' + uuid.uuid4().hex[:6]
+        def _update_config(cfg_id: str, cfg: core.Cfg) -> None:
+            self.state.service.cfg.name(cfg_id).update_or_create(
+                cfg_id=cfg_id,
+                cfg=cfg,
+            )
 
-                self.state.service.cfg.name(new_config_id).update_or_create(
-                    cfg_id=new_config_id,
-                    cfg=new_config,
-                )
-                tref.run(
+        try:
+            with timer.measure('run', 'detached' if detached else 'run'):
+                new_config_id = None
+                if real_overrides or app_cfg_extensions:
+                    new_config = self.state.config.model_copy(deep=True)
+                    new_config.collections = {
+                        **self.state.config.collections,
+                        **real_overrides,
+                    }
+                    print(self.state.config.collections, real_overrides)
+                    new_config.app_cfg_extension = app_cfg_extensions
+                    new_config_id = self.state.config_id + \
+                        '_' + uuid.uuid4().hex[:6]
+
+                    await run_blocking(_update_config, new_config_id, new_config)
+                await aio.task_run(
+                    self.state.params.operation_id,
+                    run_id,
                     cfg_id=new_config_id,
                     wait=not detached,
-                    run_id=self.run_id,
-                    *args,
-                    **kwargs
-                )
-            else:
-                tref.run(
-                    *args,
-                    run_id=self.run_id,
-                    wait=not detached,
+                    auth=self.state.params.core_auth,
+                    conn_url=self.state.params.core_host,
                     **kwargs
                 )
         except Exception as e:
@@ -735,8 +1146,44 @@ class CoreTask(BaseTask):
             if stop_on_interrupt:
                 await self.stop()
             raise
+        if not detached:
+            await self._record_processors(timer, run_id)
         return self.run_id
 
+    async def _record_processors(self, timer: StageTimer, run_id: str) -> None:
+        """internal
+
+        Records durations of processors in the run as reported by Core.
+        Durations are labeled with aliases of processors and phased with
+        their ids to be aggregated by :func:`historical_weights`
+        """
+        if not timer.enabled():
+            return
+        try:
+            records = await clickhouse_query(
+                ClickhouseFun,
+                lambda x: x.runId == run_id,
+                operation_ids=[self.state.params.operation_id],
+                run_ids=[run_id],
+                auth=self.state.params.core_auth,
+                conn_url=self.state.params.core_host,
+                is_async=True,
+            )
+            for record in records:
+                started_at = _timestamp(record.timestampStart)
+                timer.record(
+                    'execution',
+                    record.funId,
+                    started_at=started_at,
+                    duration=(
+                        _timestamp(record.timestampEnd) - started_at
+                    ).total_seconds(),
+                    label=record.bindId,
+                    succeeded=record.success,
+                )
+        except Exception as e:
+            logger.debug(f'Failed to fetch durations of processors: {e}')
+
     async def stop(
         self,
         *args,
@@ -745,17 +1192,20 @@ class CoreTask(BaseTask):
         """Stops the task preventing it from further execution
 
         Args:
-            - *args (Any, optional): Positional arguments to be passed to the
-                :func:`malevich.core_api.task_stop` function.
+            - *args (Any, optional): Ignored, kept for compatibility.
             - **kwargs (Any, optional): Keyword arguments to be passed to the
                 :func:`malevich.core_api.task_stop` function.
         """
         if "operation_id" not in self.state.params:
             raise Exception("Attempt to run a task which is not prepared. "
                             "Please, run `.prepare()` first.")
-        self.state.service.run.operation_id(
-            self.state.params.operation_id
-        ).stop(*args, **kwargs)
+        await aio.task_stop(
+            self.state.params.operation_id,
+            auth=self.state.params.core_auth,
+            conn_url=self.state.params.core_host,
+            **kwargs
+        )
+        self._drop_snapshots('operation')
 
     async def results(
         self,
@@ -792,12 +1242,33 @@ class CoreTask(BaseTask):
         if not run_id:
             run_id = self.run_id
 
-        logs = core.logs(
-            self.state.params.operation_id,
-            run_id=run_id,
-            auth=self.state.params.core_auth,
-            conn_url=self.state.params.core_host,
-        )
+        timer = self._timer(run_id=run_id)
+        try:
+            with timer.measure('results', 'logs') as measure_:
+                logs = await aio.logs(
+                    self.state.params.operation_id,
+                    run_id=run_id,
+                    auth=self.state.params.core_auth,
+                    conn_url=self.state.params.core_host,
+                )
+                measure_.size, measure_.count = _logs_stats(logs)
+            with timer.measure('results', 'collect') as measure_:
+                results = self._collect_results(returned, logs, run_id)
+                measure_.count = len(results)
+        finally:
+            timer.flush()
+        return results
+
+    def _collect_results(
+        self,
+        returned: list,
+        logs: core.AppLogs,
+        run_id: str,
+    ) -> list[CoreResult | CoreLocalDFResult]:
+        """internal
+
+        Selects results of the run according to values of conditions
+        """
         no_conditions_return = None
         final_result = None
 
@@ -922,6 +1393,12 @@ class CoreTask(BaseTask):
     def dump(self) -> bytes:
         return pickle.dumps(self)
 
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        # Validators are not picklable, they are resolved again on demand
+        state['_config_models'] = None
+        return state
+
     def get_interpreted_task(self) -> BaseTask:
         return self
 
@@ -942,10 +1419,31 @@ class CoreTask(BaseTask):
         self,
         unique_task_hash: str | None = None,
         only_fetch: bool = False,
+        use_cache: bool = True,
     ) -> 'CoreTask':
+        """Attaches the task to the pipeline and the operation on Core
+
+        Definitions of the pipeline and the configuration, as well as
+        the operation started by `prepare`, are read from local snapshots
+        when they are fresh enough (see :attr:`snapshot_ttl`), so
+        reattaching to a warm operation does not hit Core at all.
+
+        Args:
+            unique_task_hash (str, optional): Hash of the pipeline.
+                Defaults to the hash of the interpreted pipeline.
+            only_fetch (bool, optional): Only fetch the pipeline
+                without attaching to the operation. Defaults to False.
+            use_cache (bool, optional): Whether to use local snapshots.
+                Defaults to True.
+        """
         unique_task_hash = unique_task_hash or self.get_pipeline_hash()
         try:
-            pipeline = self.state.service.pipeline.id(unique_task_hash).get()
+            pipeline = core.Pipeline.model_validate_json(self._snapshot(
+                unique_task_hash,
+                'pipeline',
+                lambda: self._fetch_pipeline(unique_task_hash),
+                use_cache=use_cache,
+            ))
         except Exception:
             raise NoPipelineFoundError(unique_task_hash)
 
@@ -956,9 +1454,12 @@ class CoreTask(BaseTask):
         self.state.config = core.Cfg()
         self.state.config_id = unique_task_hash
 
-        json_cfg = json.loads(
-            self.state.service.cfg.id(unique_task_hash).get().data
-        )
+        json_cfg = json.loads(self._snapshot(
+            unique_task_hash,
+            'cfg',
+            lambda: self.state.service.cfg.id(unique_task_hash).get().data,
+            use_cache=use_cache,
+        ))
 
         for key, value in json_cfg.items():
             setattr(self.state.config, key, value)
@@ -976,7 +1477,14 @@ class CoreTask(BaseTask):
 
         self.commit_returned(node_results)
         if not only_fetch:
-            tasks = self.get_active_tasks()
+            tasks = self._snapshot(
+                unique_task_hash,
+                'operation',
+                self._fetch_active_tasks,
+                use_cache=use_cache,
+                store=False,
+            )
+            tasks = json.loads(tasks) if tasks else []
 
             if tasks:
                 self.state.params.operation_id = tasks[-1]
@@ -159,7 +159,6 @@ class LocalTask(CoreTask):
             real_overrides = {}
 
         if config_extension:
-            print(config_extension, self._validate_extension(config_extension))
             app_cfg_extensions = self._validate_extension(config_extension)
         else:
             app_cfg_extensions = {}
@@ -1,9 +1,10 @@
+import hashlib
 import pickle
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
 from functools import cache
-from threading import Thread
-from typing import Callable, Iterable, Optional, Type
+from typing import Callable, Iterable, Iterator, Optional, Type
 
 import pandas as pd
 from gql import gql
@@ -14,6 +15,8 @@ from malevich.core_api import BasePlatformSettings
 from malevich.models.injections import SpaceInjectable
 
 from ...._autoflow.tracer import traced
+from ...._utility.aio import run_blocking, run_sync
+from ...._utility.schema import df_to_docs
 from ....types import FlowOutput
 from ...nodes.base import BaseNode
 from ...nodes.tree import TreeNode
@@ -113,62 +116,68 @@ class SpaceTask(BaseTask):
             task_id=self.state.aux.task_id,
         )
 
-    def run(
-        self,
-        override: dict[str, pd.DataFrame] = {},
-        webhook_url: str | None = None,
-        *args,
-        **kwargs
-    ) -> str:
+    def _check_prepared(self) -> None:
+        """internal"""
         if not self.state.aux.task_id:
             raise Exception(
                 "Attempt to run a task which is not prepared. "
                 "Please prepare the task first."
             )
 
+    def _start_schema(self) -> tuple[list, dict[str, str]]:
+        """internal"""
         start_schema = self.state.space.get_task_start_schema(
             self.state.aux.task_id,
         )
 
-        coll_override = {
-            **self.state.collection_overrides
-        }
-
-        __override = {}
-        for alias, df in override.items():
-            for inj in self.get_injectables():
-                if alias == inj.alias:
-                    __override[inj.snapshot_flow_id] = df
-        override = __override
-
-        in_flow_ca = {}
         id_to_ca = {}
-        overrides = []
         for sch in start_schema:
             try:
-                in_flow_ca = self.state.space.get_ca_in_flow(
+                id_to_ca[sch.in_flow_id] = self.state.space.get_ca_in_flow(
                     flow_id=self.state.aux.flow_id,
                     in_flow_id=sch.in_flow_id
                 )
-                id_to_ca[sch.in_flow_id] = in_flow_ca
             except Exception:
                 # TODO fix!
                 continue
+        return start_schema, id_to_ca
 
-        for in_flow_id, df in override.items():
-            uid = self.state.space.create_collection(
-                host_id=self.state.host.uid,
-                # core_id=f'override-{coll_id}-{state.interpretation_id}',
-                core_alias=f'override-{in_flow_id}-{self.state.interpretation_id}-{uuid.uuid4().hex[:4]}',
-                # schema_core_id=schema.core_id,
-                docs=[
-                    row.to_json()
-                    for _, row in df.iterrows()
-                ]
-            )
-            coll_override[id_to_ca[in_flow_id]] = uid
+    def _resolve_override(
+        self, override: dict[str, pd.DataFrame]
+    ) -> dict[str, pd.DataFrame]:
+        """internal"""
+        __override = {}
+        for alias, df in override.items():
+            for inj in self.get_injectables():
+                if alias == inj.alias:
+                    __override[inj.snapshot_flow_id] = df
+        return __override
+
+    def _upload_override(self, in_flow_id: str, docs: list[str]) -> str:
+        """internal"""
+        return self.state.space.create_collection(
+            host_id=self.state.host.uid,
+            # core_id=f'override-{coll_id}-{state.interpretation_id}',
+            core_alias=f'override-{in_flow_id}-{self.state.interpretation_id}-{uuid.uuid4().hex[:4]}',
+            # schema_core_id=schema.core_id,
+            docs=docs
+        )
 
+    def _start_run(
+        self,
+        start_schema: list,
+        id_to_ca: dict[str, str],
+        uploaded: dict[str, str],
+        webhook_url: str | None = None,
+    ) -> str:
+        """internal"""
+        coll_override = {
+            **self.state.collection_overrides
+        }
+        for in_flow_id, uid in uploaded.items():
+            coll_override[id_to_ca[in_flow_id]] = uid
 
+        overrides = []
         for sch in start_schema:
             try:
                 in_flow_ca = id_to_ca[sch.in_flow_id]
@@ -181,13 +190,107 @@ class SpaceTask(BaseTask):
                 # TODO fix!
                 continue
 
-        self.state.aux.run_id = self.state.space.run_task(
+        return self.state.space.run_task(
             task_id=self.state.aux.task_id,
             ca_override=overrides,
             webhook=webhook_url,
         )
+
+    def run(
+        self,
+        override: dict[str, pd.DataFrame] = {},
+        webhook_url: str | None = None,
+        *args,
+        **kwargs
+    ) -> str:
+        self._check_prepared()
+        start_schema, id_to_ca = self._start_schema()
+
+        uploaded = {
+            in_flow_id: self._upload_override(in_flow_id, df_to_docs(df))
+            for in_flow_id, df in self._resolve_override(override).items()
+        }
+
+        self.state.aux.run_id = self._start_run(
+            start_schema, id_to_ca, uploaded, webhook_url
+        )
         return self.state.aux.run_id
 
+    def run_many(
+        self,
+        overrides: Iterable[dict[str, pd.DataFrame]],
+        webhook_url: str | None = None,
+        max_concurrency: int = 8,
+        fetch_results: bool = True,
+        fetch_timeout: int = 150,
+    ) -> Iterator[tuple[int, str, list[SpaceCollectionResult] | None]]:
+        """Runs the task once for each set of overrides
+
+        The start schema of the task is requested once for all runs.
+        Identical override payloads are uploaded once and shared by runs
+        using them. At most `max_concurrency` runs are started and awaited
+        at the same time.
+
+        Args:
+            overrides (Iterable[dict[str, pd.DataFrame]]): Sets of overrides,
+                each one is the same as `override` argument of :meth:`run`
+            webhook_url (str, optional): Webhook to be called by each run
+            max_concurrency (int): Maximum number of concurrent requests
+            fetch_results (bool): Whether to wait for results of runs
+            fetch_timeout (int): Timeout for results of a single run
+
+        Yields:
+            tuple[int, str, list[SpaceCollectionResult] | None]: Index of the
+                set of overrides, run id and results (if `fetch_results`)
+                in the order runs complete
+        """
+        self._check_prepared()
+        start_schema, id_to_ca = self._start_schema()
+
+        # Each payload is identified by its digest, so equal
+        # frames are serialized once and uploaded once
+        docs: dict[tuple[str, str], list[str]] = {}
+        runs: list[dict[str, tuple[str, str]]] = []
+        for override in overrides:
+            payloads = {}
+            for in_flow_id, df in self._resolve_override(override).items():
+                docs_ = df_to_docs(df)
+                digest = hashlib.sha256('\n'.join(docs_).encode()).hexdigest()
+                docs.setdefault((in_flow_id, digest), docs_)
+                payloads[in_flow_id] = (in_flow_id, digest)
+            runs.append(payloads)
+
+        def _run(payloads: dict[str, tuple[str, str]]) -> tuple[str, list | None]:
+            run_id = self._start_run(
+                start_schema,
+                id_to_ca,
+                {k: uploads[v].result() for k, v in payloads.items()},
+                webhook_url,
+            )
+            if not fetch_results:
+                return run_id, None
+            return run_id, run_sync(self.async_results(run_id, fetch_timeout))
+
+        pool = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='malevich-space-run',
+        )
+        try:
+            # Uploads are queued before runs, so runs never
+            # occupy all workers waiting for pending uploads
+            uploads = {
+                key: pool.submit(self._upload_override, key[0], docs_)
+                for key, docs_ in docs.items()
+            }
+            futures = {
+                pool.submit(_run, payloads): i for i, payloads in enumerate(runs)
+            }
+            for future in as_completed(futures):
+                run_id, results = future.result()
+                yield futures[future], run_id, results
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
     def configure(
         self,
         *operations: str,
@@ -305,7 +408,11 @@ class SpaceTask(BaseTask):
         *args,
         **kwargs
     ) -> Iterable[SpaceCollectionResult]:
-        """internal"""
+        """Retrieves results of the run without blocking the event loop
+
+        Blocking requests to Space are made in the shared I/O pool, so
+        results of several runs may be awaited concurrently.
+        """
         returned = self._returned
         if returned is None:
             return None
@@ -313,8 +420,10 @@ class SpaceTask(BaseTask):
         if isinstance(returned, traced):
             returned = [returned]
 
-        alias2infid = self.state.space.get_snapshot_components(
-            run_id=run_id or self.state.aux.run_id
+        run_id = run_id or self.state.aux.run_id
+        alias2infid = await run_blocking(
+            self.state.space.get_snapshot_components,
+            run_id=run_id
         )
 
         infid2alias = {
@@ -326,8 +435,9 @@ class SpaceTask(BaseTask):
             alias2infid
         )
 
-        rs_, cs_ = self.state.space.get_run_status(
-            run_id=self.state.aux.run_id
+        rs_, cs_ = await run_blocking(
+            self.state.space.get_run_status,
+            run_id=run_id
         )
 
         if rs_ == AppStatus.FAIL:
@@ -342,7 +452,7 @@ class SpaceTask(BaseTask):
             }
             to_be_finished_ = set(infid_)
             async for update in self.state.space.subscribe_to_status(
-                run_id or self.state.aux.run_id,
+                run_id,
                 fetch_timeout
             ):
                 if isinstance(update, str):
@@ -369,7 +479,7 @@ class SpaceTask(BaseTask):
 
         return [
             SpaceCollectionResult(
-                run_id=run_id or self.state.aux.run_id,
+                run_id=run_id,
                 in_flow_id=i,
                 space_ops=self.state.space
             ) for i in infid_
@@ -382,36 +492,16 @@ class SpaceTask(BaseTask):
         *args,
         **kwargs
     ) -> list[SpaceCollectionResult]:
-        import asyncio
-        import warnings
-        with warnings.catch_warnings():
-            warnings.filterwarnings(
-                "ignore", message="There is no current event loop"
-            )
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    result = None
-                    def worker():
-                        nonlocal result
-                        result = asyncio.run(
-                            self.async_results(run_id, fetch_timeout, *args, **kwargs)
-                        )
-
-                    thread = Thread(target=worker,)
-                    thread.start()
-                    thread.join()
-                    assert result is not None
-                    return result
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-
-        def raise_exc(e, *args) -> None:
-            raise e
-
-        loop.set_exception_handler(raise_exc)
-        return loop.run_until_complete(self.async_results(
+        """Retrieves results of the run
+
+        The call blocks until results are available. It runs on the shared
+        background event loop, so it may be used from synchronous code as
+        well as from within a running loop. Use :meth:`async_results` in
+        coroutines to await several runs concurrently.
+        """
+        return run_sync(self.async_results(
             run_id,
+            fetch_timeout,
             *args,
             **kwargs
         ))
@@ -12,6 +12,7 @@ from malevich.types import FlowOutput
 from ..endpoint import MetaEndpoint
 from ..nodes.tree import TreeNode
 from ..results import Result
+from . import serialization
 from .base import BaseInjectable, BaseTask
 
 
@@ -49,6 +50,11 @@ class PromisedTask(BaseTask[PromisedStage]):
     def tree(self) -> TreeNode:
         return self.__tree
 
+    @property
+    def returned(self) -> FlowOutput:
+        """Objects returned by the flow function"""
+        return self.__results
+
     def _attach_task(self, _task: BaseTask) -> None:
         self.__task = _task
 
@@ -214,22 +220,61 @@ class PromisedTask(BaseTask[PromisedStage]):
 
         return self.__task.commit_returned(returned)
 
-    def dump(self) -> bytes:
-        """Serialize the task to bytes, which can be saved and used to load it again"""
-        if self.__task:
-            task_bytes_ = self.__task.dump()
-        else:
-            task_bytes_ = b""
-        tree_bytes_ = pickle.dumps(self.__tree.model_dump())
-        results_bytes_ = pickle.dumps(self.__results)
-        component_bytes_ = pickle.dumps(self._component)
-        return pickle.dumps(
-            (task_bytes_, tree_bytes_, results_bytes_, component_bytes_)
+    def dump(self, store: str | None = None) -> bytes:
+        """Serialize the task to bytes, which can be saved and used to load it again
+
+        The task is serialized into the compact format (see
+        :mod:`malevich.models.task.serialization`): the structure of the flow
+        is kept in a header, and data of collections is stored out-of-line
+        once per unique frame and is loaded lazily.
+
+        Args:
+            store (str, optional): Directory to keep data of collections in.
+                If provided, the data is shared between all tasks dumped into
+                the same directory and is not included into the result.
+        """
+        graph, objects = serialization.pack_tree(self.__tree.tree)
+        return serialization.dump(
+            {
+                'task': self.__task,
+                # Results of the tree are the results of the task
+                'tree': self.__tree.model_dump(exclude={'tree', 'results'}),
+                'graph': objects,
+                'results': self.__results,
+                'component': self._component,
+            },
+            store=store,
+            header=graph,
         )
 
     @staticmethod
-    def load(object_bytes: bytes) -> 'PromisedTask':
-        """Static method. Deserialize bytes into task object"""
+    def load(object_bytes: bytes, store: str | None = None) -> 'PromisedTask':
+        """Static method. Deserialize bytes into task object
+
+        Both the compact format and the legacy one are supported.
+
+        Args:
+            object_bytes (bytes): Serialized task
+            store (str, optional): Directory with data of collections.
+                Defaults to the directory used when the task was dumped.
+        """
+        if serialization.is_compact(object_bytes):
+            objects = serialization.load(object_bytes, store=store)
+            tree = objects['tree']
+            tree.setdefault('results', objects['results'] or [])
+            if 'graph' in objects:
+                tree['tree'] = serialization.unpack_tree(
+                    serialization.read_header(object_bytes), objects['graph']
+                )
+            task = PromisedTask(
+                results=objects['results'],
+                tree=TreeNode(**tree),
+                component=objects['component'],
+            )
+            if objects['task'] is not None:
+                task._attach_task(objects['task'])
+            return task
+
         task_bytes_, tree_bytes_, results_bytes_, component_bytes_ = pickle.loads(object_bytes)  # noqa: E501
         task = PromisedTask(
             results=pickle.loads(results_bytes_),
@@ -0,0 +1,255 @@
+"""
+Compact format of serialized tasks
+
+A serialized task consists of:
+
+- a magic prefix and the version of the format,
+- a JSON header with the structure of the flow (metadata of nodes and
+  edges as arrays) and the index of payloads,
+- a pickled body with the objects of nodes and links of the flow, in the
+  order of the header, and other task objects. Data of large collections
+  is replaced with references to payloads,
+- a section with payloads (unless payloads are kept in a store).
+
+The structure of the flow is stored only in the header, and the tree is
+rebuilt from it on load (see :func:`pack_tree` and :func:`unpack_tree`).
+
+Payloads are pickled DataFrames identified by the SHA-256 of their bytes,
+so identical collections are stored once. When a store directory is given,
+payloads are written there instead of the section and are shared between
+all tasks dumped into the same store. Payloads are unpickled only when the
+data of the collection is accessed.
+"""
+import hashlib
+import io
+import json
+import os
+import pickle
+import struct
+from typing import Any
+
+import pandas as pd
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+
+from ..collection import Collection
+from ..nodes.base import BaseNode
+from ..payload import PayloadRef
+
+MAGIC = b'MLVT'
+FORMAT_VERSION = 3
+MIN_PAYLOAD_SIZE = 1024
+"""Collections with smaller pickled data are kept in the body"""
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(
+        self,
+        file: io.BytesIO,
+        payloads: dict[str, bytes | PayloadRef],
+    ) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.payloads = payloads
+
+    def persistent_id(self, obj: Any) -> tuple | None:  # noqa: ANN401
+        if type(obj) is not Collection:
+            return None
+        data = obj.__dict__.get('collection_data')
+        if 'collection_data' not in obj.__dict__:
+            # Data of a lazy collection is not loaded
+            data = obj.__pydantic_private__.get('_payload')
+        if isinstance(data, PayloadRef):
+            digest = data.digest
+            self.payloads.setdefault(digest, data)
+        elif isinstance(data, pd.DataFrame):
+            buffer = io.BytesIO()
+            data.to_pickle(buffer)
+            raw = buffer.getvalue()
+            if len(raw) < MIN_PAYLOAD_SIZE:
+                return None
+            digest = hashlib.sha256(raw).hexdigest()
+            self.payloads.setdefault(digest, raw)
+        else:
+            return None
+
+        fields = {k: v for k, v in obj.__dict__.items() if k != 'collection_data'}
+        return ('collection', digest, fields)
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, refs: dict[str, PayloadRef]) -> None:
+        super().__init__(file)
+        self.refs = refs
+
+    def persistent_load(self, pid: tuple) -> Collection:
+        kind, digest, fields = pid
+        if kind != 'collection':
+            raise pickle.UnpicklingError(f"Unknown persistent object: {kind}")
+        return Collection.from_payload(self.refs[digest], **fields)
+
+
+def _node_meta(node: BaseNode) -> dict[str, Any]:
+    meta = {'type': type(node).__name__, 'uuid': node.uuid, 'alias': node.alias}
+    for field in ('processor_id', 'package_id', 'reverse_id', 'name'):
+        value = getattr(node, field, None)
+        if isinstance(value, str):
+            meta[field] = value
+    collection = getattr(node, 'collection', None)
+    if isinstance(collection, Collection):
+        meta['collection_id'] = collection.collection_id
+    return meta
+
+
+def pack_tree(
+    tree: ExecutionTree | None,
+) -> tuple[dict[str, list], dict[str, list]]:
+    """Splits the execution tree into its structure and objects
+
+    The structure is described by arrays of nodes and edges to be stored
+    in the header. Edges are `[from, to, argument index, argument name]`,
+    where `from` and `to` are indices in the list of nodes. Objects of
+    nodes and links follow the same order and are stored in the body.
+
+    Returns:
+        tuple: The structure and the objects of the tree
+    """
+    owners, index = [], {}
+
+    def _index(node: Any) -> int:  # noqa: ANN401
+        owner = node.owner
+        if id(owner) not in index:
+            index[id(owner)] = len(owners)
+            owners.append(owner)
+        return index[id(owner)]
+
+    edges, links = [], []
+    for from_, to, link in (tree.tree if tree is not None else []):
+        edges.append([
+            _index(from_),
+            _index(to),
+            getattr(link, 'index', None),
+            getattr(link, 'name', None),
+        ])
+        links.append(link)
+    # Nodes without edges
+    for node in (tree.nodes_ if tree is not None else ()):
+        _index(node)
+
+    graph = {'nodes': [_node_meta(x) for x in owners], 'edges': edges}
+    return graph, {'nodes': owners, 'links': links}
+
+
+def unpack_tree(graph: dict[str, list], objects: dict[str, list]) -> ExecutionTree:
+    """Rebuilds the execution tree packed with :func:`pack_tree`"""
+    nodes = [tracedLike(owner) for owner in objects['nodes']]
+    tree = ExecutionTree([
+        (nodes[from_], nodes[to], link)
+        for (from_, to, *_), link in zip(graph['edges'], objects['links'])
+    ])
+    tree.nodes_.update(nodes)
+    return tree
+
+
+def is_compact(data: bytes) -> bool:
+    return data[:len(MAGIC)] == MAGIC
+
+
+def _split(data: bytes) -> tuple[dict[str, Any], memoryview, memoryview]:
+    if not is_compact(data):
+        raise ValueError("Data is not in the compact format")
+    view = memoryview(data)
+    offset = len(MAGIC)
+    version = view[offset]
+    if version > FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported version of the format: {version}. "
+            "Please, update malevich."
+        )
+    offset += 1
+    (header_size,) = struct.unpack_from('>I', view, offset)
+    offset += 4
+    header = json.loads(bytes(view[offset:offset + header_size]))
+    offset += header_size
+    (body_size,) = struct.unpack_from('>Q', view, offset)
+    offset += 8
+    body = view[offset:offset + body_size]
+    return header, body, view[offset + body_size:]
+
+
+def read_header(data: bytes) -> dict[str, Any]:
+    """Reads the header without loading the objects"""
+    return _split(data)[0]
+
+
+def dump(
+    obj: Any,  # noqa: ANN401
+    store: str | None = None,
+    header: dict[str, Any] | None = None,
+) -> bytes:
+    """Serializes objects into the compact format
+
+    Args:
+        obj (Any): Objects to serialize
+        store (str, optional): Directory to write payloads to. If not
+            provided, payloads are included into the result.
+        header (dict, optional): Extra fields of the header
+    """
+    payloads: dict[str, bytes | PayloadRef] = {}
+    body = io.BytesIO()
+    _Pickler(body, payloads).dump(obj)
+
+    section = bytearray()
+    index = []
+    if store is not None:
+        os.makedirs(store, exist_ok=True)
+    for digest, payload in payloads.items():
+        if store is not None:
+            path = os.path.join(store, digest + '.pkl')
+            if not os.path.exists(path):
+                raw = payload.raw() if isinstance(payload, PayloadRef) else payload
+                with open(path + '.tmp', 'wb') as file_:
+                    file_.write(raw)
+                os.replace(path + '.tmp', path)
+            index.append([digest, None, None])
+        else:
+            raw = payload.raw() if isinstance(payload, PayloadRef) else payload
+            index.append([digest, len(section), len(raw)])
+            section += raw
+
+    header_bytes = json.dumps({
+        **(header or {}),
+        'version': FORMAT_VERSION,
+        'store': os.path.abspath(store) if store is not None else None,
+        'payloads': index,
+    }).encode()
+    body_bytes = body.getvalue()
+
+    return b''.join([
+        MAGIC,
+        bytes([FORMAT_VERSION]),
+        struct.pack('>I', len(header_bytes)),
+        header_bytes,
+        struct.pack('>Q', len(body_bytes)),
+        body_bytes,
+        bytes(section),
+    ])
+
+
+def load(data: bytes, store: str | None = None) -> Any:  # noqa: ANN401
+    """Deserializes objects from the compact format
+
+    Args:
+        data (bytes): Serialized objects
+        store (str, optional): Directory with payloads. Defaults to the
+            directory used when the objects were serialized.
+    """
+    header, body, section = _split(data)
+    store = store or header.get('store')
+    refs = {}
+    for digest, offset, size in header['payloads']:
+        if offset is None:
+            refs[digest] = PayloadRef(digest, store=store)
+        else:
+            refs[digest] = PayloadRef(digest, data=section[offset:offset + size])
+    return _Unpickler(io.BytesIO(body), refs).load()
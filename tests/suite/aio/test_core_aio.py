@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import threading
+import time
+
+import aiohttp
+import malevich_coretools as core
+import pytest
+from aiohttp import web
+
+from malevich._core import aio
+from malevich._utility.core_logging import IgnoreCoreLogs, logger
+
+N_RUNS = 40
+
+
+async def _serve(delay: float) -> tuple[web.AppRunner, str, dict]:
+    stats = {'paths': [], 'peers': set(), 'auth': set()}
+
+    async def handler(request: web.Request) -> web.Response:
+        stats['paths'].append(request.path_qs)
+        stats['peers'].add(request.transport.get_extra_info('peername'))
+        stats['auth'].add(request.headers.get('Authorization'))
+        await asyncio.sleep(delay)
+        return web.json_response({'operationId': 'operation'})
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f'http://127.0.0.1:{port}/', stats
+
+
+def test_runs_progress_in_parallel_on_one_session():
+    async def main() -> tuple[float, int, dict]:
+        runner, url, stats = await _serve(delay=0.3)
+        ticks = 0
+        done = asyncio.Event()
+
+        async def heartbeat() -> None:
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        try:
+            # More runs than threads of the pool for blocking calls
+            for _ in range(2):
+                await asyncio.gather(*[
+                    aio.task_run(
+                        'operation', f'run-{i}', auth=('user', 'pass'), conn_url=url
+                    )
+                    for i in range(N_RUNS)
+                ])
+            await aio.task_stop('operation', auth=('user', 'pass'), conn_url=url)
+            logs = await aio.logs(
+                'operation', 'run-0', auth=('user', 'pass'), conn_url=url
+            )
+            assert logs.operationId == 'operation'
+            assert not aio.session(('user', 'pass')).closed
+        finally:
+            elapsed = time.perf_counter() - start
+            done.set()
+            await beat
+            await aio.close_sessions()
+            await runner.cleanup()
+        return elapsed, ticks, stats
+
+    elapsed, ticks, stats = asyncio.run(main())
+    # Two rounds of sequential runs would take 24 seconds
+    assert elapsed < 3.
+    assert ticks >= 20
+    assert len(stats['paths']) == 2 * N_RUNS + 2
+    # Connections of the shared session are reused by the second round
+    assert len(stats['peers']) <= N_RUNS
+    assert len(stats['auth']) == 1
+
+
+def test_sessions_are_kept_per_credentials():
+    async def main() -> None:
+        first = aio.session(('user', 'pass'))
+        assert aio.session(('user', 'pass')) is first
+        assert aio.session(('other', 'pass')) is not first
+        await aio.close_sessions()
+        assert first.closed
+        assert aio.session(('user', 'pass')) is not first
+        await aio.close_sessions()
+
+    asyncio.run(main())
+
+
+def test_sessions_are_closed_with_the_loop():
+    async def main() -> aiohttp.ClientSession:
+        return aio.session(('user', 'pass'))
+
+    first, second = asyncio.run(main()), asyncio.run(main())
+    assert first is not second
+    assert first.closed and second.closed
+
+
+def test_schedule_is_validated():
+    async def main() -> None:
+        runner, url, stats = await _serve(delay=0)
+        try:
+            with pytest.raises(AssertionError):
+                await aio.task_run(
+                    'operation',
+                    'run',
+                    schedule=core.Schedule(cron='* * * * *', delay=1),
+                    auth=('user', 'pass'),
+                    conn_url=url,
+                )
+        finally:
+            await runner.cleanup()
+        assert stats['paths'] == []
+
+    asyncio.run(main())
+
+
+def test_core_logs_are_silenced_per_context():
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    level = logger.level
+    logger.setLevel(logging.INFO)
+
+    silenced = threading.Event()
+    logged = threading.Event()
+
+    def _silenced() -> None:
+        with IgnoreCoreLogs():
+            silenced.set()
+            logged.wait()
+            logger.info('silenced')
+            with IgnoreCoreLogs():
+                logger.info('nested')
+            logger.info('silenced')
+
+    try:
+        thread = threading.Thread(target=_silenced)
+        thread.start()
+        silenced.wait()
+        # Other threads keep logging while the block is active
+        logger.info('concurrent')
+        logged.set()
+        thread.join()
+        logger.info('after')
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+
+    assert [r.getMessage() for r in records] == ['concurrent', 'after']
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+
+from malevich._utility.aio import background_loop, run_blocking, run_sync
+
+
+def test_blocking_calls_progress_in_parallel():
+    async def main() -> tuple[float, int]:
+        ticks = 0
+        done = asyncio.Event()
+
+        async def heartbeat() -> None:
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        await asyncio.gather(*[run_blocking(time.sleep, 0.2) for _ in range(10)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await beat
+        return elapsed, ticks
+
+    elapsed, ticks = asyncio.run(main())
+    # 10 sequential calls would take 2 seconds
+    assert elapsed < 1.
+    # The loop is not blocked while calls are in flight
+    assert ticks >= 5
+
+
+async def _double(x: int) -> int:
+    await asyncio.sleep(0.01)
+    return 2 * x
+
+
+def test_run_sync_without_loop():
+    assert run_sync(_double(2)) == 4
+    assert run_sync(_double(3)) == 6
+
+
+def test_run_sync_inside_running_loop():
+    async def main() -> int:
+        return run_sync(_double(5))
+
+    assert asyncio.run(main()) == 10
+
+
+def test_run_sync_on_background_loop_fails():
+    async def nested() -> int:
+        return run_sync(_double(1))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run_coroutine_threadsafe(nested(), background_loop()).result()
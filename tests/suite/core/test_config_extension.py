@@ -0,0 +1,74 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from malevich.models import OperationNode
+from malevich.models.task.interpreted.core import CoreTask
+
+
+class Config(BaseModel):
+    threshold: int
+    label: str = 'default'
+
+
+class OtherConfig(BaseModel):
+    threshold: int
+
+
+def _task(models: dict[str, type[BaseModel] | None]) -> SimpleNamespace:
+    nodes = {
+        alias: OperationNode(
+            operation_id=alias,
+            alias=alias,
+            package_id='package',
+            processor_id=alias,
+            config={'threshold': 1},
+        )
+        for alias in models
+    }
+    resolved = []
+
+    def get_config_model(package_id: str, processor_id: str) -> type | None:
+        resolved.append(processor_id)
+        return models[processor_id]
+
+    task = SimpleNamespace(
+        state=SimpleNamespace(operation_nodes=nodes),
+        _config_models=None,
+        _get_config_model=get_config_model,
+        resolved=resolved,
+    )
+    task._get_config_models = lambda: CoreTask._get_config_models(task)
+    return task
+
+
+def test_extension_is_validated_with_config_model():
+    task = _task({'typed': Config, 'untyped': None})
+    extensions = CoreTask._validate_extension(task, {
+        'typed': {'threshold': 2},
+        'untyped': {'anything': [1, 2]},
+        'missing': {'threshold': 3},
+    })
+    assert extensions == {
+        '$typed': json.dumps({'threshold': 2}),
+        '$untyped': json.dumps({'anything': [1, 2]}),
+    }
+
+    extensions = CoreTask._validate_extension(task, {
+        'typed': Config(threshold=3, label='custom'),
+    })
+    assert json.loads(extensions['$typed']) == {'threshold': 3, 'label': 'custom'}
+    # Models are resolved once per task
+    assert sorted(task.resolved) == ['typed', 'untyped']
+
+
+def test_invalid_extension_is_rejected():
+    task = _task({'typed': Config})
+    with pytest.raises(ValueError, match='do not comprise'):
+        CoreTask._validate_extension(task, {'typed': {'threshold': 'many'}})
+    with pytest.raises(ValueError, match='Expected Config'):
+        CoreTask._validate_extension(task, {'typed': OtherConfig(threshold=1)})
+    with pytest.raises(ValueError, match='Invalid type'):
+        CoreTask._validate_extension(task, {'typed': 'threshold=1'})
@@ -0,0 +1,198 @@
+import json
+from types import SimpleNamespace
+
+import malevich_coretools as core
+import pytest
+from requests import Response
+from requests.exceptions import HTTPError
+
+from malevich._core.diff import diff_pipelines
+from malevich._core.service.pipeline import map_real_pipeline_id
+from malevich._utility.timing import StageTimer
+from malevich.models.task.interpreted.core import CoreTask
+
+
+def _processor(processor_id: str, cfg: dict | None = None) -> core.Processor:
+    return core.Processor(
+        image=core.JsonImage(ref=f'image/{processor_id}'),
+        processorId=processor_id,
+        cfg=json.dumps(cfg) if cfg is not None else None,
+    )
+
+
+def _pipeline(
+    processors: dict[str, core.Processor],
+    results: dict[str, list[core.Result]] | None = None,
+) -> core.Pipeline:
+    return core.Pipeline(
+        pipelineId='pipeline',
+        processors=processors,
+        conditions={},
+        results=results or {},
+    )
+
+
+def test_diff_of_same_pipelines_is_empty():
+    pipeline = _pipeline({'a': _processor('a'), 'b': _processor('b')})
+    diff = diff_pipelines(pipeline, pipeline.model_copy(deep=True))
+    assert diff.is_empty
+    assert diff.changed_apps() == set()
+    assert diff.summary() == 'no changes'
+
+
+def test_diff_of_pipelines():
+    local = _pipeline(
+        {
+            'a': _processor('a', {'x': 1, 'y': 2}),
+            'b': _processor('b', {'x': 2}),
+            'c': _processor('c'),
+        },
+        results={'b': [core.Result(name='b')]},
+    )
+    remote = _pipeline(
+        {
+            'a': _processor('a', {'y': 2, 'x': 1}),
+            'b': _processor('b', {'x': 1}),
+            'd': _processor('d'),
+        },
+    )
+
+    diff = diff_pipelines(local, remote)
+    # Order of keys in configurations is not a change
+    assert 'a' not in diff.processors.changed
+    assert diff.processors.changed == {'b': ['cfg']}
+    assert diff.processors.added == ['c']
+    assert diff.processors.removed == ['d']
+    assert diff.results.added == ['b']
+    assert diff.pipeline_changed
+    assert not diff.cfg_changed
+    assert diff.changed_apps() == {'b', 'c'}
+
+
+def test_diff_of_configurations():
+    pipeline = _pipeline({'a': _processor('a')})
+    diff = diff_pipelines(
+        pipeline,
+        pipeline,
+        core.Cfg(collections={'a': 'collection-1'}),
+        core.Cfg(collections={'a': 'collection-2'}),
+    )
+    assert not diff.pipeline_changed
+    assert diff.cfg_changed
+    assert diff.collections.changed == {'a': []}
+
+
+class _PipelineRef:
+    def __init__(self, remote: core.Pipeline | None) -> None:
+        self.remote = remote
+        self.created = None
+        self.updated = None
+
+    def get(self) -> core.Pipeline:
+        if self.remote is None:
+            response = Response()
+            response.status_code = 404
+            raise HTTPError(response=response)
+        return self.remote
+
+    def create(self, **kwargs) -> str:
+        self.created = kwargs
+        return 'created'
+
+    def update(self, **kwargs) -> None:
+        self.updated = kwargs
+
+
+def _task(local: core.Pipeline, pref: _PipelineRef) -> SimpleNamespace:
+    return SimpleNamespace(
+        state=SimpleNamespace(
+            service=SimpleNamespace(
+                pipeline=SimpleNamespace(id=lambda _: pref)
+            ),
+            unique_task_hash='hash',
+            processors=local.processors,
+            conditions=local.conditions,
+            results=local.results,
+            pipeline_id=None,
+        ),
+        get_pipeline=lambda: local,
+    )
+
+
+def test_build_pipeline_sends_whole_pipeline_on_change():
+    local = _pipeline(
+        {'a': _processor('a'), 'b': _processor('b', {'x': 2})},
+        results={'b': [core.Result(name='b')]},
+    )
+    remote = _pipeline(
+        {'a': _processor('a'), 'b': _processor('b', {'x': 1})},
+        results={'b': [core.Result(name='b')]},
+    )
+    pref = _PipelineRef(remote)
+    task = _task(local, pref)
+
+    diff = CoreTask._build_pipeline(task, StageTimer())
+    assert diff.changed_apps() == {'b'}
+    assert pref.created is None
+    # Core replaces the pipeline, so unchanged entries are sent as well
+    assert pref.updated['processors'] is local.processors
+    assert pref.updated['conditions'] is None
+    assert pref.updated['results'] is local.results
+    assert task.state.pipeline_id == 'pipeline'
+
+
+def test_build_pipeline_sends_whole_pipeline_on_removal():
+    local = _pipeline({'a': _processor('a')})
+    remote = _pipeline({'a': _processor('a'), 'b': _processor('b')})
+    pref = _PipelineRef(remote)
+
+    CoreTask._build_pipeline(_task(local, pref), StageTimer())
+    assert pref.updated['processors'] is local.processors
+
+
+def test_build_pipeline_skips_unchanged_pipeline():
+    local = _pipeline({'a': _processor('a')})
+    pref = _PipelineRef(local.model_copy(deep=True))
+
+    diff = CoreTask._build_pipeline(_task(local, pref), StageTimer())
+    assert diff.is_empty
+    assert pref.updated is None
+    assert pref.created is None
+
+
+def test_build_pipeline_creates_missing_pipeline():
+    local = _pipeline({'a': _processor('a')})
+    pref = _PipelineRef(None)
+    task = _task(local, pref)
+
+    assert CoreTask._build_pipeline(task, StageTimer()) is None
+    assert pref.updated is None
+    assert pref.created['processors'] is local.processors
+    assert task.state.pipeline_id == 'created'
+
+
+def test_build_pipeline_raises_other_errors():
+    local = _pipeline({'a': _processor('a')})
+    pref = _PipelineRef(None)
+
+    def unreachable() -> core.Pipeline:
+        raise ConnectionError()
+
+    pref.get = unreachable
+
+    with pytest.raises(ConnectionError):
+        CoreTask._build_pipeline(_task(local, pref), StageTimer())
+    assert pref.created is None
+
+
+def test_real_pipeline_id_is_resolved_with_credentials(monkeypatch):
+    requests = []
+
+    def get_pipelines_map(**kwargs) -> core.ResultIdsMap:
+        requests.append(kwargs)
+        return core.ResultIdsMap(ids=[core.IdsMap(id='hash', realId='real')])
+
+    monkeypatch.setattr(core, 'get_pipelines_map', get_pipelines_map)
+    delete = map_real_pipeline_id(lambda id, **kwargs: id)
+    assert delete(id='hash', auth=('user', 'pass'), conn_url='url') == 'real'
+    assert requests == [{'auth': ('user', 'pass'), 'conn_url': 'url'}]
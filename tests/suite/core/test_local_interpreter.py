@@ -0,0 +1,52 @@
+import pandas as pd
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich.interpreter.local import LocalInterpreter, registry
+from malevich.models import (
+    ArgumentLink,
+    Collection,
+    CollectionNode,
+    OperationNode,
+    TreeNode,
+)
+from malevich.models.task.interpreted.local import LocalTask
+
+
+def _operation(processor_id: str, **kwargs) -> OperationNode:
+    return tracedLike(OperationNode(
+        operation_id='local-app', processor_id=processor_id, **kwargs
+    ))
+
+
+def test_flow_is_interpreted_locally(tmp_path, monkeypatch):
+    monkeypatch.setitem(
+        registry._registry, 'local-app', {'package_path': str(tmp_path)}
+    )
+    data = tracedLike(CollectionNode(collection=Collection(
+        collection_id='data', collection_data=pd.DataFrame({'a': [1]})
+    )))
+    op = _operation('process')
+    tree = ExecutionTree([(data, op, ArgumentLink(index=0, name='df'))])
+
+    task = LocalInterpreter().interpret(
+        TreeNode(tree=tree, reverse_id='flow', name='Flow', results=[op])
+    )
+    assert isinstance(task, LocalTask)
+    assert [x.processorId for x in task.state.processors.values()] == ['process']
+
+
+def test_conditions_are_interpreted_locally(tmp_path, monkeypatch):
+    monkeypatch.setitem(
+        registry._registry, 'local-app', {'package_path': str(tmp_path)}
+    )
+    condition = _operation('check', is_condition=True)
+    op = _operation('process', should_be_true=[condition.owner.uuid])
+    tree = ExecutionTree([(condition, op, ArgumentLink(index=0, name='df'))])
+
+    task = LocalInterpreter().interpret(
+        TreeNode(tree=tree, reverse_id='flow', name='Flow', results=[op])
+    )
+    alias = task.state.operation_aliases[condition.owner.uuid]
+    assert alias in task.state.conditions
+    assert task.state.operation_aliases[op.owner.uuid] in task.state.processors
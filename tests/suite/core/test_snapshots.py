@@ -0,0 +1,113 @@
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+
+from malevich._db import drop_snapshots, get_snapshot, put_snapshot
+from malevich._db.schema import Base
+from malevich._utility.timing import StageTimer
+from malevich.models.state.core import CoreParams
+from malevich.models.task.interpreted.core import CoreTask
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine('duckdb:///' + str(tmp_path / 'malevich.db'))
+    Base.metadata.create_all(engine)
+    monkeypatch.setitem(
+        vars(sys.modules['malevich._db.functions.get_db']), '__Malevich_db__', engine
+    )
+    return engine
+
+
+def test_put_and_get_snapshot(db):
+    assert get_snapshot('host', 'user', 'hash', 'pipeline', ttl=60) is None
+
+    put_snapshot('host', 'user', 'hash', 'pipeline', 'first')
+    assert get_snapshot('host', 'user', 'hash', 'pipeline', ttl=60) == 'first'
+
+    put_snapshot('host', 'user', 'hash', 'pipeline', 'second')
+    assert get_snapshot('host', 'user', 'hash', 'pipeline', ttl=60) == 'second'
+    assert get_snapshot('host', 'user', 'hash', 'pipeline', ttl=-1) is None
+
+
+def test_snapshots_are_isolated(db):
+    put_snapshot('host', 'user', 'hash', 'pipeline', 'payload')
+
+    assert get_snapshot('host', 'other', 'hash', 'pipeline', ttl=60) is None
+    assert get_snapshot('other', 'user', 'hash', 'pipeline', ttl=60) is None
+    assert get_snapshot('host', 'user', 'other', 'pipeline', ttl=60) is None
+    assert get_snapshot('host', 'user', 'hash', 'cfg', ttl=60) is None
+
+
+def test_drop_snapshots(db):
+    for kind in ('pipeline', 'cfg', 'operation'):
+        put_snapshot('host', 'user', 'hash', kind, kind)
+    put_snapshot('host', 'other', 'hash', 'cfg', 'cfg')
+
+    drop_snapshots('host', 'user', 'hash', 'cfg')
+    assert get_snapshot('host', 'user', 'hash', 'cfg', ttl=60) is None
+    assert get_snapshot('host', 'user', 'hash', 'pipeline', ttl=60) == 'pipeline'
+    assert get_snapshot('host', 'other', 'hash', 'cfg', ttl=60) == 'cfg'
+
+    drop_snapshots('host', 'user', 'hash')
+    assert get_snapshot('host', 'user', 'hash', 'pipeline', ttl=60) is None
+    assert get_snapshot('host', 'user', 'hash', 'operation', ttl=60) is None
+
+
+def _task(user: str, active: list[str]) -> SimpleNamespace:
+    prepared = SimpleNamespace(operationId='own-operation')
+    service = SimpleNamespace(
+        cfg=SimpleNamespace(
+            name=lambda _: SimpleNamespace(update_or_create=lambda **_: None)
+        ),
+        pipeline=SimpleNamespace(
+            id=lambda _: SimpleNamespace(prepare=lambda **_: prepared)
+        ),
+        run=SimpleNamespace(active=SimpleNamespace(
+            list=lambda: SimpleNamespace(ids=active)
+        )),
+    )
+    task = SimpleNamespace(
+        state=SimpleNamespace(
+            params=CoreParams(core_host='host', core_auth=(user, 'password')),
+            service=service,
+            config=None,
+            config_id='hash',
+            unique_task_hash='hash',
+        ),
+        snapshot_ttl=CoreTask.snapshot_ttl,
+    )
+    for name in (
+        '_snapshot_key',
+        '_snapshot',
+        '_put_snapshot',
+        '_drop_snapshots',
+        'get_active_tasks',
+        '_fetch_active_tasks',
+    ):
+        setattr(task, name, getattr(CoreTask, name).__get__(task))
+    return task
+
+
+def test_operation_snapshot_stores_own_operation(db):
+    task = _task('user', active=['foreign-operation'])
+
+    # The list of active operations on Core is not stored
+    assert task._snapshot('hash', 'operation', task._fetch_active_tasks, store=False)
+    assert get_snapshot('host', 'user', 'hash', 'operation', ttl=60) is None
+
+    CoreTask._boot(task, StageTimer())
+    assert json.loads(
+        get_snapshot('host', 'user', 'hash', 'operation', ttl=60)
+    ) == ['own-operation']
+    assert json.loads(task._snapshot(
+        'hash', 'operation', task._fetch_active_tasks, store=False
+    )) == ['own-operation']
+
+    other = _task('other', active=['foreign-operation'])
+    assert json.loads(other._snapshot(
+        'hash', 'operation', other._fetch_active_tasks, store=False
+    )) == ['foreign-operation']
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich.interpreter.analysis import analyze
+from malevich.models import ArgumentLink, OperationNode
+
+
+def _op(operation_id: str, **kwargs) -> tracedLike[OperationNode]:
+    return tracedLike(OperationNode(operation_id=operation_id, **kwargs))
+
+
+def _link(name: str = 'df', index: int = 0) -> ArgumentLink:
+    return ArgumentLink(index=index, name=name)
+
+
+def _diamond() -> tuple[ExecutionTree, list[tracedLike[OperationNode]]]:
+    src, fast, slow, sink = (
+        _op('src', alias='src'),
+        _op('fast', alias='fast'),
+        _op('slow', alias='slow'),
+        _op('sink', alias='sink'),
+    )
+    tree = ExecutionTree([
+        (src, fast, _link()),
+        (src, slow, _link()),
+        (fast, sink, _link('a', 0)),
+        (slow, sink, _link('b', 1)),
+    ])
+    return tree, [src, fast, slow, sink]
+
+
+def test_levels_and_fans():
+    tree, (src, fast, slow, sink) = _diamond()
+    analysis = analyze(tree, unwrap=False)
+
+    assert analysis.depth == 3
+    assert analysis.width == 2
+    assert set(analysis.levels[1]) == {fast.owner.uuid, slow.owner.uuid}
+    assert analysis.node(src.owner.uuid).fan_out == 2
+    assert analysis.node(sink.owner.uuid).fan_in == 2
+    assert analysis.critical_path_length == 3
+    with pytest.raises(KeyError):
+        analysis.node('missing')
+
+
+def test_weighted_critical_path():
+    tree, (src, fast, slow, sink) = _diamond()
+    analysis = analyze(
+        tree, weights={'src': 1., 'fast': 2., 'slow': 10., 'sink': 1.}, unwrap=False
+    )
+
+    assert analysis.critical_path == [
+        src.owner.uuid, slow.owner.uuid, sink.owner.uuid
+    ]
+    assert analysis.critical_path_length == 12
+    assert analysis.node(fast.owner.uuid).slack == 8
+    assert not analysis.node(fast.owner.uuid).critical
+
+    assert 'slow' in analysis.report()
+    dumped = json.loads(analysis.to_json())
+    assert dumped['width'] == 2
+    fields = {*type(analysis).model_fields, 'depth', 'width', 'parallelism'}
+    assert set(dumped) == fields
+    assert 'color="red"' in analysis.to_dot()
+
+
+def test_cycle_is_reported():
+    a, b = _op('a'), _op('b')
+    tree = ExecutionTree([(a, b, _link()), (b, a, _link('x', 1))])
+    with pytest.raises(ValueError):
+        analyze(tree, unwrap=False)
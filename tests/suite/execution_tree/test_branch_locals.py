@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+from malevich._ast import (
+    _DELETED,
+    BranchLocals,
+    combine_branch_states_inplace,
+    copy_state,
+)
+from malevich._autoflow.tracer import tracedLike
+from malevich.models import OperationNode
+
+
+def _state() -> tuple[dict, dict]:
+    return {}, {
+        'df': pd.DataFrame({'a': [1, 2]}),
+        'items': [1],
+        'node': tracedLike(OperationNode(operation_id='op')),
+        'unused': [0],
+    }
+
+
+def test_in_place_mutations_are_isolated():
+    state = _state()
+    if_state, else_state = copy_state(state), copy_state(state)
+
+    exec("items.append(2); df['a'] += 1", *if_state)
+    exec("items.append(3)", *else_state)
+
+    assert if_state[1]['items'] == [1, 2]
+    assert else_state[1]['items'] == [1, 3]
+    assert state[1]['items'] == [1]
+    assert list(if_state[1]['df']['a']) == [2, 3]
+    assert list(state[1]['df']['a']) == [1, 2]
+
+    # Only variables read by the branch are copied
+    assert 'unused' not in if_state[1]._copies
+    assert if_state[1].peek('unused') is state[1]['unused']
+    assert if_state[1]['node'] is state[1]['node']
+    assert not if_state[1].assigned('items')
+
+
+def test_nested_branches_see_the_enclosing_branch():
+    state = _state()
+    outer = copy_state(state)
+    exec("items.append(2)", *outer)
+
+    inner = copy_state(outer)
+    assert inner[1].peek('items') == [1, 2]
+    exec("items.append(3)", *inner)
+    assert outer[1]['items'] == [1, 2]
+    assert inner[1]['items'] == [1, 2, 3]
+
+
+def test_deletion():
+    state = _state()
+    branch = copy_state(state)[1]
+
+    exec("del items; local = 1", {}, branch)
+    assert branch.maps[0]['items'] is _DELETED
+    assert 'items' not in branch
+    assert branch.get('items') is None
+    assert 'items' not in list(branch)
+    assert len(branch) == len(state[1])
+    with pytest.raises(KeyError):
+        branch['items']
+    with pytest.raises(KeyError):
+        del branch['items']
+    assert state[1]['items'] == [1]
+
+    # Variables of the branch are removed from it
+    del branch['local']
+    assert 'local' not in branch.maps[0]
+
+    # Deleted variables are hidden from nested branches
+    nested = BranchLocals({}, branch)
+    assert 'items' not in nested
+    with pytest.raises(KeyError):
+        nested['items']
+
+    branch['items'] = [2]
+    assert branch['items'] == [2]
+    assert nested['items'] == [2]
+
+
+def test_read_variables_are_not_changes():
+    state = _state()
+    if_state, else_state = copy_state(state), copy_state(state)
+    exec("x = df", *if_state)
+    exec("y = df; items.append(2)", *else_state)
+
+    # Raises for non-traced variables assigned in branches
+    combine_branch_states_inplace(state, if_state, else_state, None)
+    assert state[1]['items'] == [1]
@@ -0,0 +1,52 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from malevich._autoflow.flow import Flow
+from malevich._autoflow.tracer import root, traced
+from malevich._utility.unique import unique
+
+
+def _build(size: int) -> bool:
+    with Flow() as tree:
+        nodes = [traced(root()) for _ in range(size)]
+        for a, b in zip(nodes, nodes[1:]):
+            a._autoflow.calledby(b)
+        with Flow() as inner:
+            x, y = traced(root()), traced(root())
+            x._autoflow.calledby(y)
+        ok = (
+            Flow.flow_ref() is tree
+            and len(tree.tree) == size - 1
+            and len(inner.tree) == 1
+        )
+    return ok
+
+
+def test_flows_in_threads():
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(_build, [2 + i % 10 for i in range(500)]))
+    assert all(results)
+    assert not Flow.isinflow()
+
+
+def test_flows_in_tasks():
+    async def build(size: int) -> bool:
+        with Flow() as tree:
+            nodes = [traced(root()) for _ in range(size)]
+            await asyncio.sleep(0)
+            for a, b in zip(nodes, nodes[1:]):
+                a._autoflow.calledby(b)
+                await asyncio.sleep(0)
+            return Flow.flow_ref() is tree and len(tree.tree) == size - 1
+
+    async def main() -> list[bool]:
+        return await asyncio.gather(*[build(2 + i % 10) for i in range(500)])
+
+    assert all(asyncio.run(main()))
+    assert not Flow.isinflow()
+
+
+def test_unique_in_threads():
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        ids = list(pool.map(lambda _: unique('stress'), range(10_000)))
+    assert len(set(ids)) == len(ids)
@@ -0,0 +1,65 @@
+import warnings
+
+import pytest
+
+from malevich._autoflow.flow import Flow
+from malevich._autoflow.function import autotrace, sinktrace
+from malevich._autoflow.tracer import root, traced
+
+
+def _links(tree, result: traced) -> list[tuple]:
+    return [
+        (u.owner, link.index, link.name, link.in_sink)
+        for u, v, link in tree.tree
+        if v.owner == result.owner
+    ]
+
+
+@autotrace
+def _operation(df, other=None, /, extra=None, *, key=None):
+    return root()
+
+
+@sinktrace
+def _sink(df, other=None, /, *dfs, key=None):
+    return root()
+
+
+def test_autotrace_links_positional_only_arguments():
+    with Flow() as tree:
+        a, b, c, d = (traced(root()) for _ in range(4))
+        both = _operation(a, b, c, key=d)
+        default = _operation(a)
+        keyword = _operation(a, extra=c, key=d)
+
+    assert _links(tree, both) == [
+        (a.owner, 0, 'df', False), (b.owner, 1, 'other', False)
+    ]
+    # Defaults and arguments after positional-only ones are not linked
+    assert _links(tree, default) == [(a.owner, 0, 'df', False)]
+    assert _links(tree, keyword) == [(a.owner, 0, 'df', False)]
+
+
+def test_autotrace_rejects_untraced_arguments():
+    with Flow(), pytest.raises(ValueError):
+        _operation(traced(root()), 1)
+
+
+def test_sinktrace_links_variadic_arguments():
+    with Flow() as tree:
+        a, b, c, d, e = (traced(root()) for _ in range(5))
+        sink = _sink(a, b, c, d, key=e)
+        single = _sink(a)
+
+    assert _links(tree, sink) == [
+        (a.owner, 0, 'df', False),
+        (b.owner, 1, 'other', False),
+        (c.owner, 2, 'dfs', True),
+        (d.owner, 2, 'dfs', True),
+    ]
+    assert _links(tree, single) == [(a.owner, 0, 'df', False)]
+
+    with Flow(), warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        _sink(traced(root()), 1)
+    assert len(caught) == 1
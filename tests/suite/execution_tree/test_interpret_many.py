@@ -0,0 +1,101 @@
+import threading
+
+import malevich_coretools as core
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich.interpreter import Interpreter
+from malevich.interpreter import core as core_interpreter
+from malevich.interpreter.batch import interpret_many
+from malevich.interpreter.core import CoreInterpreter
+from malevich.models import ArgumentLink, OperationNode, PromisedTask, TreeNode
+from malevich.models.registry.core_entry import CoreRegistryEntry
+
+
+def _flow(name: str, size: int) -> PromisedTask:
+    nodes = [
+        tracedLike(OperationNode(
+            operation_id=f'op_{i % 2}',
+            processor_id=f'processor_{i % 2}',
+            alias=f'{name}_{i}',
+        ))
+        for i in range(size)
+    ]
+    tree = ExecutionTree([
+        (u, v, ArgumentLink(index=0, name='df'))
+        for u, v in zip(nodes, nodes[1:])
+    ])
+    results = [(None, nodes[-1])]
+    return PromisedTask(
+        results=results,
+        tree=TreeNode(tree=tree, reverse_id=name, name=name, results=results),
+        component=None,
+    )
+
+
+def test_flows_share_resources(monkeypatch):
+    lock = threading.Lock()
+    lookups, auth_checks = [], []
+
+    def get(operation_id: str, model: type) -> CoreRegistryEntry:
+        with lock:
+            lookups.append(operation_id)
+        return CoreRegistryEntry(
+            image_ref=f'image/{operation_id}', processor_id=operation_id
+        )
+
+    def check_auth(**kwargs) -> None:
+        with lock:
+            auth_checks.append(kwargs)
+
+    monkeypatch.setattr(core_interpreter.registry, 'get', get)
+    monkeypatch.setattr(core, 'check_auth', check_auth)
+
+    interpreter = CoreInterpreter(
+        core_auth=('user', 'password'), core_host='host', use_cache=False
+    )
+    flows = [_flow(f'flow_{i}', size=3 + i) for i in range(6)]
+    tasks = interpret_many(flows, interpreter, max_workers=3)
+
+    assert len(tasks) == len(flows)
+    for i, task in enumerate(tasks):
+        assert sorted(task.state.processors) == sorted(
+            f'flow_{i}_{j}' for j in range(3 + i)
+        )
+        assert task.state.params.core_host == 'host'
+    assert len(auth_checks) == 1
+    # Registry entries are shared between forks
+    assert set(lookups) == {'op_0', 'op_1'}
+    assert interpreter._shared.registry.keys() == {'op_0', 'op_1'}
+
+
+class _DictInterpreter(Interpreter[dict, dict]):
+    def __init__(self) -> None:
+        super().__init__({'nodes': []})
+
+    def before_interpret(self, state: dict) -> dict:
+        return state
+
+    def create_node(self, state: dict, tracer: tracedLike) -> dict:
+        state['nodes'].append(tracer.owner.alias)
+        return state
+
+    def create_dependency(self, state: dict, *args) -> dict:
+        return state
+
+    def after_interpret(self, state: dict) -> dict:
+        return state
+
+    def get_task(self, state: dict) -> dict:
+        return state
+
+
+def test_default_fork_copies_state():
+    interpreter = _DictInterpreter()
+    fork = interpreter.fork()
+
+    assert fork is not interpreter
+    assert fork._state == interpreter._state
+    assert fork._state is not interpreter._state
+    fork._state['nodes'].append('node')
+    assert interpreter._state['nodes'] == []
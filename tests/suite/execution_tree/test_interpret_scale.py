@@ -0,0 +1,64 @@
+import time
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich.interpreter.core import CoreInterpreter
+from malevich.models import (
+    ArgumentLink,
+    CoreInterpreterState,
+    OperationNode,
+    TreeNode,
+)
+from malevich.models.registry.core_entry import CoreRegistryEntry
+
+N_NODES = 5000
+
+
+def _chain(n: int) -> TreeNode:
+    nodes = [
+        tracedLike(OperationNode(
+            operation_id='op',
+            processor_id='processor',
+            alias=f'op_{i}',
+        ))
+        for i in range(n)
+    ]
+    tree = ExecutionTree([
+        (u, v, ArgumentLink(index=0, name='df'))
+        for u, v in zip(nodes, nodes[1:])
+    ])
+    return TreeNode(
+        tree=tree, reverse_id='chain', name='Chain', results=[nodes[-1]]
+    )
+
+
+def test_interpretation_copies_state_per_stage(monkeypatch):
+    copies = 0
+    deepcopy_ = CoreInterpreterState.__deepcopy__
+
+    def counted(self: CoreInterpreterState, memo: dict | None = None):  # noqa: ANN202
+        nonlocal copies
+        copies += 1
+        return deepcopy_(self, memo)
+
+    monkeypatch.setattr(CoreInterpreterState, '__deepcopy__', counted)
+
+    interpreter = CoreInterpreter(
+        core_auth=('user', 'password'), core_host='host', use_cache=False
+    )
+    interpreter.passes = []
+    interpreter._shared.auth_verified = True
+    interpreter._shared.registry['op'] = CoreRegistryEntry(
+        image_ref='image', processor_id='processor'
+    )
+
+    node = _chain(N_NODES)
+    copies = 0
+    started_at = time.perf_counter()
+    task = interpreter.interpret(node)
+    elapsed = time.perf_counter() - started_at
+
+    assert len(task.state.processors) == N_NODES
+    assert task.state.processors['op_1'].arguments['df'].id == 'op_0'
+    # The state is copied per stage of interpretation, not per node
+    assert copies < 20, f'{copies} copies of the state in {elapsed:.1f}s'
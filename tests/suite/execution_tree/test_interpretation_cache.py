@@ -0,0 +1,189 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich._utility.cache import signing
+from malevich._utility.cache.manager import CacheManager
+from malevich.interpreter.cache import (
+    InterpretationCache,
+    interpretation_key,
+    interpretation_nodes,
+)
+from malevich.constants import CORE_INTERPRETER_IN_APP_INFO_KEY
+from malevich.interpreter.core import CoreInterpreter, registry
+from malevich.models import (
+    ArgumentLink,
+    Collection,
+    CollectionNode,
+    CoreInterpreterState,
+    OperationNode,
+    TreeNode,
+)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        CacheManager().core, '_user_cache_path', str(tmp_path / 'cache')
+    )
+    monkeypatch.setattr(signing.Paths, 'home', lambda *p: str(tmp_path.joinpath(*p)))
+    monkeypatch.delenv('MALEVICH_NO_INTERPRETATION_CACHE', raising=False)
+    signing._key.cache_clear()
+    cache_ = InterpretationCache()
+    cache_.clear()
+    yield cache_
+    cache_.clear()
+    signing._key.cache_clear()
+
+
+def _flow(data: pd.DataFrame, config: dict | None = None) -> TreeNode:
+    df = tracedLike(CollectionNode(
+        collection=Collection(collection_id='data', collection_data=data),
+    ))
+    op = tracedLike(OperationNode(
+        operation_id='op', processor_id='op', config=config or {'x': 1}
+    ))
+    sink = tracedLike(OperationNode(operation_id='sink', processor_id='sink'))
+    tree = ExecutionTree([
+        (df, op, ArgumentLink(index=0, name='df')),
+        (op, sink, ArgumentLink(index=0, name='df')),
+    ])
+    return TreeNode(tree=tree, reverse_id='flow', name='Flow', results=[sink])
+
+
+def _key(node: TreeNode, params: list | None = None) -> str:
+    return interpretation_key(node, node.tree, 'core', params)
+
+
+def test_put_get_and_drop(cache):
+    assert cache.get('key') is None
+
+    cache.put('key', {'a': [1, 2]})
+    assert cache.get('key') == {'a': [1, 2]}
+
+    # Entries are read from disk by other processes
+    cache.clear()
+    assert cache.get('key') == {'a': [1, 2]}
+
+    cache.drop('key')
+    cache.clear()
+    assert cache.get('key') is None
+
+
+def test_unsigned_entries_are_rejected(cache):
+    cache.put('key', {'a': 1})
+    cache.clear()
+    with open(cache._path('key'), 'r+b') as file_:
+        data = bytearray(file_.read())
+        data[-2] ^= 0xff
+        file_.seek(0)
+        file_.write(data)
+
+    assert cache.get('key') is None
+    cache.clear()
+    # Invalid entries are removed
+    assert cache.get('key') is None
+
+    cache.put('key', {'a': 1})
+    cache.clear()
+    os.remove(signing.Paths.home('.cache_key'))
+    signing._key.cache_clear()
+    # Entries signed with another key are rejected as well
+    assert cache.get('key') is None
+
+
+def test_key_is_stable():
+    data = pd.DataFrame({'a': [1, 2]})
+    first, second = _flow(data), _flow(data.copy())
+    assert _key(first) == _key(second)
+    assert _key(first) == _key(first)
+
+    assert _key(first) != _key(_flow(data, config={'x': 2}))
+    assert _key(first) != _key(first, params=['other'])
+    assert _key(first) != interpretation_key(first, first.tree, 'space', None)
+
+
+def test_collection_nodes_are_rebound_on_hit(cache):
+    interpreter = CoreInterpreter(core_auth=('user', 'password'), core_host='host')
+    cached = _flow(pd.DataFrame({'a': [1]}))
+    nodes = interpretation_nodes(cached.tree)
+    aliases = []
+    state = CoreInterpreterState()
+    for i, group in enumerate(nodes.values()):
+        alias = f'node_{i}'
+        aliases.append(alias)
+        if isinstance(group[0], CollectionNode):
+            state.collection_nodes[alias] = group[0]
+        else:
+            state.operation_nodes[alias] = group[0]
+    key = _key(cached)
+    cache.put(key, (state, aliases))
+
+    live = _flow(pd.DataFrame({'a': [2]}))
+    assert _key(live) == key
+    task = interpreter._interpret_cached(live, None, key)
+
+    assert task is not None
+    (collection,) = task.state.collection_nodes.values()
+    assert collection.collection.collection_data['a'][0] == 2
+    (live_collection,) = (
+        group[0] for group in interpretation_nodes(live.tree).values()
+        if isinstance(group[0], CollectionNode)
+    )
+    # Nodes of the flow receive aliases from the cached interpretation
+    assert live_collection.alias in task.state.collection_nodes
+    assert live_collection.alias in aliases
+
+
+@pytest.fixture
+def apps(monkeypatch):
+    for operation_id in ('op', 'sink'):
+        monkeypatch.setitem(registry._registry, operation_id, {
+            'image_ref': f'image/{operation_id}',
+            'processor_id': operation_id,
+            'image_auth_user': 'image-user',
+            'image_auth_pass': 'image-password',
+        })
+
+
+def test_credentials_are_not_cached(cache, apps):
+    interpreter = CoreInterpreter(core_auth=('user', 'password'), core_host='host')
+    interpreter._shared.auth_verified = True
+    node = _flow(pd.DataFrame({'a': [1]}))
+    key = interpreter._interpretation_key(node)
+    interpreter.interpret(node)
+
+    with open(cache._path(key), 'rb') as file_:
+        assert b'password' not in file_.read()
+
+    state, _ = cache.get(key)
+    assert state.params.core_auth is None
+    assert all(x.image.token is None for x in state.processors.values())
+
+    # Credentials are filled in when the interpretation is restored
+    # (Core is not reachable, so the flow is not interpreted again)
+    task = CoreInterpreter(
+        core_auth=('user', 'password'), core_host='host'
+    ).interpret(_flow(pd.DataFrame({'a': [1]})))
+    assert task.state.params.core_auth == ('user', 'password')
+    for processor in task.state.processors.values():
+        assert processor.image.token == 'image-password'
+        info = json.loads(processor.cfg)[CORE_INTERPRETER_IN_APP_INFO_KEY]
+        assert info['auth'] == ['user', 'password']
+        assert info['image_auth'] == ['image-user', 'image-password']
+
+
+def test_key_depends_on_installed_apps(cache, apps, monkeypatch):
+    interpreter = CoreInterpreter(core_auth=('user', 'password'), core_host='host')
+    node = _flow(pd.DataFrame({'a': [1]}))
+    key = interpreter._interpretation_key(node)
+    assert key is not None
+
+    monkeypatch.setitem(
+        registry._registry, 'op', {**registry.get('op'), 'image_ref': 'image/new'}
+    )
+    assert interpreter._interpretation_key(node) != key
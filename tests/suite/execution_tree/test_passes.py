@@ -0,0 +1,67 @@
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich.interpreter.passes import (
+    CommonSubexpressionElimination,
+    DeadNodePruning,
+    run_passes,
+)
+from malevich.models import ArgumentLink, OperationNode
+
+
+def _op(operation_id: str, **kwargs) -> tracedLike[OperationNode]:
+    return tracedLike(OperationNode(operation_id=operation_id, **kwargs))
+
+
+def _link(name: str = 'df', index: int = 0) -> ArgumentLink:
+    return ArgumentLink(index=index, name=name)
+
+
+def _uuids(tree: ExecutionTree) -> set[str]:
+    return {x.owner.uuid for x in tree.nodes()}
+
+
+def test_cse_merges_chains():
+    src, a, b, c, d = _op('src'), _op('op'), _op('op'), _op('sink'), _op('sink')
+    tree = ExecutionTree([
+        (src, a, _link()),
+        (src, b, _link()),
+        (a, c, _link()),
+        (b, d, _link()),
+    ])
+
+    new_tree, stats = run_passes(
+        tree, [(None, (c,))], [CommonSubexpressionElimination()]
+    )
+
+    assert _uuids(new_tree) == {src.owner.uuid, a.owner.uuid, c.owner.uuid}
+    assert stats[0].removed_nodes == 2
+    assert len(tree.tree) == 4, "The original tree should not be modified"
+
+
+def test_cse_keeps_different_configs():
+    src = _op('src')
+    a, b = _op('op', config={'x': 1}), _op('op', config={'x': 2})
+    tree = ExecutionTree([(src, a, _link()), (src, b, _link())])
+
+    new_tree, _ = run_passes(
+        tree, [(None, (a, b))], [CommonSubexpressionElimination()]
+    )
+
+    assert _uuids(new_tree) == _uuids(tree)
+
+
+def test_dead_node_pruning():
+    src, a, b, c = _op('src'), _op('a'), _op('b'), _op('c')
+    tree = ExecutionTree([
+        (src, a, _link()),
+        (src, b, _link()),
+        (b, c, _link()),
+    ])
+
+    new_tree, stats = run_passes(tree, [(None, (a,))], [DeadNodePruning()])
+
+    assert _uuids(new_tree) == {src.owner.uuid, a.owner.uuid}
+    assert stats[0].edges_after == 1
+
+    unchanged, _ = run_passes(tree, None, [DeadNodePruning()])
+    assert _uuids(unchanged) == _uuids(tree)
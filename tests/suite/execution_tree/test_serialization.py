@@ -0,0 +1,175 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich.models import (
+    ArgumentLink,
+    Collection,
+    CollectionNode,
+    OperationNode,
+    PromisedTask,
+    TreeNode,
+)
+from malevich.models.task import serialization
+
+
+def _frame(seed: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'a': np.arange(1000) + seed,
+        'b': [f'value-{i}' for i in range(1000)],
+    })
+
+
+def _task() -> PromisedTask:
+    large = tracedLike(CollectionNode(
+        collection=Collection(collection_id='large', collection_data=_frame(0)),
+        alias='large',
+    ))
+    same = tracedLike(CollectionNode(
+        collection=Collection(collection_id='same', collection_data=_frame(0)),
+        alias='same',
+    ))
+    small = tracedLike(CollectionNode(
+        collection=Collection(
+            collection_id='small', collection_data=pd.DataFrame({'x': [1]})
+        ),
+        alias='small',
+    ))
+    op = tracedLike(OperationNode(operation_id='op', alias='op', config={'k': 1}))
+    sink = tracedLike(OperationNode(operation_id='sink', alias='sink'))
+    tree = ExecutionTree([
+        (large, op, ArgumentLink(index=0, name='df')),
+        (same, op, ArgumentLink(index=1, name='other')),
+        (small, op, ArgumentLink(index=2, name='extra')),
+        (op, sink, ArgumentLink(index=0, name='df')),
+    ])
+    results = [sink]
+    return PromisedTask(
+        results=results,
+        tree=TreeNode(tree=tree, reverse_id='flow', name='Flow', results=results),
+        component=None,
+    )
+
+
+def _edges(task: PromisedTask) -> list[tuple]:
+    return [
+        (u.owner.alias, v.owner.alias, link.index, link.name)
+        for u, v, link in task.tree.tree.tree
+    ]
+
+
+def _collections(task: PromisedTask) -> dict[str, Collection]:
+    return {
+        u.owner.alias: u.owner.collection
+        for u, _, _ in task.tree.tree.tree
+        if isinstance(u.owner, CollectionNode)
+    }
+
+
+def test_round_trip():
+    task = _task()
+    data = task.dump()
+    assert serialization.is_compact(data)
+
+    restored = PromisedTask.load(data)
+    assert _edges(restored) == _edges(task)
+    assert restored.returned[0].owner.alias == 'sink'
+    for alias, collection in _collections(task).items():
+        pd.testing.assert_frame_equal(
+            _collections(restored)[alias].collection_data,
+            collection.collection_data,
+        )
+    nodes = {v.owner.alias: v.owner for _, v, _ in restored.tree.tree.tree}
+    assert nodes['op'].config == {'k': 1}
+
+
+def test_structure_is_stored_once():
+    data = _task().dump()
+    header = serialization.read_header(data)
+    assert [x['alias'] for x in header['nodes']] == [
+        'large', 'op', 'same', 'small', 'sink'
+    ]
+    assert header['edges'] == [
+        [0, 1, 0, 'df'], [2, 1, 1, 'other'], [3, 1, 2, 'extra'], [1, 4, 0, 'df'],
+    ]
+
+    objects = serialization.load(data)
+    assert 'tree' not in objects['tree']
+    assert len(objects['graph']['nodes']) == len(header['nodes'])
+    assert len(objects['graph']['links']) == len(header['edges'])
+
+
+def test_payloads_are_deduplicated_and_lazy():
+    data = _task().dump()
+    # Identical frames are stored once, small ones are kept in the body
+    assert len(serialization.read_header(data)['payloads']) == 1
+
+    collections = _collections(PromisedTask.load(data))
+    large = collections['large']
+    assert 'collection_data' not in large.__dict__
+    assert large.collection_data['a'][0] == 0
+    assert 'collection_data' in large.__dict__
+    assert 'collection_data' in collections['small'].__dict__
+
+    # Lazy collections are dumped without loading their data
+    same = collections['same']
+    restored = PromisedTask.load(
+        PromisedTask(
+            results=[],
+            tree=TreeNode(
+                tree=ExecutionTree([(
+                    tracedLike(CollectionNode(collection=same, alias='same')),
+                    tracedLike(OperationNode(operation_id='op', alias='op')),
+                    ArgumentLink(index=0, name='df'),
+                )]),
+                reverse_id='flow',
+                name='Flow',
+            ),
+            component=None,
+        ).dump()
+    )
+    assert 'collection_data' not in same.__dict__
+    pd.testing.assert_frame_equal(
+        _collections(restored)['same'].collection_data, _frame(0)
+    )
+
+
+def test_lazy_collections_are_serialized():
+    collections = _collections(PromisedTask.load(_task().dump()))
+    assert collections['large'].model_dump()['collection_data']['a'][0] == 0
+
+    copy = pickle.loads(pickle.dumps(collections['same']))
+    pd.testing.assert_frame_equal(copy.collection_data, _frame(0))
+
+
+def test_payloads_are_shared_in_store(tmp_path):
+    store = str(tmp_path / 'store')
+    first, second = _task().dump(store=store), _task().dump(store=store)
+    assert len(os.listdir(store)) == 1
+    assert len(first) < 10_000 and len(second) < 10_000
+
+    restored = PromisedTask.load(second, store=store)
+    pd.testing.assert_frame_equal(
+        _collections(restored)['large'].collection_data, _frame(0)
+    )
+
+
+def test_legacy_format_is_loaded():
+    task = _task()
+    data = pickle.dumps((
+        b'',
+        pickle.dumps(task.tree.model_dump(exclude={'results'})),
+        pickle.dumps(task.returned),
+        pickle.dumps(None),
+    ))
+    assert not serialization.is_compact(data)
+
+    restored = PromisedTask.load(data)
+    assert _edges(restored) == _edges(task)
+    pd.testing.assert_frame_equal(
+        _collections(restored)['large'].collection_data, _frame(0)
+    )
@@ -0,0 +1,116 @@
+import malevich_coretools as core
+import pandas as pd
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich._meta.template import FlowTemplate
+from malevich.interpreter import core as core_interpreter
+from malevich.interpreter.batch import interpret_many
+from malevich.interpreter.core import CoreInterpreter
+from malevich.models import (
+    ArgumentLink,
+    Collection,
+    CollectionNode,
+    OperationNode,
+    PromisedTask,
+    TreeNode,
+)
+from malevich.models.registry.core_entry import CoreRegistryEntry
+
+
+def _template(aliases: bool = True) -> FlowTemplate:
+    df = tracedLike(CollectionNode(
+        collection=Collection(collection_id='data', collection_data=pd.DataFrame()),
+        alias='df',
+    ))
+    op = tracedLike(OperationNode(
+        operation_id='op',
+        processor_id='op',
+        alias='op' if aliases else None,
+        config={'x': 1},
+    ))
+    sink = tracedLike(OperationNode(
+        operation_id='sink', processor_id='sink', alias='sink' if aliases else None
+    ))
+    tree = ExecutionTree([
+        (df, op, ArgumentLink(index=0, name='df')),
+        (op, sink, ArgumentLink(index=0, name='df')),
+    ])
+    results = [(None, sink)]
+    task = PromisedTask(
+        results=results,
+        tree=TreeNode(tree=tree, reverse_id='flow', name='Flow', results=results),
+        component=None,
+    )
+    return FlowTemplate(task, ['df'])
+
+
+def _owners(task: PromisedTask, alias: str) -> list:
+    return [
+        node.owner for edge in task.tree.tree.tree for node in edge[:2]
+        if node.owner.alias == alias
+    ]
+
+
+def test_instances_bind_inputs():
+    template = _template()
+    first = template.instantiate(pd.DataFrame({'a': [1]}))
+    second = template.instantiate(df=pd.DataFrame({'a': [2]}))
+
+    (df1,), (df2,) = _owners(first, 'df'), _owners(second, 'df')
+    assert df1.collection.collection_data['a'][0] == 1
+    assert df2.collection.collection_data['a'][0] == 2
+    assert df1.collection.collection_id == 'data'
+
+    # Operations are copied for each instance
+    assert _owners(first, 'sink')[0] is not _owners(second, 'sink')[0]
+    assert first.returned[0][1].owner is _owners(first, 'sink')[0]
+    assert first.returned[0][1].owner.uuid == template.task.returned[0][1].owner.uuid
+    # The template is not modified
+    assert _owners(template.task, 'df')[0].collection.collection_data.empty
+
+
+def test_instances_bind_configs():
+    template = _template()
+    task = template.instantiate(config={'sink': {'y': 2}})
+
+    assert all(x.config == {'y': 2} for x in _owners(task, 'sink'))
+    assert task.returned[0][1].owner.config == {'y': 2}
+    assert _owners(template.task, 'sink')[0].config != {'y': 2}
+
+
+def test_instances_are_interpreted_concurrently(monkeypatch):
+    monkeypatch.setattr(
+        core_interpreter.registry,
+        'get',
+        lambda operation_id, model: CoreRegistryEntry(
+            image_ref=f'image/{operation_id}', processor_id=operation_id
+        ),
+    )
+    monkeypatch.setattr(core, 'check_auth', lambda **kwargs: None)
+
+    template = _template(aliases=False)
+    instances = [
+        template.instantiate(pd.DataFrame({'a': [i]})) for i in range(8)
+    ]
+    tasks = interpret_many(
+        instances,
+        CoreInterpreter(
+            core_auth=('user', 'password'), core_host='host', use_cache=False
+        ),
+        max_workers=4,
+    )
+
+    operations = [
+        id(node) for task in tasks for node in task.state.operation_nodes.values()
+    ]
+    # Interpreters do not share nodes of operations
+    assert len(operations) == len(set(operations)) == 2 * len(instances)
+    for task in tasks:
+        assert len(task.state.processors) == 2
+    # Aliases are assigned to copies, not to nodes of the template
+    assert all(
+        node.owner.alias is None
+        for node in template.task.tree.tree.nodes()
+        if isinstance(node.owner, OperationNode)
+    )
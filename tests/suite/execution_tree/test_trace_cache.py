@@ -0,0 +1,95 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from malevich._autoflow.flow import Flow
+from malevich._autoflow.tracer import root, traced, tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich._meta.trace_cache import TraceCache, trace_key
+from malevich._utility.cache import signing
+from malevich._utility.cache.manager import CacheManager
+from malevich.models import (
+    ArgumentLink,
+    Collection,
+    CollectionNode,
+    OperationNode,
+    PromisedTask,
+    TreeNode,
+)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        CacheManager().core, '_user_cache_path', str(tmp_path / 'cache')
+    )
+    monkeypatch.setattr(signing.Paths, 'home', lambda *p: str(tmp_path.joinpath(*p)))
+    signing._key.cache_clear()
+    cache_ = TraceCache()
+    cache_.clear()
+    yield cache_
+    cache_.clear()
+    signing._key.cache_clear()
+
+
+def _flow(df):
+    return df
+
+
+def test_traced_trees_are_picklable():
+    with Flow() as tree:
+        a, b = traced(root()), traced(root())
+        a._autoflow.calledby(b)
+        tree.register_node_mapper(lambda *args, **kwargs: None)
+
+    restored = pickle.loads(pickle.dumps(tree))
+    (u, v, _), = restored.tree
+    assert isinstance(u, tracedLike) and isinstance(v, tracedLike)
+    assert u.owner == a.owner and v.owner == b.owner
+    assert restored._node_map == {}
+
+
+def test_trace_key_depends_on_arguments():
+    df = pd.DataFrame({'a': [1, 2]})
+    key = trace_key(_flow, (df,), {})
+
+    assert key is not None
+    assert key == trace_key(_flow, (df.copy(),), {})
+    assert key != trace_key(_flow, (pd.DataFrame({'a': [1, 3]}),), {})
+    assert key != trace_key(_flow, (), {'df': df})
+
+
+def _task() -> PromisedTask:
+    df = tracedLike(CollectionNode(
+        collection=Collection(
+            collection_id='data', collection_data=pd.DataFrame({'a': [1]})
+        ),
+        alias='data',
+    ))
+    op = tracedLike(OperationNode(operation_id='op', alias='op'))
+    tree = ExecutionTree([(df, op, ArgumentLink(index=0, name='df'))])
+    return PromisedTask(
+        results=[op],
+        tree=TreeNode(tree=tree, reverse_id='flow', name='Flow', results=[op]),
+        component=None,
+    )
+
+
+def test_entries_are_signed(cache):
+    cache.put('key', _task())
+    cache.clear()
+    assert cache.get('key').returned[0].owner.alias == 'op'
+
+    cache.clear()
+    with open(cache._path('key'), 'r+b') as file_:
+        data = bytearray(file_.read())
+        data[-2] ^= 0xff
+        file_.seek(0)
+        file_.write(data)
+    assert cache.get('key') is None
+
+    # Entries written without the key of the user are not loaded
+    with open(cache._path('key'), 'wb') as file_:
+        file_.write(_task().dump())
+    assert cache.get('key') is None
@@ -0,0 +1,36 @@
+import gc
+import weakref
+
+from malevich._autoflow.flow import Flow
+from malevich._autoflow.tracer import autoflow, root, traced
+
+
+def _flow() -> tuple[weakref.ref, weakref.ref]:
+    with Flow() as tree:
+        # Distinct roots, as traced objects share the default one
+        a, b = traced(root()), traced(root())
+        a._autoflow.calledby(b)
+        assert b._autoflow in autoflow.get_trace_refs(tree)
+    return weakref.ref(tree), weakref.ref(b._autoflow)
+
+
+def test_trace_map_entries_are_collected():
+    gc.collect()
+    before = len(autoflow._trace_map)
+
+    tree_ref, bridge_ref = _flow()
+    gc.collect()
+
+    assert tree_ref() is None
+    assert bridge_ref() is None
+    assert len(autoflow._trace_map) == before
+
+
+def test_trace_map_does_not_leak():
+    gc.collect()
+    before = len(autoflow._trace_map)
+    refs = [_flow() for _ in range(100_000)]
+
+    gc.collect()
+    assert all(tree() is None and bridge() is None for tree, bridge in refs)
+    assert len(autoflow._trace_map) <= before
@@ -0,0 +1,97 @@
+import sys
+
+import pandas as pd
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich._utility.tree import unwrap_tree
+from malevich.models import (
+    ArgumentLink,
+    Collection,
+    CollectionNode,
+    OperationNode,
+    TreeNode,
+)
+
+
+def _collection(name: str) -> tracedLike[CollectionNode]:
+    return tracedLike(CollectionNode(
+        collection=Collection(collection_id=name, collection_data=pd.DataFrame()),
+        alias=name,
+    ))
+
+
+def _nested(depth: int) -> tuple[ExecutionTree, tracedLike, tracedLike]:
+    """Builds a flow of `depth` subflows nested into each other
+
+    The innermost subflow passes its input to an operation, every other
+    subflow passes its input to the next subflow
+    """
+    shadow = _collection('input_0')
+    operation = tracedLike(OperationNode(operation_id='op', alias='op'))
+    tree = ExecutionTree([(shadow, operation, ArgumentLink(index=0, name='df'))])
+    target, link = operation, tree.tree[0][2]
+
+    for level in range(1, depth + 1):
+        subflow = tracedLike(TreeNode(
+            tree=tree,
+            reverse_id=f'flow_{level}',
+            name=f'flow_{level}',
+            underlying_node=operation.owner,
+        ))
+        link = ArgumentLink(
+            index=0,
+            name='df',
+            is_compressed_edge=True,
+            compressed_edges=[(link, target)],
+            shadow_collection=shadow,
+        )
+        shadow = _collection(f'input_{level}')
+        tree = ExecutionTree([(shadow, subflow, link)])
+        target = subflow
+
+    return tree, shadow, operation
+
+
+def test_unwrap_nested_subflows():
+    tree, source, operation = _nested(3)
+    (edge,) = unwrap_tree(tree).tree
+    assert edge[0].owner is source.owner
+    assert edge[1].owner is operation.owner
+
+
+def test_unwrap_deeply_nested_subflows():
+    # Unwrapping used to recurse once per level of nesting, so
+    # subflows nested deeper than the recursion limit could not be run
+    tree, source, operation = _nested(800)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(500)
+    try:
+        (edge,) = unwrap_tree(tree).tree
+    finally:
+        sys.setrecursionlimit(limit)
+
+    assert edge[0].owner is source.owner
+    assert edge[1].owner is operation.owner
+    assert edge[2].name == 'df'
+
+
+def test_memoized_trees_follow_in_place_edits():
+    tree, source, operation = _nested(3)
+    assert unwrap_tree(tree).tree == unwrap_tree(tree).tree
+
+    # Edits keeping the number of edges, at the top level and in subflows
+    other = _collection('other')
+    tree.tree[0] = (other, *tree.tree[0][1:])
+    (edge,) = unwrap_tree(tree).tree
+    assert edge[0].owner is other.owner
+
+    innermost = tree
+    while isinstance(innermost.tree[0][1].owner, TreeNode):
+        innermost = innermost.tree[0][1].owner.tree
+    # The input of the subflow is replaced with a collection of its own
+    inner = _collection('inner')
+    innermost.tree[0] = (inner, *innermost.tree[0][1:])
+    edges = unwrap_tree(tree).tree
+    assert len(edges) == 2
+    assert edges[0][0].owner is inner.owner
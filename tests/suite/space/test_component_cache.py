@@ -0,0 +1,84 @@
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from malevich._utility.cache import signing
+from malevich._utility.cache.manager import CacheManager
+from malevich.interpreter.space_cache import ComponentCache
+
+
+@pytest.fixture
+def persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        CacheManager().space, '_user_cache_path', str(tmp_path / 'cache')
+    )
+    monkeypatch.setattr(signing.Paths, 'home', lambda *p: str(tmp_path.joinpath(*p)))
+    signing._key.cache_clear()
+    yield
+    signing._key.cache_clear()
+
+
+class _Ops:
+    """Counts lookups of components"""
+
+    def __init__(self, delay: float = 0.) -> None:
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def get_parsed_component_by_reverse_id(self, reverse_id: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return None if reverse_id == 'missing' else {'reverse_id': reverse_id}
+
+
+def test_one_request_per_component():
+    ops, cache = _Ops(delay=0.05), ComponentCache(ttl=60, persist=False)
+    ids = [f'component-{i % 5}' for i in range(100)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        found = list(pool.map(lambda x: cache.get(ops, x), ids))
+
+    assert ops.calls == 5
+    assert [x['reverse_id'] for x in found] == ids
+
+
+def test_misses_and_expired_entries_are_requested_again():
+    ops, cache = _Ops(), ComponentCache(ttl=0.05, persist=False)
+
+    assert cache.get(ops, 'missing') is None
+    assert cache.get(ops, 'missing') is None
+    assert ops.calls == 2
+
+    cache.get(ops, 'component')
+    cache.get(ops, 'component')
+    assert ops.calls == 3
+    time.sleep(0.1)
+    cache.get(ops, 'component')
+    assert ops.calls == 4
+
+    cache.invalidate(ops, 'component')
+    cache.get(ops, 'component')
+    assert ops.calls == 5
+
+
+def test_persisted_entries_are_signed(persisted):
+    ops = _Ops()
+    ComponentCache(ttl=60, persist=True).get(ops, 'component')
+    # Other caches read the entry from disk
+    assert ComponentCache(ttl=60, persist=True).get(ops, 'component') == {
+        'reverse_id': 'component'
+    }
+    assert ops.calls == 1
+
+    cache = ComponentCache(ttl=60, persist=True)
+    path = cache._path(cache._key(ops, 'component', None))
+    with open(path, 'wb') as file_:
+        file_.write(pickle.dumps((time.time() + 60, {'reverse_id': 'forged'})))
+    # Entries written without the key of the user are not unpickled
+    assert cache.get(ops, 'component') == {'reverse_id': 'component'}
+    assert ops.calls == 2
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from malevich._utility.schema import df_to_docs
+
+
+def _slow(df: pd.DataFrame) -> list[str]:
+    return [row.to_json() for _, row in df.iterrows()]
+
+
+def test_same_documents_as_rows():
+    df = pd.DataFrame({
+        'a': ['x', 'y', None],
+        'b': ['1', 'with "quotes"\nand newline', 'ü'],
+        'c': [1.5, np.nan, 3.],
+    })
+    assert df_to_docs(df) == _slow(df)
+    assert df_to_docs(df.iloc[:0]) == _slow(df.iloc[:0]) == []
+    assert df_to_docs(pd.DataFrame(index=range(2))) == _slow(pd.DataFrame(index=range(2)))
+
+
+def test_values_keep_types_of_columns():
+    df = pd.DataFrame({'a': [1], 'b': [1.5]})
+    assert df_to_docs(df) == ['{"a":1,"b":1.5}']
+    # Rows are cast to a common type
+    assert _slow(df) == ['{"a":1.0,"b":1.5}']
+
+
+def test_million_rows():
+    df = pd.DataFrame({
+        'id': np.arange(1_000_000),
+        'value': np.random.rand(1_000_000),
+        'label': 'label',
+    })
+    docs = df_to_docs(df)
+
+    assert len(docs) == len(df)
+    assert docs[0] == df.iloc[:1].to_json(orient='records')[1:-1]
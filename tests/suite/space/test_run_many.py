@@ -0,0 +1,57 @@
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+
+from malevich.models.state.space import SpaceInterpreterState
+from malevich.models.task.interpreted.space import SpaceTask
+
+
+class _Space:
+    """Records requests made by runs of a task"""
+
+    def __init__(self) -> None:
+        self.uploads = []
+        self.runs = []
+        self._lock = threading.Lock()
+
+    def get_snapshot_components(self, task_id: str) -> dict[str, str]:
+        return {'data': 'snapshot-data'}
+
+    def get_task_start_schema(self, task_id: str) -> list:
+        return [SimpleNamespace(in_flow_id='snapshot-data', injected_alias='data')]
+
+    def get_ca_in_flow(self, flow_id: str, in_flow_id: str) -> str:
+        return 'ca-data'
+
+    def create_collection(self, docs: list[str], **kwargs) -> str:
+        with self._lock:
+            self.uploads.append(docs)
+            return f'collection-{len(self.uploads)}'
+
+    def run_task(self, task_id: str, ca_override: list, webhook=None) -> str:
+        with self._lock:
+            self.runs.append(ca_override[0]['caUid'])
+            return f'run-{len(self.runs)}'
+
+
+def test_run_many_shares_equal_payloads():
+    state = SpaceInterpreterState()
+    state.space = _Space()
+    state.host = SimpleNamespace(uid='host')
+    state.aux.task_id = 'task'
+    state.aux.flow_id = 'flow'
+    component = SimpleNamespace(flow=SimpleNamespace(components=[
+        SimpleNamespace(alias='data', uid='in-flow-data', reverse_id='data', collection=True)
+    ]))
+    task = SpaceTask(state=state, component=component)
+
+    frames = [pd.DataFrame({'x': [i % 3]}) for i in range(12)]
+    done = list(task.run_many(
+        [{'data': df} for df in frames], max_concurrency=4, fetch_results=False
+    ))
+
+    assert sorted(i for i, _, _ in done) == list(range(12))
+    assert len(state.space.uploads) == 3
+    assert len(state.space.runs) == 12
+    assert all(results is None for _, _, results in done)
@@ -0,0 +1,191 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from malevich._autoflow.tracer import tracedLike
+from malevich._autoflow.tree import ExecutionTree
+from malevich.interpreter import space as space_interpreter
+from malevich.interpreter.space import SpaceInterpreter
+from malevich.interpreter.space_cache import ComponentCache
+from malevich.models import (
+    ArgumentLink,
+    Collection,
+    CollectionNode,
+    OperationNode,
+    TreeNode,
+)
+from malevich.models.exceptions import InterpretationError
+
+
+class _Space:
+    """Uploads collections slowly from any thread"""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.uploaded = []
+        self._lock = threading.Lock()
+
+    def get_my_hosts(self, url: str) -> list:
+        return [SimpleNamespace(uid='host')]
+
+    def get_parsed_component_by_reverse_id(self, reverse_id: str):
+        return SimpleNamespace(
+            reverse_id=reverse_id,
+            name=reverse_id,
+            collection=SimpleNamespace(uid=f'ca-{reverse_id}'),
+        )
+
+    def create_scheme(self, core_id: str, **kwargs) -> str:
+        return f'schema-{core_id}'
+
+    def create_collection(self, core_id: str, **kwargs) -> str:
+        time.sleep(self.delay)
+        with self._lock:
+            self.uploaded.append(core_id)
+        return f'uploaded-{core_id}'
+
+
+class _Manager:
+    """Loads components slowly and records how many are loaded at once"""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.loaded = []
+        self.active = 0
+        self.peak = 0
+        self.space = SimpleNamespace(get_component_by_reverse_id=lambda x: None)
+        self._lock = threading.Lock()
+
+    def component(self, component, version_mode):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if component.reverse_id == 'broken':
+                raise ValueError(component.reverse_id)
+            time.sleep(self.delay)
+            with self._lock:
+                self.loaded.append(component.reverse_id)
+            return component
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _interpreter(ops: _Space) -> SpaceInterpreter:
+    return SpaceInterpreter(
+        setup=SimpleNamespace(host=SimpleNamespace(conn_url='url', alias='host')),
+        ops=ops,
+        update_collections=True,
+        component_cache=ComponentCache(ttl=60, persist=False),
+    )
+
+
+def _collection(i: int) -> CollectionNode:
+    return tracedLike(CollectionNode(
+        collection=Collection(
+            collection_id=f'data_{i}', collection_data=pd.DataFrame({'x': [i]})
+        ),
+        scheme='{}',
+        alias=f'data_{i}',
+    ))
+
+
+def _upload_threads() -> list[threading.Thread]:
+    return [
+        t for t in threading.enumerate()
+        if t.name.startswith('malevich-space-upload')
+    ]
+
+
+def test_overrides_are_merged_on_join():
+    ops = _Space()
+    interpreter = _interpreter(ops)
+    interpreter._uploads = ThreadPoolExecutor(max_workers=8)
+    try:
+        state = interpreter.state
+        for i in range(16):
+            state = interpreter._submit_upload(
+                state, _collection(i), interpreter._collection_component
+            )
+        wait(state.uploads.values())
+        # Workers do not change the state
+        assert state.collection_overrides == {}
+
+        state = interpreter._join_uploads(state)
+    finally:
+        interpreter._uploads.shutdown()
+
+    assert len(ops.uploaded) == 16
+    assert state.uploads == {}
+    assert len(state.components) == 16
+    assert state.collection_overrides == {
+        f'ca-data_{i}': (
+            f'uploaded-override-data_{i}-{state.interpretation_id}'
+        )
+        for i in range(16)
+    }
+
+
+def test_pool_is_shut_down_when_interpretation_fails(monkeypatch):
+    ops = _Space(delay=0.2)
+    interpreter = _interpreter(ops)
+    # The operation is not installed from Space
+    monkeypatch.setitem(space_interpreter.reg._registry, 'unknown', {})
+    op = tracedLike(OperationNode(operation_id='unknown', alias='op'))
+    tree = ExecutionTree([(_collection(0), op, ArgumentLink(index=0, name='df'))])
+
+    with pytest.raises(InterpretationError):
+        interpreter.interpret(
+            TreeNode(tree=tree, reverse_id='flow', name='Flow', results=[op]),
+            SimpleNamespace(reverse_id='flow'),
+        )
+
+    assert interpreter._uploads is None
+    assert interpreter.state.uploads == {}
+    assert _upload_threads() == []
+
+
+def _load(manager: _Manager, reverse_ids: list[str], workers: int = 8) -> None:
+    interpreter = _interpreter(_Space())
+    interpreter._uploads = ThreadPoolExecutor(max_workers=workers)
+    state = interpreter.state
+    state.component_manager = manager
+    state.components = {
+        f'node-{i}': SimpleNamespace(reverse_id=x, name=x)
+        for i, x in enumerate(reverse_ids)
+    }
+    try:
+        interpreter._load_components(state)
+    finally:
+        # Does not wait for loads left behind
+        interpreter._uploads.shutdown(wait=False)
+
+
+def test_components_are_loaded_once_and_concurrently():
+    manager = _Manager()
+    _load(manager, [f'component-{i % 4}' for i in range(20)])
+
+    assert sorted(manager.loaded) == [f'component-{i}' for i in range(4)]
+    assert manager.peak > 1
+
+
+def test_loading_stops_on_failure():
+    manager = _Manager()
+    with pytest.raises(InterpretationError):
+        _load(
+            manager,
+            ['broken', *[f'component-{i}' for i in range(10)]],
+            workers=2,
+        )
+
+    # Nothing is left running, and pending components are not loaded
+    assert manager.active == 0
+    loaded = list(manager.loaded)
+    assert len(loaded) < 10
+    time.sleep(0.3)
+    assert manager.loaded == loaded
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import typer
+from malevich_coretools.abstract.clickhouse import ClickhouseFunRecord
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from typer.testing import CliRunner
+
+from malevich._cli.telemetry import telemetry
+from malevich._db import get_label_percentiles, get_stage_percentiles
+from malevich._db.functions import telemetry as telemetry_db
+from malevich._db.functions.telemetry import _percentile
+from malevich._db.schema import Base
+from malevich._utility.timing import StageTimer
+from malevich.interpreter.analysis import historical_weights
+from malevich.models.task.interpreted import core
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine('duckdb:///' + str(tmp_path / 'malevich.db'))
+    Base.metadata.create_all(engine)
+    monkeypatch.setitem(
+        vars(sys.modules['malevich._db.functions.get_db']), '__Malevich_db__', engine
+    )
+    return engine
+
+
+def test_timer_is_opt_in(monkeypatch):
+    monkeypatch.delenv('MALEVICH_TELEMETRY', raising=False)
+    timer = StageTimer()
+    with timer.measure('prepare', 'collection'):
+        pass
+    assert timer.records == []
+
+
+def test_timer_buffers_until_flush(db, monkeypatch):
+    monkeypatch.setenv('MALEVICH_TELEMETRY', '1')
+    timer = StageTimer(pipeline_hash='pipeline', task_id='task')
+
+    def _measure(i: int) -> None:
+        with timer.measure('prepare', 'collection', label=f'c{i % 2}') as m:
+            m.size = i
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(_measure, range(20)))
+    with pytest.raises(ValueError), timer.measure('prepare', 'boot'):
+        raise ValueError
+
+    assert len(timer.records) == 21
+    assert get_stage_percentiles() == {}
+
+    timer.flush()
+    assert timer.records == []
+
+    report = get_stage_percentiles(pipeline_hash='pipeline')
+    # Failed measurements are not aggregated
+    assert list(report) == [('prepare', 'collection')]
+    assert report[('prepare', 'collection')]['n'] == 20
+    assert set(get_label_percentiles(stage='prepare')) == {'c0', 'c1'}
+
+
+def test_percentile():
+    assert _percentile([1.], 95) == 1.
+    assert _percentile([1., 2., 3., 4., 5.], 50) == 3.
+    assert _percentile([1., 2.], 50) == 1.5
+    assert _percentile([0., 10.], 95) == pytest.approx(9.5)
+
+
+def test_report_command(db, monkeypatch):
+    monkeypatch.setenv('MALEVICH_TELEMETRY', '1')
+    timer = StageTimer(pipeline_hash='pipeline')
+    for _ in range(3):
+        with timer.measure('run', 'run'):
+            pass
+    timer.flush()
+
+    # Mounted the same way as in `malevich` CLI
+    app = typer.Typer()
+    app.add_typer(telemetry, name='telemetry')
+    runner = CliRunner()
+    result = runner.invoke(app, ['telemetry', 'report', '--json'])
+    assert result.exit_code == 0, result.output
+    (row,) = json.loads(result.output)
+    assert (row['stage'], row['phase'], row['n']) == ('run', 'run', 3)
+
+    result = runner.invoke(app, ['telemetry', 'report', '--stage', 'prepare'])
+    assert result.exit_code == 0
+    assert 'No timings recorded yet' in result.output
+
+
+def _fun(alias: str, processor_id: str, start: str, end: str) -> ClickhouseFunRecord:
+    return ClickhouseFunRecord(
+        timestampStart=start,
+        timestampEnd=end,
+        runId='run',
+        bindId=alias,
+        iteration=0,
+        funId=processor_id,
+        success=True,
+        inside=False,
+        operationId='operation',
+        id=alias,
+    )
+
+
+def test_processor_durations_are_recorded(db, monkeypatch):
+    monkeypatch.setenv('MALEVICH_TELEMETRY', '1')
+    records = [
+        _fun('first', 'proc', '2024-01-01T00:00:00', '2024-01-01T00:00:02'),
+        _fun('second', 'proc', '2024-01-01T00:00:02', '2024-01-01T00:00:06'),
+        _fun('other', 'other', '2024-01-01T00:00:00Z', '2024-01-01T00:00:01.5Z'),
+    ]
+
+    async def _query(model, condition, operation_ids, run_ids, **kwargs):
+        assert (operation_ids, run_ids) == (['operation'], ['run'])
+        assert kwargs['is_async']
+        return records
+
+    monkeypatch.setattr(core, 'clickhouse_query', _query)
+    task = SimpleNamespace(state=SimpleNamespace(params=SimpleNamespace(
+        operation_id='operation', core_auth=None, core_host=None,
+    )))
+    timer = StageTimer(pipeline_hash='pipeline', run_id='run')
+    asyncio.run(core.CoreTask._record_processors(task, timer, 'run'))
+    timer.flush()
+
+    # Aliases and processor ids are both keys of weights
+    weights = historical_weights('pipeline')
+    assert weights == {
+        'first': 2., 'second': 4., 'other': 1.5, 'proc': 3.,
+    }
+
+    # Measurements of preparation are not taken as weights
+    with timer.measure('prepare', 'collection', label='first'):
+        pass
+    timer.flush()
+    assert historical_weights('pipeline') == weights
+
+
+def test_failed_queries_are_not_propagated(db, monkeypatch):
+    monkeypatch.setenv('MALEVICH_TELEMETRY', '1')
+
+    async def _query(*args, **kwargs):
+        raise ConnectionError
+
+    monkeypatch.setattr(core, 'clickhouse_query', _query)
+    task = SimpleNamespace(state=SimpleNamespace(params=SimpleNamespace(
+        operation_id='operation', core_auth=None, core_host=None,
+    )))
+    timer = StageTimer()
+    asyncio.run(core.CoreTask._record_processors(task, timer, 'run'))
+    assert timer.records == []
+
+
+def test_session_is_closed_when_recording_fails(db, monkeypatch):
+    sessions = []
+
+    class _Session(Session):
+        def commit(self) -> None:
+            raise RuntimeError()
+
+        def close(self) -> None:
+            sessions.append(self)
+            super().close()
+
+    monkeypatch.setattr(telemetry_db, 'get_db', lambda: _Session(bind=db))
+    monkeypatch.setenv('MALEVICH_TELEMETRY', '1')
+    timer = StageTimer(pipeline_hash='pipeline')
+    with timer.measure('prepare', 'boot'):
+        pass
+    timer.flush()
+
+    assert len(sessions) == 1
+    assert get_stage_percentiles('pipeline') == {}